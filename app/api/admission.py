@@ -0,0 +1,183 @@
+"""准入控制：限制同时运行的完整评判流程数，超出时排队或快速拒绝"""
+
+import asyncio
+import math
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Callable
+
+from fastapi import HTTPException
+from loguru import logger
+
+from app.config import get_settings
+
+settings = get_settings()
+
+
+class AdmissionSlot:
+    """slot() 产出的名额句柄；detach() 之后名额不随 async with 结束归还，由调用方负责"""
+
+    def __init__(self, release: Callable[[], None]):
+        self._release = release
+        self.detached = False
+
+    def detach(self) -> Callable[[], None]:
+        """把名额交给调用方（如后台讨论任务），返回只生效一次的归还函数"""
+        self.detached = True
+        return self._release
+
+    def release(self) -> None:
+        if not self.detached:
+            self._release()
+
+
+class AdmissionController:
+    """
+    有界并发 + 有界等待队列
+
+    - 运行中的流程数 < max_in_flight：直接执行
+    - 否则进入等待队列（最多 max_queue 个），等待不超过 queue_timeout 秒
+    - 队列已满或等待超时：返回 429 并带 Retry-After，让客户端稍后重试
+
+    max_in_flight <= 0 表示不限制。
+    """
+
+    def __init__(self, name: str, max_in_flight: int, max_queue: int, queue_timeout: float):
+        self.name = name
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self.rejected = 0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    @property
+    def saturated(self) -> bool:
+        """并发和队列都已占满（新请求会被直接拒绝）"""
+        return self._enabled and self._in_flight >= self.max_in_flight and self.queued >= self.max_queue
+
+    @property
+    def _enabled(self) -> bool:
+        return self.max_in_flight > 0
+
+    @property
+    def retry_after(self) -> int:
+        return max(1, math.ceil(self.queue_timeout))
+
+    def _reject(self, reason: str) -> HTTPException:
+        self.rejected += 1
+        logger.warning(
+            f"[{self.name}] 准入拒绝: {reason} "
+            f"(in_flight={self._in_flight}/{self.max_in_flight}, queued={self.queued}/{self.max_queue})"
+        )
+        return HTTPException(
+            status_code=429,
+            detail=f"服务繁忙，请稍后重试（{reason}）",
+            headers={"Retry-After": str(self.retry_after)},
+        )
+
+    async def acquire(self) -> None:
+        """获取一个执行名额（必要时排队等待）"""
+        if not self._enabled:
+            self._in_flight += 1
+            return
+
+        if self._in_flight < self.max_in_flight and not self._waiters:
+            self._in_flight += 1
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            raise self._reject("等待队列已满")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            if self._cancel_waiter(waiter):
+                raise self._reject("排队超时")
+        except asyncio.CancelledError:
+            if not self._cancel_waiter(waiter):
+                # 名额已经移交给了本请求，需要归还
+                self.release()
+            raise
+        # 名额由 release() 直接移交，in_flight 计数不变
+
+    def _cancel_waiter(self, waiter: asyncio.Future) -> bool:
+        """取消等待；返回 False 表示名额已移交（等待其实已成功）"""
+        if waiter.done():
+            return False
+        waiter.cancel()
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+        return True
+
+    def release(self) -> None:
+        """归还执行名额：优先移交给队首的等待者"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._in_flight -= 1
+
+    def _release_once(self) -> Callable[[], None]:
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                self.release()
+
+        return release
+
+    async def hold(self) -> Callable[[], None]:
+        """获取一个执行名额，返回只生效一次的归还函数（名额需要活过当前请求时使用，如后台讨论）"""
+        await self.acquire()
+        return self._release_once()
+
+    @asynccontextmanager
+    async def slot(self):
+        """async with controller.slot() as held: ... 占用一个执行名额（held.detach() 可把名额交给后台任务）"""
+        await self.acquire()
+        held = AdmissionSlot(self._release_once())
+        try:
+            yield held
+        finally:
+            held.release()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self._in_flight,
+            "queued": self.queued,
+            "max_in_flight": self.max_in_flight,
+            "max_queue": self.max_queue,
+            "rejected": self.rejected,
+            "saturated": self.saturated,
+        }
+
+
+# 全局实例（评分与二选一分别限流）
+scoring_admission = AdmissionController(
+    name="scoring",
+    max_in_flight=settings.scoring_max_in_flight,
+    max_queue=settings.scoring_max_queue,
+    queue_timeout=settings.scoring_queue_timeout_seconds,
+)
+binary_choice_admission = AdmissionController(
+    name="binary_choice",
+    max_in_flight=settings.binary_choice_max_in_flight,
+    max_queue=settings.binary_choice_max_queue,
+    queue_timeout=settings.binary_choice_queue_timeout_seconds,
+)
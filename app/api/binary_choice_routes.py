@@ -1,6 +1,8 @@
 """二选一模式的 API 路由"""
 
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Response, Header
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from loguru import logger
 import uuid
@@ -12,15 +14,28 @@ from app.models.binary_choice_schemas import (
     BinaryChoiceDebateResponse,
     BinaryChoiceDebateMessage,
 )
-from app.db.database import get_db
+from app.db.database import get_db, AsyncSessionLocal, db_writer
 from app.db.binary_choice_crud import (
     save_binary_choice_entry,
     save_binary_choice_results,
-    save_binary_choice_debate,
+    save_binary_choice_entry_timings,
     get_binary_choice_entry_by_id,
+    open_binary_choice_debate,
+    append_binary_choice_message,
+    checkpoint_binary_choice_debate,
+    save_binary_choice_debate_info,
+    finish_binary_choice_debate,
 )
+from app.db.crud import SESSION_STATUS_COMPLETED, SESSION_STATUS_FAILED
 from app.judges.binary_choice_stage_one import binary_choice_with_all_judges
 from app.judges.binary_choice_stage_two import run_binary_choice_debate
+from app.judges.debate_checkpoint import DebateCheckpoint
+from app.api.coalescing import coalescer, run_deduplicated
+from app.api.admission import binary_choice_admission
+from app.api.debate_tasks import live_debates
+from app.api.stage_one_progress import FLOW_BINARY_CHOICE, stage_one_progress, progress_event_stream
+from app.db.transcript import build_transcript, message_context
+from app.timing import PhaseTimer
 
 
 router = APIRouter()
@@ -29,7 +44,8 @@ router = APIRouter()
 @router.post("/judge", response_model=BinaryChoiceResponse)
 async def judge_binary_choice(
     request: BinaryChoiceRequest,
-    db: AsyncSession = Depends(get_db),
+    http_response: Response,
+    idempotency_key: Optional[str] = Header(default=None, alias="Idempotency-Key"),
 ):
     """
     二选一评判完整流程（阶段一 + 阶段二）
@@ -40,10 +56,11 @@ async def judge_binary_choice(
     4. 阶段二：评委群聊讨论
     5. 保存讨论记录
     6. 返回完整结果
+    
+    各阶段耗时通过 Server-Timing 响应头返回，并随作品一起保存。
+    相同 entry_id + 相同输入的并发请求只执行一次；支持 Idempotency-Key 回放。
     """
     logger.info(f"收到二选一评判请求: entry_id={request.entry_id}")
-    logger.info(f"问题: {request.question}")
-    logger.info(f"选项 A: {request.option_a}, 选项 B: {request.option_b}")
     
     # 验证至少有图片或文本之一
     if not request.image_url and not request.text_content:
@@ -52,23 +69,62 @@ async def judge_binary_choice(
             detail="必须提供 image_url 或 text_content 之一"
         )
     
+    (response, server_timing), replayed = await run_deduplicated(
+        scope="binary_choice",
+        request=request,
+        entry_id=request.entry_id,
+        idempotency_key=idempotency_key,
+        factory=lambda: _binary_choice_pipeline(request),
+    )
+    
+    http_response.headers["Server-Timing"] = server_timing
+    if replayed:
+        http_response.headers["Idempotent-Replayed"] = "true"
+    
+    return response
+
+
+async def _binary_choice_pipeline(request: BinaryChoiceRequest) -> tuple[BinaryChoiceResponse, str]:
+    """
+    执行一次完整二选一评判流程（写操作通过写入队列提交，需先获取准入名额）
+    
+    Returns:
+        (响应, Server-Timing 响应头)
+    """
+    async with binary_choice_admission.slot():
+        return await _run_binary_choice(request)
+
+
+async def _run_binary_choice(request: BinaryChoiceRequest) -> tuple[BinaryChoiceResponse, str]:
+    logger.info(f"问题: {request.question}")
+    logger.info(f"选项 A: {request.option_a}, 选项 B: {request.option_b}")
+    
     # 自动生成 entry_id（如果未提供）
     if not request.entry_id or request.entry_id.strip() == "":
         request.entry_id = f"binary_{uuid.uuid4().hex[:12]}"
         logger.info(f"自动生成 entry_id: {request.entry_id}")
     
+    # 在阶段一之前登记讨论：同一作品已有讨论在运行时直接返回 409，不为阶段一白白调用模型
+    with live_debates.hold("binary_choice", request.entry_id):
+        return await _choose_and_debate(request)
+
+
+async def _choose_and_debate(request: BinaryChoiceRequest) -> tuple[BinaryChoiceResponse, str]:
+    timer = PhaseTimer()
+    
     try:
         # 1. 保存二选一作品信息
-        entry = await save_binary_choice_entry(
-            db=db,
-            entry_id=request.entry_id,
-            question=request.question,
-            option_a=request.option_a,
-            option_b=request.option_b,
-            image_url=request.image_url,
-            text_content=request.text_content,
-            extra_context=request.extra_context,
-        )
+        with timer.phase("db_save_entry"):
+            entry = await db_writer.submit(
+                save_binary_choice_entry,
+                entry_id=request.entry_id,
+                question=request.question,
+                option_a=request.option_a,
+                option_b=request.option_b,
+                image_url=request.image_url,
+                text_content=request.text_content,
+                extra_context=request.extra_context,
+            )
         logger.info(f"二选一作品保存成功: {entry.entry_id}")
         
     except Exception as e:
@@ -77,15 +133,27 @@ async def judge_binary_choice(
     
     # 2. 阶段一：评委选择并给出理由
     try:
-        stage_one_result = await binary_choice_with_all_judges(
-            question=request.question,
-            option_a=request.option_a,
-            option_b=request.option_b,
-            entry_id=request.entry_id,
-            image_url=request.image_url,
-            text_content=request.text_content,
-            extra_context=request.extra_context,
-        )
+        # 字段一完整、多数一形成就推送给 /entry/{entry_id}/stream 的订阅者
+        progress = stage_one_progress.start(FLOW_BINARY_CHOICE, request.entry_id)
+        stage_one_result = {"error": "阶段一选择中断"}
+        try:
+            stage_one_result = await binary_choice_with_all_judges(
+                question=request.question,
+                option_a=request.option_a,
+                option_b=request.option_b,
+                entry_id=request.entry_id,
+                image_url=request.image_url,
+                text_content=request.text_content,
+                extra_context=request.extra_context,
+                timer=timer,
+                on_progress=lambda event, data: stage_one_progress.publish(progress, event, data),
+            )
+        finally:
+            await stage_one_progress.finish(progress, "result", {
+                "error": stage_one_result.get("error"),
+                "choice_a_count": stage_one_result.get("choice_a_count", 0),
+                "choice_b_count": stage_one_result.get("choice_b_count", 0),
+            })
         
         if "error" in stage_one_result:
             logger.error(f"阶段一选择失败: {stage_one_result['error']}")
@@ -106,77 +174,39 @@ async def judge_binary_choice(
     
     # 3. 保存评委选择结果
     try:
-        await save_binary_choice_results(
-            db=db,
-            entry_id=request.entry_id,
-            judge_results=judge_results,
-        )
+        with timer.phase("db_save_results"):
+            await db_writer.submit(
+                save_binary_choice_results,
+                entry_id=request.entry_id,
+                judge_results=judge_results,
+            )
         logger.info(f"评委选择结果保存成功")
         
     except Exception as e:
         logger.error(f"保存评委结果失败: {e}")
         # 不中断流程，继续执行
     
-    # 4. 阶段二：评委群聊讨论
-    debate_result = None
+    # 4. 阶段二：评委群聊讨论（发言逐条落库）
+    # 只传递有效的结果（有choice的）
+    valid_results = [r for r in judge_results if r.get("choice")]
+    debate_result = await _run_and_save_binary_choice_debate(
+        entry_id=request.entry_id,
+        question=request.question,
+        option_a=request.option_a,
+        option_b=request.option_b,
+        judge_results=valid_results,
+        timer=timer,
+    )
     
+    # 保存分阶段耗时
     try:
-        # 只传递有效的结果（有choice的）
-        valid_results = [r for r in judge_results if r.get("choice")]
-        
-        stage_two_result = await run_binary_choice_debate(
+        await db_writer.submit(
+            save_binary_choice_entry_timings,
             entry_id=request.entry_id,
-            question=request.question,
-            option_a=request.option_a,
-            option_b=request.option_b,
-            judge_results=valid_results,
+            timings=timer.to_dict(),
         )
-        
-        if "error" in stage_two_result:
-            logger.warning(f"阶段二讨论失败: {stage_two_result['error']}")
-        else:
-            debate_messages = stage_two_result["messages"]
-            participants = stage_two_result.get("participants", [])
-            debug_info = stage_two_result.get("debug_info", {})
-            
-            logger.info(f"阶段二讨论完成，共 {len(debate_messages)} 条消息")
-            
-            # 5. 保存讨论记录
-            try:
-                debate_id = f"{request.entry_id}_debate"
-                await save_binary_choice_debate(
-                    db=db,
-                    entry_id=request.entry_id,
-                    debate_id=debate_id,
-                    participants=participants,
-                    messages=debate_messages,
-                    config={"max_messages": 12},
-                    judge_contexts=debug_info.get("judge_contexts"),
-                    selector_prompt=debug_info.get("selector_prompt"),
-                    initial_message=debug_info.get("initial_message"),
-                )
-                logger.info(f"讨论记录保存成功")
-                
-                # 构建返回的 debate 对象
-                debate_result = BinaryChoiceDebateResponse(
-                    debate_id=debate_id,
-                    participants=participants,
-                    messages=[
-                        BinaryChoiceDebateMessage(
-                            sequence=idx + 1,
-                            speaker=msg["speaker"],
-                            content=msg["content"],
-                        )
-                        for idx, msg in enumerate(debate_messages)
-                    ],
-                )
-                
-            except Exception as e:
-                logger.error(f"保存讨论记录失败: {e}")
-        
     except Exception as e:
-        logger.error(f"阶段二讨论异常: {e}")
-        # 不中断流程，返回时 debate 为 None
+        logger.warning(f"保存耗时数据失败: {e}")
     
     # 6. 构建响应
     judge_result_responses = [
@@ -208,7 +238,231 @@ async def judge_binary_choice(
     logger.success(f"二选一评判流程完成: entry_id={request.entry_id}")
     logger.success(f"投票结果: A={choice_a_count}, B={choice_b_count}")
     
-    return response
+    return response, timer.server_timing_header()
+
+
+async def _run_and_save_binary_choice_debate(
+    entry_id: str,
+    question: str,
+    option_a: str,
+    option_b: str,
+    judge_results: list[dict],
+    timer: PhaseTimer,
+    checkpoint: Optional[DebateCheckpoint] = None,
+) -> Optional[BinaryChoiceDebateResponse]:
+    """
+    运行二选一阶段二讨论并逐条保存讨论记录
+    
+    每条发言产生后立即落库并保存 team 状态断点，讨论失败或中断后可通过恢复接口继续。
+    
+    Returns:
+        BinaryChoiceDebateResponse，讨论失败时为 None
+    """
+    debate_id = f"{entry_id}_debate"
+    
+    try:
+        with timer.phase("db_save_debate"):
+            await db_writer.submit(
+                open_binary_choice_debate,
+                entry_id=entry_id,
+                debate_id=debate_id,
+                config={"max_messages": 12},
+                resume=checkpoint is not None,
+            )
+    except Exception as e:
+        logger.error(f"创建讨论会话失败: {e}")
+        return None
+    
+    persisted = len(checkpoint.messages) if checkpoint else 0
+    
+    async def save_info(info: dict) -> None:
+        with timer.phase("db_save_debate"):
+            await db_writer.submit(save_binary_choice_debate_info, debate_id=debate_id, **info)
+    
+    async def save_message(message: dict) -> None:
+        nonlocal persisted
+        persisted += 1
+        try:
+            with timer.phase("db_save_debate"):
+                await db_writer.submit(
+                    append_binary_choice_message, debate_id=debate_id, sequence=persisted, msg_data=message
+                )
+        except Exception as e:
+            logger.error(f"保存讨论消息失败: sequence={persisted} - {e}")
+    
+    async def save_checkpoint(sequence: int, team_state: dict) -> None:
+        with timer.phase("db_save_debate"):
+            await db_writer.submit(
+                checkpoint_binary_choice_debate, debate_id=debate_id, sequence=sequence, team_state=team_state
+            )
+    
+    try:
+        stage_two_result = await run_binary_choice_debate(
+            entry_id=entry_id,
+            question=question,
+            option_a=option_a,
+            option_b=option_b,
+            judge_results=judge_results,
+            timer=timer,
+            on_message=save_message,
+            on_start=save_info,
+            on_checkpoint=save_checkpoint,
+            checkpoint=checkpoint,
+        )
+    except Exception as e:
+        logger.error(f"阶段二讨论异常: {e}")
+        stage_two_result = {"error": f"阶段二讨论异常: {str(e)}"}
+    
+    error = stage_two_result.get("error")
+    try:
+        await db_writer.submit(
+            finish_binary_choice_debate,
+            debate_id=debate_id,
+            status=SESSION_STATUS_FAILED if error else SESSION_STATUS_COMPLETED,
+            stop_reason=stage_two_result.get("stop_reason"),
+        )
+    except Exception as e:
+        logger.error(f"更新讨论状态失败: {e}")
+        return None
+    
+    if error:
+        # 不中断流程，返回时 debate 为 None
+        logger.warning(f"阶段二讨论失败: {error}")
+        return None
+    
+    debate_messages = stage_two_result["messages"]
+    logger.info(f"阶段二讨论完成，共 {len(debate_messages)} 条消息")
+    
+    return BinaryChoiceDebateResponse(
+        debate_id=debate_id,
+        participants=stage_two_result.get("participants", []),
+        messages=[
+            BinaryChoiceDebateMessage(
+                sequence=idx + 1,
+                speaker=msg["speaker"],
+                content=msg["content"],
+            )
+            for idx, msg in enumerate(debate_messages)
+        ],
+    )
+
+
+@router.post("/entry/{entry_id}/debate/resume", response_model=BinaryChoiceDebateResponse)
+async def resume_binary_choice_debate(entry_id: str):
+    """
+    从最后一条已落库的发言继续被中断（或失败）的二选一讨论
+    
+    同步等待讨论完成后返回完整讨论；同一作品的并发恢复请求只执行一次。
+    讨论仍在运行（原评判请求或另一次恢复）时返回 409。
+    
+    Args:
+        entry_id: 作品 ID
+    
+    Returns:
+        完整的讨论记录
+    """
+    async def pipeline() -> BinaryChoiceDebateResponse:
+        async with binary_choice_admission.slot():
+            return await _resume_binary_choice(entry_id)
+    
+    return await coalescer.run(f"binary_choice_resume:{entry_id}", pipeline)
+
+
+async def _resume_binary_choice(entry_id: str) -> BinaryChoiceDebateResponse:
+    with live_debates.hold("binary_choice", entry_id):
+        return await _resume_binary_choice_debate(entry_id)
+
+
+async def _resume_binary_choice_debate(entry_id: str) -> BinaryChoiceDebateResponse:
+    # 只读会话用完即归还，讨论期间不占用读连接
+    async with AsyncSessionLocal() as db:
+        entry = await get_binary_choice_entry_by_id(db=db, entry_id=entry_id)
+    if not entry:
+        raise HTTPException(status_code=404, detail=f"作品不存在: {entry_id}")
+    if not entry.debate_sessions:
+        raise HTTPException(status_code=404, detail=f"没有可恢复的讨论: {entry_id}")
+    
+    debate_session = entry.debate_sessions[0]
+    if debate_session.status in (None, SESSION_STATUS_COMPLETED):
+        raise HTTPException(status_code=409, detail=f"讨论已完成，无需恢复: {entry_id}")
+    
+    messages = [
+        {
+            "speaker": msg.speaker,
+            "content": msg.content,
+            "context_start": msg.context_start,
+            "context_end": msg.context_end,
+            "raw_response": msg.raw_response,
+            "model_name": msg.model_name,
+            "metrics": msg.metrics,
+        }
+        for msg in sorted(debate_session.messages, key=lambda m: m.sequence)
+    ]
+    
+    checkpoint = None
+    if debate_session.initial_message:
+        # 断点落后于已落库的发言时（保存状态失败），不使用该状态，改为重放发言
+        team_state = debate_session.team_state
+        if debate_session.checkpoint_sequence != len(messages):
+            team_state = None
+        checkpoint = DebateCheckpoint(
+            initial_message=debate_session.initial_message,
+            messages=messages,
+            team_state=team_state,
+        )
+    
+    # 与首次评判一致，只传递有效的结果（有 choice 的）
+    judge_results = [
+        {
+            "judge_id": jr.judge_id,
+            "judge_display_name": jr.judge_display_name,
+            "choice": jr.choice,
+            "choice_label": jr.choice_label,
+            "reasoning": jr.reasoning,
+            "inner_monologue": jr.inner_monologue,
+        }
+        for jr in entry.judge_results
+        if jr.choice
+    ]
+    
+    logger.info(f"恢复二选一讨论: entry_id={entry_id}, 已有 {len(messages)} 条发言")
+    timer = PhaseTimer()
+    debate_result = await _run_and_save_binary_choice_debate(
+        entry_id=entry_id,
+        question=entry.question,
+        option_a=entry.option_a,
+        option_b=entry.option_b,
+        judge_results=judge_results,
+        timer=timer,
+        checkpoint=checkpoint,
+    )
+    
+    try:
+        await db_writer.submit(save_binary_choice_entry_timings, entry_id=entry_id, timings=timer.to_dict(), merge=True)
+    except Exception as e:
+        logger.warning(f"保存耗时数据失败: {e}")
+    
+    if debate_result is None:
+        raise HTTPException(status_code=500, detail=f"恢复讨论失败: {entry_id}")
+    return debate_result
+
+
+@router.get("/entry/{entry_id}/stream")
+async def stream_binary_choice(entry_id: str):
+    """
+    以 SSE 方式流式推送二选一阶段一进度（需在请求体中自行指定 entry_id，连接时先补发已产生的事件）
+    
+    - event: field     评委输出中的字段已完整（inner_monologue / choice），为临时值
+    - event: decision  某个选项已获得过半票数，剩余评委无法改变结果（仅上报，剩余评委照常完成）
+    - event: judge     某位评委的调用结束
+    - event: result    阶段一结束，推送解析后的票数（以此为准）
+    
+    评判请求尚未开始（或进度已过保留时间）时返回 404，可稍后重试。
+    """
+    progress = stage_one_progress.get(FLOW_BINARY_CHOICE, entry_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail=f"没有该作品的阶段一进度: {entry_id}")
+    return StreamingResponse(progress_event_stream(progress), media_type="text/event-stream")
 
 
 @router.get("/entry/{entry_id}", response_model=BinaryChoiceResponse)
@@ -315,6 +569,9 @@ async def get_binary_choice_debug_info(
             "extra_context": entry.extra_context,
             "created_at": entry.created_at.isoformat() if entry.created_at else None,
             
+            # 分阶段耗时
+            "timings": entry.timings,
+            
             # 阶段一：独立评分详情
             "stage_one": {
                 "judges": []
@@ -355,10 +612,14 @@ async def get_binary_choice_debug_info(
         
         # 收集阶段二群聊讨论详情
         for debate_session in entry.debate_sessions:
+            # 消息只保存上下文的序号范围，这里按完整记录还原
+            transcript = build_transcript(debate_session.initial_message, debate_session.messages)
             debate_debug = {
                 "debate_id": debate_session.debate_id,
                 "participants": debate_session.participants,
                 "config": debate_session.config,
+                "status": debate_session.status,
+                "stop_reason": debate_session.stop_reason,  # 讨论结束原因
                 
                 # 调试信息
                 "judge_contexts": debate_session.judge_contexts,
@@ -370,9 +631,10 @@ async def get_binary_choice_debug_info(
                         "sequence": msg.sequence,
                         "speaker": msg.speaker,
                         "content": msg.content,
-                        "context_history": msg.context_history,
+                        "context_history": message_context(transcript, msg),
                         "raw_response": msg.raw_response,
                         "model_name": msg.model_name,
+                        "metrics": msg.metrics,
                         "created_at": msg.created_at.isoformat() if msg.created_at else None,
                     }
                     for msg in sorted(debate_session.messages, key=lambda m: m.sequence)
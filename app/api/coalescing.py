@@ -0,0 +1,179 @@
+"""请求合并与幂等：相同请求只跑一次完整流程"""
+
+import asyncio
+import hashlib
+import json
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi import HTTPException
+from loguru import logger
+from pydantic import BaseModel
+
+from app.config import get_settings
+
+settings = get_settings()
+
+
+def request_fingerprint(request: BaseModel) -> str:
+    """计算请求体的稳定哈希（字段排序后序列化）"""
+    payload = json.dumps(request.model_dump(mode="json"), ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class RequestCoalescer:
+    """
+    进程内请求合并（single-flight）
+
+    同一个 key 同时只有一个"领头"请求真正执行，其余"跟随"请求等待领头请求的结果。
+    执行放在独立的 Task 中并用 shield 等待，任何一个客户端断开都不会取消共享的执行。
+    """
+
+    def __init__(self):
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._fingerprints: dict[str, Optional[str]] = {}
+
+    @property
+    def inflight_count(self) -> int:
+        return len(self._inflight)
+
+    async def run(
+        self,
+        key: str,
+        factory: Callable[[], Awaitable[Any]],
+        fingerprint: Optional[str] = None,
+    ) -> Any:
+        """
+        执行（或加入）key 对应的请求
+
+        Args:
+            key: 合并 key（如 entry_id + 输入哈希）
+            factory: 创建实际执行协程的函数（只有领头请求会调用）
+            fingerprint: 请求体哈希；key 本身不含输入哈希时（Idempotency-Key）传入，
+                与进行中请求的哈希不一致时返回 422，不加入领头请求
+
+        Returns:
+            领头请求的执行结果（异常同样会传递给所有跟随者）
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(factory())
+            self._inflight[key] = task
+            self._fingerprints[key] = fingerprint
+            task.add_done_callback(lambda _: self._forget(key))
+        elif self._fingerprints.get(key) != fingerprint:
+            raise HTTPException(
+                status_code=422,
+                detail="Idempotency-Key 已被用于不同的请求内容",
+            )
+        else:
+            logger.info(f"合并重复请求，等待进行中的结果: key={key[:80]}")
+
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str) -> None:
+        self._inflight.pop(key, None)
+        self._fingerprints.pop(key, None)
+
+
+@dataclass
+class _StoredResponse:
+    fingerprint: str
+    response: Any
+    expires_at: float
+
+
+class IdempotencyStore:
+    """
+    Idempotency-Key 响应缓存
+
+    - 同一个 key 在有效期内重复提交：直接回放已保存的响应
+    - 同一个 key 搭配不同的请求体：返回 422，避免误用
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._responses: dict[str, _StoredResponse] = {}
+
+    def get(self, key: str, fingerprint: str) -> Optional[Any]:
+        """获取已保存的响应（过期或不存在返回 None）"""
+        self._prune()
+        stored = self._responses.get(key)
+        if stored is None:
+            return None
+
+        if stored.fingerprint != fingerprint:
+            raise HTTPException(
+                status_code=422,
+                detail="Idempotency-Key 已被用于不同的请求内容",
+            )
+        return stored.response
+
+    def put(self, key: str, fingerprint: str, response: Any) -> None:
+        """保存成功的响应"""
+        if self.ttl_seconds <= 0:
+            return
+        self._responses[key] = _StoredResponse(
+            fingerprint=fingerprint,
+            response=response,
+            expires_at=time.time() + self.ttl_seconds,
+        )
+
+    def _prune(self) -> None:
+        now = time.time()
+        expired = [k for k, v in self._responses.items() if v.expires_at <= now]
+        for k in expired:
+            del self._responses[k]
+
+
+async def run_deduplicated(
+    scope: str,
+    request: BaseModel,
+    entry_id: Optional[str],
+    idempotency_key: Optional[str],
+    factory: Callable[[], Awaitable[Any]],
+) -> tuple[Any, bool]:
+    """
+    带合并和幂等控制地执行一次评判流程
+
+    Args:
+        scope: 接口范围（scoring / binary_choice），不同接口的 key 互不干扰
+        request: 请求体（用于计算输入哈希）
+        entry_id: 调用方指定的作品 ID（未指定时不做按输入合并）
+        idempotency_key: Idempotency-Key 请求头
+        factory: 创建实际执行协程的函数
+
+    Returns:
+        (结果, 是否为回放的已保存响应)
+    """
+    fingerprint = request_fingerprint(request)
+
+    if idempotency_key:
+        store_key = f"{scope}:{idempotency_key}"
+        stored = idempotency_store.get(store_key, fingerprint)
+        if stored is not None:
+            logger.info(f"Idempotency-Key 命中，回放已保存的响应: {idempotency_key}")
+            return stored, True
+        coalesce_key = f"{scope}:idem:{idempotency_key}"
+    elif entry_id and settings.request_coalescing_enabled:
+        store_key = None
+        coalesce_key = f"{scope}:entry:{entry_id}:{fingerprint}"
+    else:
+        return await factory(), False
+
+    if not store_key:
+        return await coalescer.run(coalesce_key, factory), False
+
+    async def lead():
+        # 只有领头请求保存响应（在共享的执行中完成，领头客户端断开也会保存）
+        result = await factory()
+        idempotency_store.put(store_key, fingerprint, result)
+        return result
+
+    return await coalescer.run(coalesce_key, lead, fingerprint), False
+
+
+# 全局实例
+coalescer = RequestCoalescer()
+idempotency_store = IdempotencyStore(ttl_seconds=settings.idempotency_ttl_seconds)
@@ -0,0 +1,220 @@
+"""后台讨论任务管理（阶段二与评分响应解耦）"""
+
+import asyncio
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
+
+from fastapi import HTTPException
+from loguru import logger
+
+from app.config import get_settings
+
+
+# 讨论状态
+DEBATE_STATUS_PENDING = "pending"
+DEBATE_STATUS_RUNNING = "running"
+DEBATE_STATUS_COMPLETED = "completed"
+DEBATE_STATUS_FAILED = "failed"
+DEBATE_STATUS_NOT_STARTED = "not_started"
+DEBATE_STATUS_INTERRUPTED = "interrupted"  # 数据库中会话仍为 running，但讨论进程已不存在
+
+FINISHED_STATUSES = {DEBATE_STATUS_COMPLETED, DEBATE_STATUS_FAILED}
+
+
+@dataclass
+class DebateTask:
+    """单个后台讨论任务的运行状态"""
+    entry_id: str
+    status: str = DEBATE_STATUS_PENDING
+    debate_id: Optional[str] = None
+    participants: list[str] = field(default_factory=list)
+    messages: list[dict] = field(default_factory=list)
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    # 用于通知流式订阅者有新消息或状态变更
+    changed: asyncio.Condition = field(default_factory=asyncio.Condition)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+
+class DebateTaskRegistry:
+    """
+    后台讨论任务注册表（进程内）
+
+    - 保存每个 entry 的讨论状态和已产生的消息，供轮询/流式接口读取
+    - 持有 asyncio.Task 的强引用，避免任务被垃圾回收
+    - 已结束的任务在保留时间后清理（结果已落库，可从数据库查询）
+    """
+
+    def __init__(self, retention_seconds: float = 3600):
+        self.retention_seconds = retention_seconds
+        self._tasks: dict[str, DebateTask] = {}
+        self._running: set[asyncio.Task] = set()
+
+    def get(self, entry_id: str) -> Optional[DebateTask]:
+        """获取某个作品的讨论任务"""
+        return self._tasks.get(entry_id)
+
+    def start(
+        self,
+        entry_id: str,
+        runner: Callable[[DebateTask], Awaitable[None]],
+        on_finish: Optional[Callable[[], None]] = None,
+    ) -> DebateTask:
+        """
+        启动后台讨论任务
+
+        Args:
+            entry_id: 作品 ID
+            runner: 实际执行讨论的协程函数，接收 DebateTask 用于上报进度
+            on_finish: 任务状态变为结束后调用（归还调用方为讨论占用的资源）
+
+        同一作品不会同时有两个任务：调用方启动前已在 live_debates 中登记，重复启动在登记时返回 409。
+
+        Returns:
+            新建的 DebateTask
+        """
+        self._prune()
+
+        debate_task = DebateTask(entry_id=entry_id)
+        self._tasks[entry_id] = debate_task
+
+        task = asyncio.create_task(self._run(debate_task, runner, on_finish))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+        logger.info(f"后台讨论任务已创建: entry_id={entry_id}")
+        return debate_task
+
+    async def _run(
+        self,
+        debate_task: DebateTask,
+        runner: Callable[[DebateTask], Awaitable[None]],
+        on_finish: Optional[Callable[[], None]] = None,
+    ) -> None:
+        try:
+            await self.set_status(debate_task, DEBATE_STATUS_RUNNING)
+            try:
+                await runner(debate_task)
+            except Exception as e:
+                logger.error(f"后台讨论任务异常: entry_id={debate_task.entry_id} - {e}")
+                debate_task.error = str(e)
+                await self.set_status(debate_task, DEBATE_STATUS_FAILED)
+                return
+
+            if not debate_task.finished:
+                await self.set_status(debate_task, DEBATE_STATUS_COMPLETED)
+        finally:
+            if on_finish:
+                on_finish()
+
+    async def add_message(self, debate_task: DebateTask, message: dict) -> None:
+        """追加一条讨论消息并通知订阅者"""
+        async with debate_task.changed:
+            debate_task.messages.append(message)
+            debate_task.changed.notify_all()
+
+    async def set_status(
+        self,
+        debate_task: DebateTask,
+        status: str,
+        error: Optional[str] = None,
+    ) -> None:
+        """更新任务状态并通知订阅者"""
+        async with debate_task.changed:
+            debate_task.status = status
+            if error:
+                debate_task.error = error
+            if status in FINISHED_STATUSES:
+                debate_task.finished_at = time.time()
+            debate_task.changed.notify_all()
+
+    def _prune(self) -> None:
+        """清理超过保留时间的已结束任务"""
+        now = time.time()
+        expired = [
+            entry_id
+            for entry_id, t in self._tasks.items()
+            if t.finished and t.finished_at and now - t.finished_at > self.retention_seconds
+        ]
+        for entry_id in expired:
+            del self._tasks[entry_id]
+
+
+class LiveDebateClaim:
+    """hold() 产出的登记句柄；detach() 之后登记不随 with 结束归还，由调用方（如后台讨论任务）负责"""
+
+    def __init__(self, release: Callable[[], None]):
+        self._release = release
+        self.detached = False
+
+    def detach(self) -> Callable[[], None]:
+        """把登记交给调用方，返回只生效一次的归还函数"""
+        self.detached = True
+        return self._release
+
+
+class LiveDebates:
+    """
+    本进程中正在运行的讨论（同步 / 后台、评分 / 二选一）
+
+    讨论运行期间数据库中的会话状态一直是 running，只看数据库无法区分"正在运行"和"进程已中断"；
+    同步模式的讨论也不进入 DebateTaskRegistry。所有讨论运行前都在这里登记，
+    查询状态时据此判断是否中断，恢复讨论前据此拒绝在进行中的讨论上再启动一次。
+
+    只覆盖当前进程：多个 Worker 时请把同一作品的请求路由到同一个 Worker。
+    """
+
+    def __init__(self):
+        self._keys: set[str] = set()
+
+    @staticmethod
+    def key(scope: str, entry_id: str) -> str:
+        return f"{scope}:{entry_id}"
+
+    def is_live(self, scope: str, entry_id: str) -> bool:
+        return self.key(scope, entry_id) in self._keys
+
+    def claim(self, scope: str, entry_id: str) -> Callable[[], None]:
+        """
+        登记一场讨论，已有进行中的讨论时返回 409
+
+        Returns:
+            归还登记的函数（重复调用无副作用）
+        """
+        key = self.key(scope, entry_id)
+        if key in self._keys:
+            raise HTTPException(status_code=409, detail=f"讨论正在进行中: {entry_id}")
+        self._keys.add(key)
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                self._keys.discard(key)
+
+        return release
+
+    @contextmanager
+    def hold(self, scope: str, entry_id: str):
+        """with live_debates.hold(scope, entry_id) as live: ... 讨论运行期间保持登记（live.detach() 可交给后台任务）"""
+        release = self.claim(scope, entry_id)
+        live = LiveDebateClaim(release)
+        try:
+            yield live
+        finally:
+            if not live.detached:
+                release()
+
+
+# 全局注册表
+live_debates = LiveDebates()
+debate_registry = DebateTaskRegistry(
+    retention_seconds=get_settings().debate_task_retention_seconds,
+)
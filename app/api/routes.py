@@ -1,8 +1,11 @@
 """API 路由定义"""
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from typing import Awaitable, Callable, Optional
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Response, Header
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from loguru import logger
+import json
 import shutil
 from pathlib import Path
 import uuid
@@ -15,16 +18,42 @@ from app.models.schemas import (
     DebateResponse,
     DebateMessageResponse,
     DimensionScore,
+    DebateStatusResponse,
 )
-from app.db.database import get_db
+from app.db.database import get_db, db_writer
 from app.db.crud import (
     save_entry,
     save_judge_results,
-    save_debate_session,
+    save_entry_timings,
     get_entry_by_id,
+    open_debate_session,
+    append_debate_message,
+    checkpoint_debate_session,
+    save_debate_session_info,
+    finish_debate_session,
+    SESSION_STATUS_RUNNING,
+    SESSION_STATUS_COMPLETED,
+    SESSION_STATUS_FAILED,
 )
 from app.judges import score_image_with_all_judges, run_debate_for_entry
+from app.judges.debate_checkpoint import DebateCheckpoint
 from app.judges.prompts import COMMON_SCORING_GUIDE, JUDGE_PERSONAS, DEBATE_MODE_INSTRUCTION
+from app.api.debate_tasks import (
+    debate_registry,
+    live_debates,
+    DebateTask,
+    LiveDebateClaim,
+    DEBATE_STATUS_COMPLETED,
+    DEBATE_STATUS_FAILED,
+    DEBATE_STATUS_NOT_STARTED,
+    DEBATE_STATUS_INTERRUPTED,
+    DEBATE_STATUS_RUNNING,
+)
+from app.api.coalescing import run_deduplicated
+from app.api.stage_one_progress import FLOW_SCORING, stage_one_progress, progress_event_stream
+from app.api.admission import AdmissionSlot, scoring_admission, binary_choice_admission
+from app.db.transcript import build_transcript, message_context
+from app.timing import PhaseTimer
 
 router = APIRouter()
 
@@ -58,7 +87,8 @@ async def upload_file(file: UploadFile = File(...)):
 @router.post("/judge_entry", response_model=JudgeEntryResponse)
 async def judge_entry(
     request: JudgeEntryRequest,
-    db: AsyncSession = Depends(get_db),
+    http_response: Response,
+    idempotency_key: Optional[str] = Header(default=None, alias="Idempotency-Key"),
 ):
     """
     评委评分完整流程（阶段一 + 阶段二）
@@ -69,24 +99,76 @@ async def judge_entry(
     4. 阶段二：评委群聊讨论
     5. 保存讨论记录
     6. 返回完整结果
+    
+    当 background_debate=True 时，第 3 步完成后立即返回评分结果，
+    阶段二在后台运行，可通过 debate_url 轮询或 debate_stream_url 流式获取。
+    
+    各阶段耗时通过 Server-Timing 响应头返回，并随作品一起保存。
+    
+    重复请求处理：
+    - 相同 entry_id + 相同输入的并发请求只执行一次，其余请求等待同一结果
+    - 携带 Idempotency-Key 时，有效期内的重复提交直接回放已保存的响应
     """
     logger.info(f"收到评分请求: entry_id={request.entry_id}, type={request.competition_type}")
     
+    (response, server_timing), replayed = await run_deduplicated(
+        scope="scoring",
+        request=request,
+        entry_id=request.entry_id,
+        idempotency_key=idempotency_key,
+        factory=lambda: _judge_entry_pipeline(request),
+    )
+    
+    http_response.headers["Server-Timing"] = server_timing
+    if replayed:
+        http_response.headers["Idempotent-Replayed"] = "true"
+    
+    return response
+
+
+async def _judge_entry_pipeline(request: JudgeEntryRequest) -> tuple[JudgeEntryResponse, str]:
+    """
+    执行一次完整评分流程
+    
+    写操作通过写入队列提交，不依赖 HTTP 请求的会话：合并后的请求可能比发起它的 HTTP 请求活得更久。
+    执行前需获取准入名额，繁忙时排队或返回 429；后台讨论模式下名额由讨论任务持有到讨论结束。
+    
+    Returns:
+        (响应, Server-Timing 响应头)
+    """
+    async with scoring_admission.slot() as held:
+        return await _run_judge_entry(request, held)
+
+
+async def _run_judge_entry(
+    request: JudgeEntryRequest, held: Optional[AdmissionSlot] = None
+) -> tuple[JudgeEntryResponse, str]:
     # 自动生成 entry_id（如果未提供）
     import uuid
     if not request.entry_id or request.entry_id.strip() == "":
         request.entry_id = f"entry_{uuid.uuid4().hex[:12]}"
         logger.info(f"自动生成 entry_id: {request.entry_id}")
     
+    # 在阶段一之前登记讨论：同一作品已有讨论在运行时直接返回 409，不为阶段一白白调用模型
+    with live_debates.hold("scoring", request.entry_id) as live:
+        return await _score_and_debate(request, held, live)
+
+
+async def _score_and_debate(
+    request: JudgeEntryRequest, held: Optional[AdmissionSlot], live: LiveDebateClaim
+) -> tuple[JudgeEntryResponse, str]:
+    timer = PhaseTimer()
+    
     try:
         # 1. 保存作品信息
-        entry = await save_entry(
-            db=db,
-            entry_id=request.entry_id,
-            image_url=request.image_url,
-            competition_type=request.competition_type,
-            extra_text=request.extra_text,
-        )
+        with timer.phase("db_save_entry"):
+            entry = await db_writer.submit(
+                save_entry,
+                entry_id=request.entry_id,
+                image_url=request.image_url,
+                competition_type=request.competition_type,
+                extra_text=request.extra_text,
+            )
         logger.info(f"作品保存成功: {entry.entry_id}")
         
     except Exception as e:
@@ -105,14 +187,28 @@ async def judge_entry(
             custom_personas = request.custom_prompts.judge_personas
             custom_debate_instruction = request.custom_prompts.debate_instruction
         
-        stage_one_result = await score_image_with_all_judges(
-            image_url=request.image_url,
-            entry_id=request.entry_id,
-            competition_type=request.competition_type,
-            extra_text=request.extra_text,
-            custom_scoring_guide=custom_scoring_guide,
-            custom_personas=custom_personas,
-        )
+        # 字段一完整就推送给 /judge_entry/{entry_id}/scoring/stream 的订阅者
+        progress = stage_one_progress.start(FLOW_SCORING, request.entry_id)
+        stage_one_result = {"error": "阶段一评分中断"}
+        try:
+            stage_one_result = await score_image_with_all_judges(
+                image_url=request.image_url,
+                entry_id=request.entry_id,
+                competition_type=request.competition_type,
+                extra_text=request.extra_text,
+                custom_scoring_guide=custom_scoring_guide,
+                custom_personas=custom_personas,
+                timer=timer,
+                on_progress=lambda event, data: stage_one_progress.publish(progress, event, data),
+            )
+        finally:
+            await stage_one_progress.finish(progress, "result", {
+                "error": stage_one_result.get("error"),
+                "judge_results": [
+                    {"judge_id": r["judge_id"], "overall_score": r.get("overall_score"), "one_liner": r.get("one_liner")}
+                    for r in stage_one_result.get("judge_results", [])
+                ],
+            })
         
         if "error" in stage_one_result:
             logger.error(f"阶段一评分失败: {stage_one_result['error']}")
@@ -131,7 +227,8 @@ async def judge_entry(
     
     # 3. 保存评分结果
     try:
-        await save_judge_results(db=db, entry_id=request.entry_id, judge_results=judge_results)
+        with timer.phase("db_save_results"):
+            await db_writer.submit(save_judge_results, entry_id=request.entry_id, judge_results=judge_results)
         logger.info(f"评分结果保存成功")
         
     except Exception as e:
@@ -140,62 +237,41 @@ async def judge_entry(
     
     # 4. 阶段二：评委群聊讨论
     debate_result = None
+    debate_status = None
+    debate_kwargs = dict(
+        entry_id=request.entry_id,
+        competition_type=request.competition_type,
+        sorted_results=sorted_results,
+        custom_scoring_guide=custom_scoring_guide,
+        custom_personas=custom_personas,
+        custom_debate_instruction=custom_debate_instruction,
+    )
     
-    try:
-        stage_two_result = await run_debate_for_entry(
+    if request.background_debate:
+        # 后台模式：评分已落库，讨论交给后台任务，立即返回（讨论结束时归还登记和准入名额）
+        release_live = live.detach()
+        release_slot = held.detach() if held else (lambda: None)
+
+        def finish_debate() -> None:
+            release_slot()
+            release_live()
+
+        debate_task = debate_registry.start(
             entry_id=request.entry_id,
-            competition_type=request.competition_type,
-            judge_results=sorted_results,  # 使用排序后的结果
-            custom_scoring_guide=custom_scoring_guide,
-            custom_personas=custom_personas,
-            custom_debate_instruction=custom_debate_instruction,
+            runner=lambda task: _run_background_debate(task, **debate_kwargs),
+            on_finish=finish_debate,
         )
-        
-        if "error" in stage_two_result:
-            logger.warning(f"阶段二讨论失败: {stage_two_result['error']}")
-        else:
-            debate_messages = stage_two_result["messages"]
-            participants = stage_two_result.get("participants", [])
-            debug_info = stage_two_result.get("debug_info", {})
-            
-            logger.info(f"阶段二讨论完成，共 {len(debate_messages)} 条消息")
-            
-            # 5. 保存讨论记录（包含调试信息）
-            try:
-                debate_id = f"{request.entry_id}_debate"
-                await save_debate_session(
-                    db=db,
-                    entry_id=request.entry_id,
-                    debate_id=debate_id,
-                    participants=participants,
-                    messages=debate_messages,
-                    config={"max_messages": 12},
-                    judge_contexts=debug_info.get("judge_contexts"),
-                    selector_prompt=debug_info.get("selector_prompt"),
-                    initial_message=debug_info.get("initial_message"),
-                )
-                logger.info(f"讨论记录保存成功")
-                
-                # 构建返回的 debate 对象
-                debate_result = DebateResponse(
-                    debate_id=debate_id,
-                    participants=participants,
-                    messages=[
-                        DebateMessageResponse(
-                            sequence=idx + 1,
-                            speaker=msg["speaker"],
-                            content=msg["content"],
-                        )
-                        for idx, msg in enumerate(debate_messages)
-                    ],
-                )
-                
-            except Exception as e:
-                logger.error(f"保存讨论记录失败: {e}")
-        
+        debate_status = debate_task.status
+    else:
+        # 5. 同步模式：等待讨论完成并保存
+        debate_result, _ = await _run_and_save_debate(timer=timer, **debate_kwargs)
+        debate_status = DEBATE_STATUS_COMPLETED if debate_result else DEBATE_STATUS_FAILED
+    
+    # 保存分阶段耗时（后台讨论的耗时在讨论结束后合并）
+    try:
+        await db_writer.submit(save_entry_timings, entry_id=request.entry_id, timings=timer.to_dict())
     except Exception as e:
-        logger.error(f"阶段二讨论异常: {e}")
-        # 不中断流程，返回时 debate 为 None
+        logger.warning(f"保存耗时数据失败: {e}")
     
     # 6. 构建响应
     judge_result_responses = [
@@ -238,11 +314,175 @@ async def judge_entry(
         judge_results=judge_result_responses,
         sorted_results=sorted_result_responses,
         debate=debate_result,
+        debate_status=debate_status,
+        debate_url=f"/api/judge_entry/{request.entry_id}/debate",
+        debate_stream_url=(
+            f"/api/judge_entry/{request.entry_id}/debate/stream" if request.background_debate else None
+        ),
     )
     
     logger.success(f"完整评分流程完成: entry_id={request.entry_id}, 综合评分={average_score}")
     
-    return response
+    return response, timer.server_timing_header()
+
+
+def _build_debate_response(debate_id: str, participants: list[str], messages: list[dict]) -> DebateResponse:
+    """根据讨论消息列表构建 DebateResponse"""
+    return DebateResponse(
+        debate_id=debate_id,
+        participants=participants,
+        messages=[
+            DebateMessageResponse(
+                sequence=idx + 1,
+                speaker=msg["speaker"],
+                content=msg["content"],
+            )
+            for idx, msg in enumerate(messages)
+        ],
+    )
+
+
+async def _run_and_save_debate(
+    entry_id: str,
+    competition_type: str,
+    sorted_results: list[dict],
+    custom_scoring_guide: Optional[str] = None,
+    custom_personas: Optional[dict] = None,
+    custom_debate_instruction: Optional[str] = None,
+    on_message: Optional[Callable[[dict], Awaitable[None]]] = None,
+    timer: Optional[PhaseTimer] = None,
+    checkpoint: Optional[DebateCheckpoint] = None,
+) -> tuple[Optional[DebateResponse], Optional[str]]:
+    """
+    运行阶段二讨论并逐条保存讨论记录
+    
+    讨论开始前先创建会话，每条发言产生后立即落库并保存 team 状态断点，
+    进程中断后可通过恢复接口从最后一条已落库的发言继续。
+    
+    Args:
+        checkpoint: 断点数据（恢复讨论时传入）
+    
+    Returns:
+        (DebateResponse 或 None, 错误信息或 None)
+    """
+    timer = timer or PhaseTimer()
+    debate_id = f"{entry_id}_debate"
+    
+    try:
+        with timer.phase("db_save_debate"):
+            await db_writer.submit(
+                open_debate_session,
+                entry_id=entry_id,
+                debate_id=debate_id,
+                config={"max_messages": 12},
+                resume=checkpoint is not None,
+            )
+    except Exception as e:
+        logger.error(f"创建讨论会话失败: {e}")
+        return None, f"保存讨论记录失败: {str(e)}"
+    
+    persisted = len(checkpoint.messages) if checkpoint else 0
+    
+    async def save_info(info: dict) -> None:
+        with timer.phase("db_save_debate"):
+            await db_writer.submit(save_debate_session_info, debate_id=debate_id, **info)
+    
+    async def save_message(message: dict) -> None:
+        nonlocal persisted
+        persisted += 1
+        try:
+            with timer.phase("db_save_debate"):
+                await db_writer.submit(
+                    append_debate_message, debate_id=debate_id, sequence=persisted, msg_data=message
+                )
+        except Exception as e:
+            logger.error(f"保存讨论消息失败: sequence={persisted} - {e}")
+        if on_message:
+            await on_message(message)
+    
+    async def save_checkpoint(sequence: int, team_state: dict) -> None:
+        with timer.phase("db_save_debate"):
+            await db_writer.submit(
+                checkpoint_debate_session, debate_id=debate_id, sequence=sequence, team_state=team_state
+            )
+    
+    try:
+        stage_two_result = await run_debate_for_entry(
+            entry_id=entry_id,
+            competition_type=competition_type,
+            judge_results=sorted_results,  # 使用排序后的结果
+            custom_scoring_guide=custom_scoring_guide,
+            custom_personas=custom_personas,
+            custom_debate_instruction=custom_debate_instruction,
+            on_message=save_message,
+            timer=timer,
+            on_start=save_info,
+            on_checkpoint=save_checkpoint,
+            checkpoint=checkpoint,
+        )
+    except Exception as e:
+        logger.error(f"阶段二讨论异常: {e}")
+        stage_two_result = {"error": f"阶段二讨论异常: {str(e)}"}
+    
+    error = stage_two_result.get("error")
+    try:
+        await db_writer.submit(
+            finish_debate_session,
+            debate_id=debate_id,
+            status=SESSION_STATUS_FAILED if error else SESSION_STATUS_COMPLETED,
+            stop_reason=stage_two_result.get("stop_reason"),
+        )
+    except Exception as e:
+        logger.error(f"更新讨论状态失败: {e}")
+        if not error:
+            return None, f"保存讨论记录失败: {str(e)}"
+    
+    if error:
+        # 不中断流程，返回时 debate 为 None（已落库的发言可通过恢复接口继续）
+        logger.warning(f"阶段二讨论失败: {error}")
+        return None, error
+    
+    debate_messages = stage_two_result["messages"]
+    participants = stage_two_result.get("participants", [])
+    
+    logger.info(f"阶段二讨论完成，共 {len(debate_messages)} 条消息")
+    
+    return _build_debate_response(debate_id, participants, debate_messages), None
+
+
+async def _run_background_debate(debate_task: DebateTask, **debate_kwargs) -> None:
+    """后台讨论任务：运行并保存讨论"""
+    async def on_message(message: dict) -> None:
+        await debate_registry.add_message(debate_task, message)
+    
+    # 恢复讨论：先补上已落库的发言，轮询/流式接口看到的是完整讨论
+    checkpoint = debate_kwargs.get("checkpoint")
+    if checkpoint:
+        for message in checkpoint.messages:
+            await on_message(message)
+    
+    timer = PhaseTimer()
+    debate_result, error = await _run_and_save_debate(
+        on_message=on_message,
+        timer=timer,
+        **debate_kwargs,
+    )
+    try:
+        await db_writer.submit(
+            save_entry_timings,
+            entry_id=debate_task.entry_id,
+            timings=timer.to_dict(),
+            merge=True,
+        )
+    except Exception as e:
+        logger.warning(f"保存后台讨论耗时失败: {e}")
+    
+    if debate_result:
+        debate_task.debate_id = debate_result.debate_id
+        debate_task.participants = debate_result.participants
+        await debate_registry.set_status(debate_task, DEBATE_STATUS_COMPLETED)
+    else:
+        await debate_registry.set_status(debate_task, DEBATE_STATUS_FAILED, error=error)
 
 
 @router.get("/judge_entry/{entry_id}", response_model=EntryResponse)
@@ -318,12 +558,255 @@ async def get_entry_result(
     return response
 
 
+@router.get("/judge_entry/{entry_id}/debate", response_model=DebateStatusResponse)
+async def get_debate_status(
+    entry_id: str,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    查询作品的讨论状态（后台讨论模式下用于轮询）
+    
+    Args:
+        entry_id: 作品 ID
+    
+    Returns:
+        讨论状态及当前已产生的讨论内容
+    """
+    debate_task = debate_registry.get(entry_id)
+    
+    if debate_task and debate_task.status != DEBATE_STATUS_COMPLETED:
+        # 讨论进行中（或失败）：返回内存中已产生的消息
+        return DebateStatusResponse(
+            entry_id=entry_id,
+            debate_status=debate_task.status,
+            debate=_build_debate_response(
+                debate_id=debate_task.debate_id or f"{entry_id}_debate",
+                participants=debate_task.participants,
+                messages=debate_task.messages,
+            ),
+            error=debate_task.error,
+        )
+    
+    # 讨论已完成或任务已清理：从数据库读取
+    entry = await get_entry_by_id(db=db, entry_id=entry_id)
+    
+    if not entry:
+        raise HTTPException(status_code=404, detail=f"作品不存在: {entry_id}")
+    
+    if not entry.debate_sessions:
+        return DebateStatusResponse(entry_id=entry_id, debate_status=DEBATE_STATUS_NOT_STARTED)
+    
+    debate_session = entry.debate_sessions[0]
+    return DebateStatusResponse(
+        entry_id=entry_id,
+        debate_status=_session_debate_status(debate_session.status, live_debates.is_live("scoring", entry_id)),
+        debate=DebateResponse(
+            debate_id=debate_session.debate_id,
+            participants=debate_session.participants,
+            messages=[
+                DebateMessageResponse(
+                    sequence=msg.sequence,
+                    speaker=msg.speaker,
+                    content=msg.content,
+                )
+                for msg in sorted(debate_session.messages, key=lambda m: m.sequence)
+            ],
+        ),
+    )
+
+
+def _session_debate_status(session_status: Optional[str], live: bool) -> str:
+    """
+    数据库中会话状态 → 对外的讨论状态
+    
+    会话为 running 且本进程中没有正在运行的讨论（同步或后台），说明讨论进程已中断，可调用恢复接口继续。
+    """
+    if session_status == SESSION_STATUS_RUNNING:
+        return DEBATE_STATUS_RUNNING if live else DEBATE_STATUS_INTERRUPTED
+    if session_status == SESSION_STATUS_FAILED:
+        return DEBATE_STATUS_FAILED
+    return DEBATE_STATUS_COMPLETED
+
+
+@router.post("/judge_entry/{entry_id}/debate/resume", response_model=DebateStatusResponse)
+async def resume_debate(
+    entry_id: str,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    从最后一条已落库的发言继续被中断（或失败）的讨论
+    
+    讨论在后台继续运行，进度通过 /debate 轮询或 /debate/stream 订阅。
+    讨论占用一个评分准入名额直到结束，繁忙时排队或返回 429。
+    自定义提示词不落库，恢复时使用默认配置。
+    
+    Args:
+        entry_id: 作品 ID
+    
+    Returns:
+        讨论状态及已落库的讨论内容
+    """
+    # 同步或后台讨论仍在运行时返回 409；登记和准入名额在后台讨论结束时归还
+    release_live = live_debates.claim("scoring", entry_id)
+    try:
+        entry = await get_entry_by_id(db=db, entry_id=entry_id)
+        if not entry:
+            raise HTTPException(status_code=404, detail=f"作品不存在: {entry_id}")
+        if not entry.debate_sessions:
+            raise HTTPException(status_code=404, detail=f"没有可恢复的讨论: {entry_id}")
+        
+        debate_session = entry.debate_sessions[0]
+        if _session_debate_status(debate_session.status, live=False) == DEBATE_STATUS_COMPLETED:
+            raise HTTPException(status_code=409, detail=f"讨论已完成，无需恢复: {entry_id}")
+        # 恢复的讨论与完整评判流程共用准入名额，繁忙时排队或返回 429
+        release_slot = await scoring_admission.hold()
+    except BaseException:
+        release_live()
+        raise
+
+    def finish_debate() -> None:
+        release_slot()
+        release_live()
+    
+    messages = [
+        {
+            "speaker": msg.speaker,
+            "content": msg.content,
+            "context_start": msg.context_start,
+            "context_end": msg.context_end,
+            "raw_response": msg.raw_response,
+            "model_name": msg.model_name,
+            "metrics": msg.metrics,
+        }
+        for msg in sorted(debate_session.messages, key=lambda m: m.sequence)
+    ]
+    
+    checkpoint = None
+    if debate_session.initial_message:
+        # 断点落后于已落库的发言时（保存状态失败），不使用该状态，改为重放发言
+        team_state = debate_session.team_state
+        if debate_session.checkpoint_sequence != len(messages):
+            team_state = None
+        checkpoint = DebateCheckpoint(
+            initial_message=debate_session.initial_message,
+            messages=messages,
+            team_state=team_state,
+        )
+    
+    sorted_results = [
+        {
+            "judge_id": jr.judge_id,
+            "judge_display_name": jr.judge_display_name,
+            "overall_score": jr.overall_score,
+            "strengths": jr.strengths,
+            "weaknesses": jr.weaknesses,
+            "one_liner": jr.one_liner,
+        }
+        for jr in sorted(entry.judge_results, key=lambda jr: jr.overall_score, reverse=True)
+    ]
+    
+    logger.info(f"恢复讨论: entry_id={entry_id}, 已有 {len(messages)} 条发言")
+    debate_task = debate_registry.start(
+        entry_id=entry_id,
+        runner=lambda task: _run_background_debate(
+            task,
+            entry_id=entry_id,
+            competition_type=entry.competition_type,
+            sorted_results=sorted_results,
+            checkpoint=checkpoint,
+        ),
+        on_finish=finish_debate,
+    )
+    
+    return DebateStatusResponse(
+        entry_id=entry_id,
+        debate_status=debate_task.status,
+        debate=_build_debate_response(
+            debate_id=debate_session.debate_id,
+            participants=debate_session.participants,
+            messages=messages if checkpoint else [],
+        ),
+    )
+
+
+@router.get("/judge_entry/{entry_id}/debate/stream")
+async def stream_debate(entry_id: str):
+    """
+    以 SSE（text/event-stream）方式流式推送讨论消息
+    
+    - event: message  每条讨论消息（先补发已产生的消息）
+    - event: status   讨论结束时推送最终状态
+    """
+    debate_task = debate_registry.get(entry_id)
+    
+    if not debate_task:
+        raise HTTPException(
+            status_code=404,
+            detail=f"没有进行中的讨论: {entry_id}（已完成的讨论请使用 /api/judge_entry/{entry_id}/debate 查询）",
+        )
+    
+    async def event_stream():
+        sent = 0
+        while True:
+            async with debate_task.changed:
+                while sent >= len(debate_task.messages) and not debate_task.finished:
+                    await debate_task.changed.wait()
+                pending = debate_task.messages[sent:]
+                finished = debate_task.finished
+            
+            for msg in pending:
+                sent += 1
+                payload = {"sequence": sent, "speaker": msg["speaker"], "content": msg["content"]}
+                yield f"event: message\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+            
+            if finished and sent >= len(debate_task.messages):
+                payload = {"debate_status": debate_task.status, "error": debate_task.error}
+                yield f"event: status\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+                break
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
+@router.get("/judge_entry/{entry_id}/scoring/stream")
+async def stream_scoring(entry_id: str):
+    """
+    以 SSE 方式流式推送阶段一评分进度（需在请求体中自行指定 entry_id，连接时先补发已产生的事件）
+    
+    - event: field   评委输出中的字段已完整（inner_monologue / overall_score），为临时值
+    - event: judge   某位评委的调用结束
+    - event: result  阶段一结束，推送解析后的各评委总分（以此为准）
+    
+    评分请求尚未开始（或进度已过保留时间）时返回 404，可稍后重试。
+    """
+    progress = stage_one_progress.get(FLOW_SCORING, entry_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail=f"没有该作品的阶段一进度: {entry_id}")
+    return StreamingResponse(progress_event_stream(progress), media_type="text/event-stream")
+
+
 @router.get("/health")
 async def health_check():
     """健康检查接口"""
     return {"status": "ok", "message": "AI Judge System is running"}
 
 
+@router.get("/load")
+async def load_status(http_response: Response):
+    """
+    当前负载（供负载均衡探测）
+    
+    返回评分和二选一流程的运行中/排队数量；任一流程饱和（并发和队列均已占满）时返回 503。
+    """
+    controllers = {"scoring": scoring_admission, "binary_choice": binary_choice_admission}
+    saturated = any(c.saturated for c in controllers.values())
+    if saturated:
+        http_response.status_code = 503
+    return {
+        "status": "saturated" if saturated else "ok",
+        **{name: c.stats() for name, c in controllers.items()},
+    }
+
+
 @router.get("/default_prompts")
 async def get_default_prompts():
     """获取默认的提示词配置"""
@@ -339,6 +822,11 @@ async def get_model_config():
     """获取当前的模型配置（用于诊断）"""
     from app.config import get_settings
     from app.judges.utils import get_model_for_judge
+    from app.judges.judge_cache import cache_stats
+    from app.judges.output_limits import output_limit_stats
+    from app.judges.latency import model_latency
+    from app.judges.structured_output import structured_output_stats
+    from app.judges.parse_guard import parse_guard_stats
     
     settings = get_settings()
     
@@ -382,6 +870,19 @@ async def get_model_config():
         },
         "selector_model": settings.model_selector,
         "gateway_url": settings.llm_gateway_base_url,
+        "judge_cache": cache_stats(),
+        "output_limits": output_limit_stats(),
+        "model_latency": model_latency.stats(),
+        "structured_output": {
+            "enabled": settings.stage_one_structured_output,
+            "models": structured_output_stats(),
+        },
+        "parse_guard": {
+            "max_chars": settings.parse_max_chars,
+            "time_budget_ms": settings.parse_time_budget_ms,
+            "parsers": parse_guard_stats(),
+        },
+        "db_writer": db_writer.stats(),
     }
 
 
@@ -411,6 +912,9 @@ async def get_debug_info(
             "extra_text": entry.extra_text,
             "created_at": entry.created_at.isoformat() if entry.created_at else None,
             
+            # 分阶段耗时
+            "timings": entry.timings,
+            
             # 阶段一：独立评分详情
             "stage_one": {
                 "judges": []
@@ -454,10 +958,14 @@ async def get_debug_info(
         
         # 收集阶段二群聊讨论详情
         for debate_session in entry.debate_sessions:
+            # 消息只保存上下文的序号范围，这里按完整记录还原
+            transcript = build_transcript(debate_session.initial_message, debate_session.messages)
             debate_debug = {
                 "debate_id": debate_session.debate_id,
                 "participants": debate_session.participants,
                 "config": debate_session.config,
+                "status": debate_session.status,
+                "stop_reason": debate_session.stop_reason,  # 讨论结束原因
                 
                 # 调试信息
                 "judge_contexts": debate_session.judge_contexts,  # 每个评委的上下文
@@ -469,9 +977,10 @@ async def get_debug_info(
                         "sequence": msg.sequence,
                         "speaker": msg.speaker,
                         "content": msg.content,
-                        "context_history": msg.context_history,  # 发言时的上下文
+                        "context_history": message_context(transcript, msg),  # 发言时的上下文
                         "raw_response": msg.raw_response,  # 原始响应
                         "model_name": msg.model_name,  # 使用的模型
+                        "metrics": msg.metrics,  # 本轮 prompt token 统计
                         "created_at": msg.created_at.isoformat() if msg.created_at else None,
                     }
                     for msg in sorted(debate_session.messages, key=lambda m: m.sequence)
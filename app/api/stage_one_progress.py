@@ -0,0 +1,98 @@
+"""阶段一进度事件（评委字段一完整就推送给流式订阅者）"""
+
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Optional
+
+from app.config import get_settings
+
+# 评判流程（评分和二选一的进度分开登记，entry_id 相同也不会互相覆盖）
+FLOW_SCORING = "scoring"
+FLOW_BINARY_CHOICE = "binary_choice"
+
+
+@dataclass
+class StageOneProgress:
+    """单个作品阶段一的进度事件"""
+    flow: str
+    entry_id: str
+    events: list[tuple[str, dict]] = field(default_factory=list)
+    finished: bool = False
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    # 用于通知流式订阅者有新事件
+    changed: asyncio.Condition = field(default_factory=asyncio.Condition)
+
+
+class StageOneProgressRegistry:
+    """
+    阶段一进度注册表（进程内），按 (评判流程, entry_id) 登记
+
+    只有评判流程开始时才建立条目，查询不会产生条目；事件会保留，
+    晚到的订阅者先补发已产生的事件。已结束的条目在保留时间后清理。
+    """
+
+    def __init__(self, retention_seconds: float = 600):
+        self.retention_seconds = retention_seconds
+        self._progress: dict[tuple[str, str], StageOneProgress] = {}
+
+    def get(self, flow: str, entry_id: str) -> Optional[StageOneProgress]:
+        """获取某个作品的进度（订阅方使用），流程尚未开始或已清理时返回 None"""
+        self._prune()
+        return self._progress.get((flow, entry_id))
+
+    def start(self, flow: str, entry_id: str) -> StageOneProgress:
+        """评判流程开始：新建条目（同一作品重新评判时替换上一次的进度）"""
+        self._prune()
+        progress = self._progress[(flow, entry_id)] = StageOneProgress(flow=flow, entry_id=entry_id)
+        return progress
+
+    async def publish(self, progress: StageOneProgress, event: str, data: dict) -> None:
+        """追加一条事件并通知订阅者"""
+        async with progress.changed:
+            progress.events.append((event, data))
+            progress.changed.notify_all()
+
+    async def finish(self, progress: StageOneProgress, event: str, data: dict) -> None:
+        """推送最后一条事件并结束"""
+        async with progress.changed:
+            progress.events.append((event, data))
+            progress.finished = True
+            progress.finished_at = time.time()
+            progress.changed.notify_all()
+
+    def _prune(self) -> None:
+        now = time.time()
+        expired = [
+            key
+            for key, p in self._progress.items()
+            if p.finished and now - p.finished_at > self.retention_seconds
+        ]
+        for key in expired:
+            del self._progress[key]
+
+
+async def progress_event_stream(progress: StageOneProgress) -> AsyncIterator[str]:
+    """把进度事件转为 SSE 文本（先补发已产生的事件，结束事件之后关闭）"""
+    sent = 0
+    while True:
+        async with progress.changed:
+            while sent >= len(progress.events) and not progress.finished:
+                await progress.changed.wait()
+            pending = progress.events[sent:]
+            finished = progress.finished
+
+        for event, data in pending:
+            sent += 1
+            yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+        if finished and sent >= len(progress.events):
+            break
+
+
+# 全局注册表（评分和二选一共用，按流程区分）
+stage_one_progress = StageOneProgressRegistry(
+    retention_seconds=get_settings().stage_one_progress_retention_seconds,
+)
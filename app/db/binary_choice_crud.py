@@ -1,10 +1,14 @@
-"""二选一模式的数据库 CRUD 操作"""
+"""二选一模式的数据库 CRUD 操作（写操作不提交，由写入队列统一提交，见 app.db.crud）"""
 
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import delete, insert, null, update
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
 from loguru import logger
 
+from app.timing import merge_timing_dicts
+from app.db.crud import SESSION_STATUS_RUNNING, SESSION_STATUS_COMPLETED
+from app.db.upsert import upsert
 from app.models.binary_choice_database import (
     BinaryChoiceEntry,
     BinaryChoiceResult,
@@ -24,7 +28,7 @@ async def save_binary_choice_entry(
     extra_context: str = None,
 ) -> BinaryChoiceEntry:
     """
-    保存二选一作品
+    保存或更新二选一作品（单语句 upsert，同一作品的并发请求不会冲突）
     
     Args:
         db: 数据库会话
@@ -39,24 +43,46 @@ async def save_binary_choice_entry(
     Returns:
         保存的 BinaryChoiceEntry 对象
     """
-    entry = BinaryChoiceEntry(
-        entry_id=entry_id,
-        question=question,
-        option_a=option_a,
-        option_b=option_b,
-        image_url=image_url,
-        text_content=text_content,
-        extra_context=extra_context,
-    )
-    
-    db.add(entry)
-    await db.commit()
-    await db.refresh(entry)
+    entry = await upsert(db, BinaryChoiceEntry, {
+        "entry_id": entry_id,
+        "question": question,
+        "option_a": option_a,
+        "option_b": option_b,
+        "image_url": image_url,
+        "text_content": text_content,
+        "extra_context": extra_context,
+    })
     
     logger.info(f"二选一作品保存成功: {entry_id}")
     return entry
 
 
+async def save_binary_choice_entry_timings(
+    db: AsyncSession,
+    entry_id: str,
+    timings: dict,
+    merge: bool = False,
+) -> None:
+    """
+    保存二选一作品的分阶段耗时
+    
+    Args:
+        db: 数据库会话
+        entry_id: 作品 ID
+        timings: PhaseTimer.to_dict() 导出的耗时数据
+        merge: 是否合并到已有耗时
+    """
+    result = await db.execute(
+        select(BinaryChoiceEntry).where(BinaryChoiceEntry.entry_id == entry_id)
+    )
+    entry = result.scalar_one_or_none()
+    
+    if not entry:
+        return
+    
+    entry.timings = merge_timing_dicts(entry.timings, timings) if merge else timings
+
+
 async def save_binary_choice_results(
     db: AsyncSession,
     entry_id: str,
@@ -70,29 +96,28 @@ async def save_binary_choice_results(
         entry_id: 作品 ID
         judge_results: 评委结果列表
     """
-    for result_data in judge_results:
-        # 跳过有错误的结果
-        if "error" in result_data:
-            continue
-        
-        result = BinaryChoiceResult(
-            entry_id=entry_id,
-            judge_id=result_data["judge_id"],
-            judge_display_name=result_data["judge_display_name"],
-            choice=result_data["choice"],
-            choice_label=result_data["choice_label"],
-            reasoning=result_data["reasoning"],
-            inner_monologue=result_data.get("inner_monologue"),
-            raw_output=result_data.get("raw_output"),
-            system_message=result_data.get("system_message"),
-            user_instruction=result_data.get("user_instruction"),
-            model_name=result_data.get("model_name"),
-            debug_context=result_data.get("debug_context"),
-        )
-        
-        db.add(result)
+    rows = [
+        {
+            "entry_id": entry_id,
+            "judge_id": result_data["judge_id"],
+            "judge_display_name": result_data["judge_display_name"],
+            "choice": result_data["choice"],
+            "choice_label": result_data["choice_label"],
+            "reasoning": result_data["reasoning"],
+            "inner_monologue": result_data.get("inner_monologue"),
+            "raw_output": result_data.get("raw_output"),
+            "system_message": result_data.get("system_message"),
+            "user_instruction": result_data.get("user_instruction"),
+            "model_name": result_data.get("model_name"),
+            "debug_context": result_data.get("debug_context"),
+        }
+        for result_data in judge_results
+        if "error" not in result_data  # 跳过有错误的结果
+    ]
+    # 一条多行 INSERT，不经过 ORM 的逐对象处理
+    if rows:
+        await db.execute(insert(BinaryChoiceResult.__table__), rows)
     
-    await db.commit()
     logger.info(f"二选一评委结果保存成功: entry_id={entry_id}, 共 {len(judge_results)} 个评委")
 
 
@@ -121,35 +146,155 @@ async def save_binary_choice_debate(
         selector_prompt: 选择器提示词
         initial_message: 初始消息
     """
-    # 创建讨论会话
-    session = BinaryChoiceDebateSession(
+    # 创建讨论会话，消息一次批量插入
+    await db.execute(insert(BinaryChoiceDebateSession.__table__), {
+        "debate_id": debate_id,
+        "entry_id": entry_id,
+        "participants": participants,
+        "config": config,
+        "judge_contexts": judge_contexts,
+        "selector_prompt": selector_prompt,
+        "initial_message": initial_message,
+    })
+    if messages:
+        await db.execute(
+            insert(BinaryChoiceMessage.__table__),
+            [_binary_choice_message_row(debate_id, idx + 1, msg_data) for idx, msg_data in enumerate(messages)],
+        )
+    
+    logger.info(f"二选一讨论会话保存成功: debate_id={debate_id}, 共 {len(messages)} 条消息")
+
+
+def _binary_choice_message_row(debate_id: str, sequence: int, msg_data: dict) -> dict:
+    return {
+        "debate_id": debate_id,
+        "sequence": sequence,
+        "speaker": msg_data["speaker"],
+        "content": msg_data["content"],
+        "context_history": msg_data.get("context_history"),
+        "context_start": msg_data.get("context_start"),
+        "context_end": msg_data.get("context_end"),
+        "raw_response": msg_data.get("raw_response"),
+        "model_name": msg_data.get("model_name"),
+        "metrics": msg_data.get("metrics"),
+    }
+
+
+async def open_binary_choice_debate(
+    db: AsyncSession,
+    entry_id: str,
+    debate_id: str,
+    config: dict = None,
+    resume: bool = False,
+) -> None:
+    """
+    开始一场二选一讨论：创建状态为 running 的会话，讨论过程中逐条追加消息
+    
+    Args:
+        db: 数据库会话
+        entry_id: 作品 ID
+        debate_id: 讨论 ID
+        config: 配置信息
+        resume: 是否为恢复讨论（保留已有会话和消息，只把状态改回 running）
+    """
+    if resume:
+        result = await db.execute(
+            update(BinaryChoiceDebateSession)
+            .where(BinaryChoiceDebateSession.debate_id == debate_id)
+            .values(status=SESSION_STATUS_RUNNING)
+        )
+        if result.rowcount:
+            return
+    
+    # 重新讨论：删除旧会话及其消息
+    await db.execute(delete(BinaryChoiceMessage).where(BinaryChoiceMessage.debate_id == debate_id))
+    await db.execute(
+        delete(BinaryChoiceDebateSession).where(BinaryChoiceDebateSession.debate_id == debate_id)
+    )
+    db.add(BinaryChoiceDebateSession(
         debate_id=debate_id,
         entry_id=entry_id,
-        participants=participants,
+        participants=[],
         config=config,
-        judge_contexts=judge_contexts,
-        selector_prompt=selector_prompt,
-        initial_message=initial_message,
+        status=SESSION_STATUS_RUNNING,
+    ))
+
+
+async def append_binary_choice_message(
+    db: AsyncSession,
+    debate_id: str,
+    sequence: int,
+    msg_data: dict,
+) -> None:
+    """追加一条二选一讨论消息（每条发言单独提交）"""
+    db.add(BinaryChoiceMessage(**_binary_choice_message_row(debate_id, sequence, msg_data)))
+
+
+async def checkpoint_binary_choice_debate(
+    db: AsyncSession,
+    debate_id: str,
+    sequence: int,
+    team_state: dict,
+) -> None:
+    """保存二选一讨论断点（覆盖上一次的 team 状态）"""
+    await db.execute(
+        update(BinaryChoiceDebateSession)
+        .where(BinaryChoiceDebateSession.debate_id == debate_id)
+        .values(team_state=team_state, checkpoint_sequence=sequence)
     )
-    
-    db.add(session)
-    await db.flush()  # flush 以获取会话 ID
-    
-    # 添加消息
-    for idx, msg_data in enumerate(messages):
-        message = BinaryChoiceMessage(
-            debate_id=debate_id,
-            sequence=idx + 1,
-            speaker=msg_data["speaker"],
-            content=msg_data["content"],
-            context_history=msg_data.get("context_history"),
-            raw_response=msg_data.get("raw_response"),
-            model_name=msg_data.get("model_name"),
+
+
+async def save_binary_choice_debate_info(
+    db: AsyncSession,
+    debate_id: str,
+    participants: list[str],
+    judge_contexts: dict = None,
+    selector_prompt: str = None,
+    initial_message: str = None,
+) -> None:
+    """讨论开始时保存参与评委和调试信息（恢复讨论需要原始的初始消息）"""
+    await db.execute(
+        update(BinaryChoiceDebateSession)
+        .where(BinaryChoiceDebateSession.debate_id == debate_id)
+        .values(
+            participants=participants,
+            judge_contexts=judge_contexts,
+            selector_prompt=selector_prompt,
+            initial_message=initial_message,
         )
-        db.add(message)
+    )
+
+
+async def finish_binary_choice_debate(
+    db: AsyncSession,
+    debate_id: str,
+    status: str,
+    stop_reason: str = None,
+) -> None:
+    """结束二选一讨论：更新状态和结束原因，完成时清空断点"""
+    values = {"status": status, "stop_reason": stop_reason}
+    if status == SESSION_STATUS_COMPLETED:
+        values["team_state"] = null()
     
-    await db.commit()
-    logger.info(f"二选一讨论会话保存成功: debate_id={debate_id}, 共 {len(messages)} 条消息")
+    await db.execute(
+        update(BinaryChoiceDebateSession)
+        .where(BinaryChoiceDebateSession.debate_id == debate_id)
+        .values(**values)
+    )
+
+
+async def get_binary_choice_debate(
+    db: AsyncSession,
+    debate_id: str,
+) -> BinaryChoiceDebateSession | None:
+    """根据讨论 ID 获取二选一讨论会话（包含消息）"""
+    result = await db.execute(
+        select(BinaryChoiceDebateSession)
+        .where(BinaryChoiceDebateSession.debate_id == debate_id)
+        .options(selectinload(BinaryChoiceDebateSession.messages))
+        .execution_options(populate_existing=True)
+    )
+    return result.scalar_one_or_none()
 
 
 async def get_binary_choice_entry_by_id(
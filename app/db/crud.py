@@ -1,11 +1,23 @@
-"""数据库 CRUD 操作"""
+"""
+数据库 CRUD 操作
+
+写操作（save_* / open_* / append_* / checkpoint_* / finish_*）只修改传入的会话、不提交，
+由写入队列统一提交：await db_writer.submit(save_entry, entry_id=..., ...)（见 app.db.writer）。
+"""
 
 from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import delete, insert, null, select, update
 from sqlalchemy.orm import selectinload
 
 from app.models.database import Entry, JudgeResult, DebateSession, DebateMessage
+from app.db.upsert import upsert
+from app.timing import merge_timing_dicts
+
+# 讨论会话状态（与后台任务状态取值一致；旧数据为空，视为已完成）
+SESSION_STATUS_RUNNING = "running"
+SESSION_STATUS_COMPLETED = "completed"
+SESSION_STATUS_FAILED = "failed"
 
 
 async def save_entry(
@@ -15,64 +27,66 @@ async def save_entry(
     competition_type: str,
     extra_text: Optional[str] = None,
 ) -> Entry:
-    """保存或更新参赛作品"""
-    # 检查是否已存在
+    """保存或更新参赛作品（单语句 upsert，同一作品的并发请求不会冲突）"""
+    return await upsert(db, Entry, {
+        "entry_id": entry_id,
+        "image_url": image_url,
+        "competition_type": competition_type,
+        "extra_text": extra_text,
+    })
+
+
+async def save_entry_timings(
+    db: AsyncSession,
+    entry_id: str,
+    timings: dict,
+    merge: bool = False,
+) -> None:
+    """
+    保存作品的分阶段耗时
+    
+    Args:
+        merge: 是否合并到已有耗时（后台讨论完成后补充讨论阶段耗时）
+    """
     result = await db.execute(select(Entry).where(Entry.entry_id == entry_id))
     entry = result.scalar_one_or_none()
     
-    if entry:
-        # 更新现有作品
-        entry.image_url = image_url
-        entry.competition_type = competition_type
-        entry.extra_text = extra_text
-    else:
-        # 创建新作品
-        entry = Entry(
-            entry_id=entry_id,
-            image_url=image_url,
-            competition_type=competition_type,
-            extra_text=extra_text,
-        )
-        db.add(entry)
+    if not entry:
+        return
     
-    await db.commit()
-    await db.refresh(entry)
-    return entry
+    entry.timings = merge_timing_dicts(entry.timings, timings) if merge else timings
 
 
 async def save_judge_results(
     db: AsyncSession,
     entry_id: str,
     judge_results: List[dict],
-) -> List[JudgeResult]:
-    """保存评委评分结果"""
-    results = []
-    
-    for judge_data in judge_results:
-        result = JudgeResult(
-            entry_id=entry_id,
-            judge_id=judge_data.get("judge_id", ""),
-            judge_display_name=judge_data.get("judge_display_name", ""),
-            competition_type=judge_data.get("competition_type", ""),
-            overall_score=judge_data.get("overall_score", 0.0),
-            dimension_scores=judge_data.get("dimension_scores"),
-            strengths=judge_data.get("strengths"),
-            weaknesses=judge_data.get("weaknesses"),
-            one_liner=judge_data.get("one_liner"),
-            comment_for_audience=judge_data.get("comment_for_audience"),
-            safety_notes=judge_data.get("safety_notes"),
-            raw_output=judge_data.get("raw_output"),
+) -> None:
+    """保存评委评分结果（一条多行 INSERT，不经过 ORM 的逐对象处理）"""
+    rows = [
+        {
+            "entry_id": entry_id,
+            "judge_id": judge_data.get("judge_id", ""),
+            "judge_display_name": judge_data.get("judge_display_name", ""),
+            "competition_type": judge_data.get("competition_type", ""),
+            "overall_score": judge_data.get("overall_score", 0.0),
+            "dimension_scores": judge_data.get("dimension_scores"),
+            "strengths": judge_data.get("strengths"),
+            "weaknesses": judge_data.get("weaknesses"),
+            "one_liner": judge_data.get("one_liner"),
+            "comment_for_audience": judge_data.get("comment_for_audience"),
+            "safety_notes": judge_data.get("safety_notes"),
+            "raw_output": judge_data.get("raw_output"),
             # 新增调试字段
-            system_message=judge_data.get("system_message"),
-            user_instruction=judge_data.get("user_instruction"),
-            model_name=judge_data.get("model_name"),
-            debug_context=judge_data.get("debug_context"),
-        )
-        db.add(result)
-        results.append(result)
-    
-    await db.commit()
-    return results
+            "system_message": judge_data.get("system_message"),
+            "user_instruction": judge_data.get("user_instruction"),
+            "model_name": judge_data.get("model_name"),
+            "debug_context": judge_data.get("debug_context"),
+        }
+        for judge_data in judge_results
+    ]
+    if rows:
+        await db.execute(insert(JudgeResult.__table__), rows)
 
 
 async def save_debate_session(
@@ -85,48 +99,149 @@ async def save_debate_session(
     judge_contexts: Optional[dict] = None,
     selector_prompt: Optional[str] = None,
     initial_message: Optional[str] = None,
-) -> DebateSession:
-    """保存群聊讨论会话"""
-    # 检查是否已存在，如果存在则先删除旧的
-    result = await db.execute(select(DebateSession).where(DebateSession.debate_id == debate_id))
-    existing_session = result.scalar_one_or_none()
-    
-    if existing_session:
-        # 删除旧的消息
+) -> None:
+    """保存群聊讨论会话（已存在时先删除旧会话及其消息；消息一次批量插入）"""
+    await db.execute(delete(DebateMessage).where(DebateMessage.debate_id == debate_id))
+    await db.execute(delete(DebateSession).where(DebateSession.debate_id == debate_id))
+    await db.execute(insert(DebateSession.__table__), {
+        "debate_id": debate_id,
+        "entry_id": entry_id,
+        "participants": participants,
+        "config": config or {},
+        "judge_contexts": judge_contexts,
+        "selector_prompt": selector_prompt,
+        "initial_message": initial_message,
+    })
+    if messages:
         await db.execute(
-            select(DebateMessage).where(DebateMessage.debate_id == debate_id)
+            insert(DebateMessage.__table__),
+            [_debate_message_row(debate_id, idx + 1, msg_data) for idx, msg_data in enumerate(messages)],
         )
-        await db.delete(existing_session)
-        await db.commit()
+
+
+def _debate_message_row(debate_id: str, sequence: int, msg_data: dict) -> dict:
+    return {
+        "debate_id": debate_id,
+        "sequence": sequence,
+        "speaker": msg_data.get("speaker", ""),
+        "content": msg_data.get("content", ""),
+        "context_history": msg_data.get("context_history"),
+        "context_start": msg_data.get("context_start"),
+        "context_end": msg_data.get("context_end"),
+        "raw_response": msg_data.get("raw_response"),
+        "model_name": msg_data.get("model_name"),
+        "metrics": msg_data.get("metrics"),
+    }
+
+
+async def open_debate_session(
+    db: AsyncSession,
+    entry_id: str,
+    debate_id: str,
+    config: Optional[dict] = None,
+    resume: bool = False,
+) -> None:
+    """
+    开始一场讨论：创建状态为 running 的会话，讨论过程中逐条追加消息
     
-    # 创建新会话
-    session = DebateSession(
+    Args:
+        resume: 是否为恢复讨论（保留已有会话和消息，只把状态改回 running）
+    """
+    if resume:
+        result = await db.execute(
+            update(DebateSession)
+            .where(DebateSession.debate_id == debate_id)
+            .values(status=SESSION_STATUS_RUNNING)
+        )
+        if result.rowcount:
+            return
+    
+    # 重新讨论：删除旧会话及其消息
+    await db.execute(delete(DebateMessage).where(DebateMessage.debate_id == debate_id))
+    await db.execute(delete(DebateSession).where(DebateSession.debate_id == debate_id))
+    db.add(DebateSession(
         debate_id=debate_id,
         entry_id=entry_id,
-        participants=participants,
+        participants=[],
         config=config or {},
-        judge_contexts=judge_contexts,
-        selector_prompt=selector_prompt,
-        initial_message=initial_message,
+        status=SESSION_STATUS_RUNNING,
+    ))
+
+
+async def append_debate_message(
+    db: AsyncSession,
+    debate_id: str,
+    sequence: int,
+    msg_data: dict,
+) -> None:
+    """追加一条讨论消息（每条发言单独提交，讨论中断时已产生的发言不会丢失）"""
+    db.add(DebateMessage(**_debate_message_row(debate_id, sequence, msg_data)))
+
+
+async def checkpoint_debate_session(
+    db: AsyncSession,
+    debate_id: str,
+    sequence: int,
+    team_state: dict,
+) -> None:
+    """保存讨论断点（覆盖上一次的 team 状态）"""
+    await db.execute(
+        update(DebateSession)
+        .where(DebateSession.debate_id == debate_id)
+        .values(team_state=team_state, checkpoint_sequence=sequence)
     )
-    db.add(session)
-    
-    # 创建消息
-    for idx, msg_data in enumerate(messages):
-        message = DebateMessage(
-            debate_id=debate_id,
-            sequence=idx + 1,
-            speaker=msg_data.get("speaker", ""),
-            content=msg_data.get("content", ""),
-            context_history=msg_data.get("context_history"),
-            raw_response=msg_data.get("raw_response"),
-            model_name=msg_data.get("model_name"),
+
+
+async def save_debate_session_info(
+    db: AsyncSession,
+    debate_id: str,
+    participants: List[str],
+    judge_contexts: Optional[dict] = None,
+    selector_prompt: Optional[str] = None,
+    initial_message: Optional[str] = None,
+) -> None:
+    """讨论开始时保存参与评委和调试信息（恢复讨论需要原始的初始消息）"""
+    await db.execute(
+        update(DebateSession)
+        .where(DebateSession.debate_id == debate_id)
+        .values(
+            participants=participants,
+            judge_contexts=judge_contexts,
+            selector_prompt=selector_prompt,
+            initial_message=initial_message,
         )
-        db.add(message)
+    )
+
+
+async def finish_debate_session(
+    db: AsyncSession,
+    debate_id: str,
+    status: str,
+    stop_reason: Optional[str] = None,
+) -> None:
+    """
+    结束讨论：更新会话状态和结束原因
     
-    await db.commit()
-    await db.refresh(session)
-    return session
+    讨论完成后不再需要断点，清空 team_state；失败时保留，供恢复接口使用。
+    """
+    values = {"status": status, "stop_reason": stop_reason}
+    if status == SESSION_STATUS_COMPLETED:
+        values["team_state"] = null()
+    
+    await db.execute(
+        update(DebateSession).where(DebateSession.debate_id == debate_id).values(**values)
+    )
+
+
+async def get_debate_session(db: AsyncSession, debate_id: str) -> Optional[DebateSession]:
+    """根据讨论 ID 获取会话（包含消息）"""
+    result = await db.execute(
+        select(DebateSession)
+        .where(DebateSession.debate_id == debate_id)
+        .options(selectinload(DebateSession.messages))
+        .execution_options(populate_existing=True)
+    )
+    return result.scalar_one_or_none()
 
 
 async def get_entry_by_id(db: AsyncSession, entry_id: str) -> Optional[Entry]:
@@ -1,19 +1,78 @@
 """数据库连接和会话管理"""
 
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession, async_sessionmaker
 from app.config import get_settings
 from app.models.database import Base
+from app.db.migrations import add_missing_columns, compact_context_history
+from app.db.sqlite_profile import (
+    WalCheckpointer,
+    install_sqlite_profile,
+    install_sqlite_read_only,
+    install_sqlite_write_mode,
+)
+from app.db.writer import DatabaseWriter
 
 settings = get_settings()
 
-# 创建异步引擎
-engine = create_async_engine(
-    settings.database_url,
-    echo=False,  # 设置为 True 可以看到 SQL 日志
-    future=True,
-)
 
-# 创建异步会话工厂
+def is_sqlite(database_url: str) -> bool:
+    return database_url.startswith("sqlite")
+
+
+def pool_options(database_url: str) -> dict:
+    """
+    PostgreSQL 等服务端数据库的连接池参数
+
+    - 连接池大小 / 溢出 / 等待超时 / 回收时间见 DB_POOL_*
+    - pool_pre_ping：取出连接时先检查是否存活，数据库重启或故障切换后不会拿到失效连接
+    - asyncpg 在每个连接上缓存预编译语句（DB_STATEMENT_CACHE_SIZE），重复的 CRUD 语句不再重新解析
+    """
+    options = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+        "pool_pre_ping": True,
+    }
+    if "+asyncpg" in database_url:
+        options["connect_args"] = {
+            "prepared_statement_cache_size": settings.db_statement_cache_size,  # SQLAlchemy 一侧的缓存
+            "statement_cache_size": settings.db_statement_cache_size,  # asyncpg 一侧的缓存
+        }
+    return options
+
+
+def create_read_engine(database_url: str) -> AsyncEngine:
+    """只读连接池（SQLite 连接设置 query_only）；其他数据库为读写共用的连接池"""
+    if not is_sqlite(database_url):
+        return create_async_engine(database_url, echo=False, future=True, **pool_options(database_url))
+    engine = create_async_engine(
+        database_url,
+        echo=False,  # 设置为 True 可以看到 SQL 日志
+        future=True,
+        pool_size=settings.db_read_pool_size,
+    )
+    install_sqlite_profile(engine)
+    install_sqlite_read_only(engine)
+    return engine
+
+
+def create_write_engine(database_url: str) -> AsyncEngine:
+    """写连接（SQLite 只允许一个写连接，由写入队列独占使用）"""
+    if not is_sqlite(database_url):
+        return create_async_engine(database_url, echo=False, future=True, **pool_options(database_url))
+    engine = create_async_engine(database_url, echo=False, future=True, pool_size=1, max_overflow=0)
+    install_sqlite_profile(engine)
+    install_sqlite_write_mode(engine)
+    return engine
+
+
+# SQLite：读写分离，查询走只读连接池，写操作通过写入队列独占写连接提交
+# PostgreSQL：行级锁、多个写事务可以并发，读写共用一个连接池，写操作直接提交（多节点部署时也无法靠单个进程串行写入）
+engine = create_read_engine(settings.database_url)
+write_engine = create_write_engine(settings.database_url) if is_sqlite(settings.database_url) else engine
+
+# 创建异步会话工厂（只读）
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
@@ -22,9 +81,24 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False,
 )
 
+WriteSessionLocal = async_sessionmaker(
+    write_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autoflush=False,
+)
+
+# 写入队列：crud 中的写操作通过 db_writer.submit(save_entry, ...) 提交（非 SQLite 数据库不排队）
+db_writer = DatabaseWriter(
+    WriteSessionLocal, enabled=settings.db_single_writer and is_sqlite(settings.database_url)
+)
+
+# 后台定期做 WAL 检查点（检查点不修改数据，只读连接即可执行）
+wal_checkpointer = WalCheckpointer(engine)
+
 
 async def get_db():
-    """获取数据库会话（依赖注入）"""
+    """获取只读数据库会话（依赖注入）"""
     async with AsyncSessionLocal() as session:
         try:
             yield session
@@ -33,7 +107,8 @@ async def get_db():
 
 
 async def init_database():
-    """初始化数据库（创建所有表）"""
-    async with engine.begin() as conn:
+    """初始化数据库（创建所有表，为旧表补齐新增列，并压缩旧的上下文拷贝）"""
+    async with write_engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
-
+        await conn.run_sync(add_missing_columns)
+        await conn.run_sync(compact_context_history)
@@ -0,0 +1,134 @@
+"""
+从数据库导出脱敏后的模型原始输出语料（供解析器 / 清洗基准使用）
+
+用法：
+    python -m app.db.export_corpus --output tests/data/model_output_corpus.json --limit 2000
+
+只导出模型输出文本和评委 / 模型名，不导出作品 ID、图片地址、提示词等；
+输出文本中的 URL、邮箱、手机号和长数字串替换为占位符，重复的输出只保留一条。
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from loguru import logger
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config import get_settings
+from app.models.database import DebateMessage, JudgeResult
+from app.models.binary_choice_database import BinaryChoiceMessage, BinaryChoiceResult
+
+DEFAULT_OUTPUT = Path(__file__).parent.parent.parent / "tests" / "data" / "model_output_corpus.json"
+
+# 按顺序替换（URL 中可能含邮箱和数字，先处理）
+_REDACTIONS = [
+    (re.compile(r"https?://\S+|www\.\S+"), "<url>"),
+    (re.compile(r"/static/uploads/\S+"), "<url>"),
+    (re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+"), "<email>"),
+    (re.compile(r"(?<!\d)(?:\+?86[- ]?)?1[3-9]\d{9}(?!\d)"), "<phone>"),
+    (re.compile(r"\d{6,}"), "<num>"),
+]
+
+
+def redact(text: str) -> str:
+    """替换输出中可能的个人信息"""
+    for pattern, placeholder in _REDACTIONS:
+        text = pattern.sub(placeholder, text)
+    return text
+
+
+def _dedupe(records: list[dict]) -> list[dict]:
+    seen = set()
+    unique = []
+    for record in records:
+        digest = hashlib.sha256(record["raw"].encode("utf-8")).digest()
+        if digest not in seen:
+            seen.add(digest)
+            unique.append(record)
+    return unique
+
+
+async def export_corpus(database_url: Optional[str] = None, limit: int = 2000) -> dict:
+    """
+    读取各表中的模型原始输出，返回脱敏后的语料
+
+    Returns:
+        {"scoring": [...], "binary_choice": [...], "debate": [...]}，
+        每条为 {"judge_id"/"speaker", "model_name", "raw"}
+    """
+    engine = create_async_engine(database_url or get_settings().database_url)
+    queries = {
+        "scoring": select(JudgeResult.judge_id, JudgeResult.model_name, JudgeResult.raw_output)
+        .where(JudgeResult.raw_output.is_not(None))
+        .order_by(JudgeResult.id.desc())
+        .limit(limit),
+        "binary_choice": select(BinaryChoiceResult.judge_id, BinaryChoiceResult.model_name, BinaryChoiceResult.raw_output)
+        .where(BinaryChoiceResult.raw_output.is_not(None))
+        .order_by(BinaryChoiceResult.id.desc())
+        .limit(limit),
+        # 讨论消息只取原文与清洗结果不同的发言：旧数据的 raw_response 保存的是清洗后的内容，
+        # 与无需清洗的新发言无法区分，不能作为清洗器的输入
+        "debate": select(DebateMessage.speaker, DebateMessage.model_name, DebateMessage.raw_response)
+        .where(DebateMessage.raw_response.is_not(None), DebateMessage.raw_response != DebateMessage.content)
+        .order_by(DebateMessage.id.desc())
+        .limit(limit),
+        "binary_choice_debate": select(
+            BinaryChoiceMessage.speaker,
+            BinaryChoiceMessage.model_name,
+            BinaryChoiceMessage.raw_response,
+        )
+        .where(BinaryChoiceMessage.raw_response.is_not(None), BinaryChoiceMessage.raw_response != BinaryChoiceMessage.content)
+        .order_by(BinaryChoiceMessage.id.desc())
+        .limit(limit),
+    }
+
+    corpus: dict[str, list[dict]] = {"scoring": [], "binary_choice": [], "debate": []}
+    try:
+        async with engine.connect() as conn:
+            for name, query in queries.items():
+                rows = (await conn.execute(query)).all()
+                if name in ("scoring", "binary_choice"):
+                    records = [
+                        {"judge_id": judge_id, "model_name": model_name, "raw": redact(raw)}
+                        for judge_id, model_name, raw in rows
+                    ]
+                    corpus[name].extend(records)
+                else:
+                    records = [
+                        {"speaker": speaker, "model_name": model_name, "raw": redact(raw)}
+                        for speaker, model_name, raw in rows
+                    ]
+                    corpus["debate"].extend(records)
+                logger.info(f"{name}: 读取 {len(rows)} 条")
+    finally:
+        await engine.dispose()
+
+    return {name: _dedupe(records) for name, records in corpus.items()}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="导出脱敏后的模型原始输出语料")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT, help="输出文件（JSON）")
+    parser.add_argument("--limit", type=int, default=2000, help="每张表最多导出的条数（取最新的）")
+    parser.add_argument("--database-url", default=None, help="数据库地址（默认使用 DATABASE_URL 配置）")
+    args = parser.parse_args()
+
+    corpus = await export_corpus(args.database_url, args.limit)
+    payload = {"exported_at": datetime.utcnow().isoformat(timespec="seconds"), **corpus}
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    logger.success(
+        f"语料已导出: {args.output}（评分 {len(corpus['scoring'])} 条，"
+        f"二选一 {len(corpus['binary_choice'])} 条，讨论 {len(corpus['debate'])} 条）"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,103 @@
+"""轻量级数据库迁移（为已存在的表补齐新增的可空列）"""
+
+from loguru import logger
+from sqlalchemy import bindparam, inspect, null, select
+from sqlalchemy.engine import Connection
+
+from app.models.database import Base
+
+
+def add_missing_columns(conn: Connection) -> list[str]:
+    """
+    对比 ORM 模型与数据库中的实际表结构，为旧表补齐新增列
+
+    create_all 只会创建不存在的表，不会修改已有表；
+    新增字段都是可空列，可以直接 ALTER TABLE ADD COLUMN。
+
+    Args:
+        conn: 同步连接（通过 AsyncConnection.run_sync 调用）
+
+    Returns:
+        新增的列（"表名.列名"）列表
+    """
+    inspector = inspect(conn)
+    existing_tables = set(inspector.get_table_names())
+    added = []
+
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+
+        existing_columns = {col["name"] for col in inspector.get_columns(table.name)}
+
+        for column in table.columns:
+            if column.name in existing_columns:
+                continue
+
+            if not column.nullable:
+                logger.warning(f"无法自动添加非空列: {table.name}.{column.name}，请手动迁移")
+                continue
+
+            column_type = column.type.compile(dialect=conn.dialect)
+            conn.exec_driver_sql(
+                f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}'
+            )
+            added.append(f"{table.name}.{column.name}")
+            logger.info(f"数据库迁移: 新增列 {table.name}.{column.name} ({column_type})")
+
+    return added
+
+
+# 保存了完整上下文拷贝（context_history）的消息表
+_CONTEXT_HISTORY_TABLES = ("debate_messages", "binary_choice_messages")
+
+
+def compact_context_history(conn: Connection, batch_size: int = 500) -> int:
+    """
+    将旧消息的 context_history 完整拷贝转换为序号范围（context_start / context_end）
+
+    旧数据中第 N 条消息的 context_history 就是"初始消息 + 前 N-1 条发言"，
+    与按序号还原的完整记录一致，因此只需记录长度即可无损转换。
+
+    注意：SQLite 删除数据后文件不会自动缩小，需要时可手动执行 VACUUM。
+
+    Args:
+        conn: 同步连接（通过 AsyncConnection.run_sync 调用）
+
+    Returns:
+        转换的消息条数
+    """
+    converted = 0
+
+    for table_name in _CONTEXT_HISTORY_TABLES:
+        table = Base.metadata.tables.get(table_name)
+        if table is None:
+            continue
+
+        rows = conn.execute(
+            select(table.c.id, table.c.context_history).where(
+                table.c.context_end.is_(None),
+                table.c.context_history.is_not(None),
+            )
+        ).all()
+        # JSON 列的 None 会被存为 JSON null，这里只转换真正保存了列表的行
+        rows = [row for row in rows if isinstance(row.context_history, list)]
+        if not rows:
+            continue
+
+        stmt = (
+            table.update()
+            .where(table.c.id == bindparam("row_id"))
+            .values(context_start=0, context_end=bindparam("end"), context_history=null())
+        )
+        params = [
+            {"row_id": row.id, "end": len(row.context_history) - 1}
+            for row in rows
+        ]
+        for i in range(0, len(params), batch_size):
+            conn.execute(stmt, params[i:i + batch_size])
+
+        converted += len(params)
+        logger.info(f"数据库迁移: {table_name} 转换 {len(params)} 条消息的上下文为序号范围")
+
+    return converted
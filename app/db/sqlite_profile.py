@@ -0,0 +1,181 @@
+"""SQLite 连接配置：连接建立时设置 WAL、busy_timeout、mmap 等 PRAGMA，并在后台定期做 WAL 检查点"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Optional
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import get_settings
+
+settings = get_settings()
+
+PROFILE_DEFAULT = "default"  # 不设置任何 PRAGMA（回滚日志、无 mmap）
+PROFILE_PRODUCTION = "production"  # WAL + SQLITE_* 配置
+
+
+@dataclass(frozen=True)
+class SQLiteProfile:
+    """一组连接级 PRAGMA（None 表示保持 SQLite 默认值）"""
+    name: str
+    journal_mode: Optional[str] = None
+    synchronous: Optional[str] = None
+    busy_timeout_ms: Optional[int] = None
+    mmap_size: Optional[int] = None
+    cache_size_kb: Optional[int] = None
+    temp_store: Optional[str] = None
+    wal_autocheckpoint: Optional[int] = None
+
+    def pragmas(self) -> list[str]:
+        values = [
+            # journal_mode 必须最先设置：WAL 是数据库文件级的持久设置，其余 PRAGMA 只对当前连接生效
+            ("journal_mode", self.journal_mode),
+            ("synchronous", self.synchronous),
+            ("busy_timeout", self.busy_timeout_ms),
+            ("mmap_size", self.mmap_size),
+            ("cache_size", -self.cache_size_kb if self.cache_size_kb else None),  # 负数表示 KiB
+            ("temp_store", self.temp_store),
+            ("wal_autocheckpoint", self.wal_autocheckpoint),
+        ]
+        return [f"PRAGMA {name}={value}" for name, value in values if value is not None]
+
+
+def resolve_sqlite_profile(name: Optional[str] = None) -> SQLiteProfile:
+    """按名称（默认 SQLITE_PROFILE）得到连接配置，未知名称按 production 处理"""
+    name = (name or settings.sqlite_profile).lower()
+    if name == PROFILE_DEFAULT:
+        return SQLiteProfile(PROFILE_DEFAULT)
+    return SQLiteProfile(
+        PROFILE_PRODUCTION,
+        journal_mode="WAL",
+        synchronous=settings.sqlite_synchronous,
+        busy_timeout_ms=settings.sqlite_busy_timeout_ms,
+        mmap_size=settings.sqlite_mmap_size,
+        cache_size_kb=settings.sqlite_cache_size_kb,
+        temp_store=settings.sqlite_temp_store,
+        wal_autocheckpoint=settings.sqlite_wal_autocheckpoint,
+    )
+
+
+def install_sqlite_profile(engine: AsyncEngine, profile: Optional[SQLiteProfile] = None) -> Optional[SQLiteProfile]:
+    """
+    在引擎的每个新连接上执行连接配置中的 PRAGMA
+
+    非 SQLite 数据库直接返回 None。
+    """
+    if engine.dialect.name != "sqlite":
+        return None
+    profile = profile or resolve_sqlite_profile()
+    statements = profile.pragmas()
+    if not statements:
+        return profile
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+    logger.debug(f"SQLite 连接配置: {profile.name}（{'; '.join(statements)}）")
+    return profile
+
+
+def install_sqlite_write_mode(engine: AsyncEngine) -> None:
+    """
+    写连接：关闭驱动的隐式事务，由 SQLAlchemy 显式发出 BEGIN IMMEDIATE
+
+    sqlite3 驱动只在 DML 之前隐式 BEGIN，SAVEPOINT 会被当作独立事务提交；
+    显式 BEGIN IMMEDIATE 后 SAVEPOINT 可正常嵌套，并且开始事务时即获取写锁，
+    不会在读锁升级为写锁时与其他进程死锁。
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _disable_implicit_begin(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _begin_immediate(conn):
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def install_sqlite_read_only(engine: AsyncEngine) -> None:
+    """只读连接：PRAGMA query_only，误用读连接写入时直接报错而不是争抢写锁"""
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _query_only(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("PRAGMA query_only=1")
+        finally:
+            cursor.close()
+
+
+async def wal_checkpoint(engine: AsyncEngine, mode: str = "PASSIVE") -> Optional[tuple[int, int, int]]:
+    """
+    执行一次 WAL 检查点
+
+    - PASSIVE：不等待读写，尽量把 WAL 中的页写回数据库文件（不阻塞请求）
+    - TRUNCATE：等待读写结束（最多 busy_timeout），写回全部页并把 WAL 文件截断为 0
+
+    Returns:
+        (busy, WAL 总页数, 已写回页数)；非 WAL 模式时后两项为 -1，非 SQLite 数据库返回 None
+    """
+    if engine.dialect.name != "sqlite":
+        return None
+    async with engine.connect() as conn:
+        row = (await conn.exec_driver_sql(f"PRAGMA wal_checkpoint({mode})")).one()
+    return tuple(row)
+
+
+class WalCheckpointer:
+    """
+    WAL 检查点策略
+
+    - 提交时：WAL 超过 SQLITE_WAL_AUTOCHECKPOINT 页由提交的连接自动做 PASSIVE 检查点
+    - 后台：每 SQLITE_CHECKPOINT_INTERVAL_SECONDS 秒做一次 PASSIVE 检查点，
+      持续有读请求导致自动检查点写不完时，WAL 也不会无限增长
+    - 关闭时：做一次 TRUNCATE 检查点，WAL 文件截断为 0
+    """
+
+    def __init__(self, engine: AsyncEngine, interval_seconds: Optional[float] = None):
+        self.engine = engine
+        self.interval_seconds = settings.sqlite_checkpoint_interval_seconds if interval_seconds is None else interval_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self.engine.dialect.name != "sqlite" or self.interval_seconds <= 0 or self._task:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                busy, log_pages, checkpointed = await wal_checkpoint(self.engine, "PASSIVE")
+                if log_pages > 0 and checkpointed < log_pages:
+                    logger.debug(f"WAL 检查点未完成: {checkpointed}/{log_pages} 页（有进行中的读请求）")
+            except Exception as e:
+                logger.warning(f"WAL 检查点失败: {e}")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.engine.dialect.name == "sqlite":
+            try:
+                await wal_checkpoint(self.engine, "TRUNCATE")
+            except Exception as e:
+                logger.warning(f"关闭前 WAL 检查点失败: {e}")
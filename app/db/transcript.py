@@ -0,0 +1,35 @@
+"""讨论记录还原：消息只保存上下文的序号范围，调试时按需还原每条消息的上下文"""
+
+from typing import Iterable, Optional
+
+
+def build_transcript(initial_message: Optional[str], messages: Iterable) -> list[dict]:
+    """
+    还原讨论的完整记录
+
+    第 0 条为会话初始消息（评分/选择摘要），第 N 条为序号 N 的评委发言。
+
+    Args:
+        initial_message: 会话初始消息
+        messages: 讨论消息（DebateMessage / BinaryChoiceMessage）
+    """
+    transcript = [{"source": "user", "content": initial_message or ""}]
+    for msg in sorted(messages, key=lambda m: m.sequence):
+        transcript.append({"source": msg.speaker, "content": msg.content})
+    return transcript
+
+
+def message_context(transcript: list[dict], message) -> Optional[list[dict]]:
+    """
+    还原某条消息发言时看到的上下文
+
+    新数据按 context_start/context_end 从完整记录切片；旧数据直接返回保存的 context_history。
+    context_start > 0 表示上下文被压缩：模型看到的是第 0 条初始消息 + 早前发言的摘要 + 从 context_start 起的原文。
+    """
+    if message.context_end is not None:
+        start = message.context_start or 0
+        if start <= 0:
+            return transcript[:message.context_end + 1]
+        summary = {"source": "summary", "content": f"【早前讨论摘要】第 1-{start - 1} 条发言已压缩为摘要"}
+        return [transcript[0], summary, *transcript[start:message.context_end + 1]]
+    return message.context_history
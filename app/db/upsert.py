@@ -0,0 +1,46 @@
+"""单语句 upsert：INSERT ... ON CONFLICT DO UPDATE ... RETURNING（SQLite / PostgreSQL）"""
+
+from datetime import datetime
+from typing import TypeVar
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+T = TypeVar("T")
+
+_INSERT_BY_DIALECT = {
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert,
+}
+
+
+async def upsert(db: AsyncSession, model: type[T], values: dict, key: str = "entry_id") -> T:
+    """
+    按主键插入一行，已存在时用 values 覆盖这些列，一次往返返回最新的 ORM 对象
+
+    先 SELECT 再 INSERT / UPDATE 需要多次往返，并且同一主键的并发请求都可能走到 INSERT 而冲突；
+    ON CONFLICT 由数据库原子地决定插入还是更新。
+
+    - 只更新 values 中给出的列（其余列如 timings 保留原值），模型有 updated_at 时一并刷新
+      （ON CONFLICT 的 UPDATE 不会触发 Column.onupdate）
+    - 其他数据库退回 session.merge()（先查询再插入或更新）
+
+    Args:
+        db: 数据库会话
+        model: ORM 模型
+        values: 列值（须包含主键 key）
+        key: 冲突判断使用的主键列
+    """
+    insert = _INSERT_BY_DIALECT.get(db.get_bind().dialect.name)
+    if insert is None:
+        return await db.merge(model(**values))
+
+    stmt = insert(model).values(**values)
+    set_ = {column: stmt.excluded[column] for column in values if column != key}
+    if "updated_at" in model.__table__.c:
+        set_["updated_at"] = datetime.utcnow()
+    stmt = stmt.on_conflict_do_update(index_elements=[key], set_=set_).returning(model)
+
+    # populate_existing：会话中已有该对象时用返回的行覆盖
+    result = await db.scalars(stmt, execution_options={"populate_existing": True})
+    return result.one()
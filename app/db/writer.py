@@ -0,0 +1,162 @@
+"""
+数据库写入队列：所有写操作交给一个后台任务，按批在同一个事务中提交（group commit）
+
+SQLite 同一时刻只允许一个写事务。每个请求各自提交时，请求之间争抢写锁，
+输家在 busy handler 中退避重试，写入耗时的长尾随并发数急剧上升。
+写入队列只用一个写连接：请求把写操作（crud 中的 save_* / open_* / append_* 等函数）
+交给队列并等待结果，队列把排队中的写操作合并为一个事务提交，锁争用和提交次数都随之消失。
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.config import get_settings
+
+settings = get_settings()
+
+T = TypeVar("T")
+
+# 写操作：接收写会话，只修改会话、不提交
+WriteOperation = Callable[..., Awaitable[T]]
+
+
+@dataclass
+class _WriteJob:
+    operation: WriteOperation
+    args: tuple
+    kwargs: dict
+    future: asyncio.Future = field(repr=False)
+
+
+class DatabaseWriter:
+    """
+    单写者队列
+
+    - submit()：提交一个写操作并等待其结果（事务提交后返回）
+    - 每批最多合并 max_batch 个写操作，在一个事务中执行并提交；
+      批内某个写操作失败时整批回滚，再逐个单独提交，异常只传给失败写操作的提交者
+      （写操作因此可能执行两次，它们只修改会话，重新执行没有副作用）
+    - enabled=False 时不排队，每次写入使用独立会话直接提交（非 SQLite 数据库或调试时使用）
+
+    后台任务在服务启动时 start()，也会在第一次 submit() 时自动启动（脚本、基准中直接使用）。
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        enabled: Optional[bool] = None,
+        max_batch: Optional[int] = None,
+    ):
+        self.session_factory = session_factory
+        self.enabled = settings.db_single_writer if enabled is None else enabled
+        self.max_batch = max(1, max_batch or settings.db_writer_max_batch)
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stats = {"jobs": 0, "failed_jobs": 0, "batches": 0, "failed_batches": 0, "max_batch_size": 0}
+
+    def start(self) -> None:
+        """启动后台写入任务（已在当前事件循环中运行时不重复启动）"""
+        loop = asyncio.get_running_loop()
+        if self._task and not self._task.done() and self._loop is loop:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """等待已排队的写操作提交完成后停止"""
+        if not self._task or self._loop is not asyncio.get_running_loop():
+            self._task = None
+            return
+        await self._queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def submit(self, operation: WriteOperation, *args: Any, **kwargs: Any) -> T:
+        """
+        执行一个写操作：operation(写会话, *args, **kwargs)
+
+        Returns:
+            写操作的返回值（返回的 ORM 对象已脱离会话，可读取已加载的字段）
+        """
+        if not self.enabled:
+            async with self.session_factory() as session:
+                async with session.begin():
+                    return await operation(session, *args, **kwargs)
+
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(_WriteJob(operation, args, kwargs, future))
+        # 提交者被取消（如客户端断开）时写操作照常执行
+        return await asyncio.shield(future)
+
+    async def _run(self) -> None:
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            # 上一批提交期间到达的写操作合并为一批
+            while len(batch) < self.max_batch and not queue.empty():
+                batch.append(queue.get_nowait())
+            try:
+                await self._commit_batch(batch)
+            except Exception as e:
+                logger.error(f"写入队列提交失败: {len(batch)} 个写操作 - {e}")
+                for job in batch:
+                    if not job.future.done():
+                        job.future.set_exception(e)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def _commit_batch(self, batch: list[_WriteJob]) -> None:
+        try:
+            values = await self._execute(batch)
+        except Exception as e:
+            if len(batch) == 1:
+                self._stats["failed_jobs"] += 1
+                if not batch[0].future.done():
+                    batch[0].future.set_exception(e)
+                return
+            # 整批回滚后逐个重试：失败的写操作只影响它自己的提交者
+            logger.warning(f"写入批次失败，逐个重试 {len(batch)} 个写操作: {e}")
+            self._stats["failed_batches"] += 1
+            for job in batch:
+                await self._commit_batch([job])
+            return
+
+        # 事务提交成功后才通知提交者
+        self._stats["batches"] += 1
+        self._stats["jobs"] += len(batch)
+        self._stats["max_batch_size"] = max(self._stats["max_batch_size"], len(batch))
+        for job, value in zip(batch, values):
+            if not job.future.done():
+                job.future.set_result(value)
+
+    async def _execute(self, batch: list[_WriteJob]) -> list[Any]:
+        values = []
+        async with self.session_factory() as session:
+            async with session.begin():
+                for job in batch:
+                    values.append(await job.operation(session, *job.args, **job.kwargs))
+                    # 逐个 flush，保证后一个写操作中的 UPDATE/DELETE 能看到前一个写操作新增的行
+                    await session.flush()
+        return values
+
+    def stats(self) -> dict:
+        """写入次数、批次数和批大小（用于诊断）"""
+        batches = self._stats["batches"]
+        return {
+            "enabled": self.enabled,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            **self._stats,
+            "avg_batch_size": round(self._stats["jobs"] / batches, 2) if batches else 0.0,
+        }
@@ -1,10 +1,11 @@
 """二选一模式的提示词定义"""
 
-import json
 import re
 
 # 从现有prompts导入共享的评委persona
 from app.judges.prompts import JUDGE_PERSONAS, parse_judge_response
+from app.judges.json_extract import extract_json_object, extract_tag
+from app.judges.parse_guard import ParseGuard
 
 
 # ============ 1. 二选一评分规范 ============
@@ -162,6 +163,11 @@ def build_binary_choice_summary_text(
     return "\n".join(summary_lines)
 
 
+# JSON 不完整（如输出被截断）时，直接从文本中找字段
+_CHOICE_FIELD_PATTERN = re.compile(r'"choice"\s*:\s*"([ABab])"')
+_REASONING_FIELD_PATTERN = re.compile(r'"reasoning"\s*:\s*"([^"]+)"')
+
+
 def parse_binary_choice_response(raw_response: str) -> dict:
     """
     解析二选一评委的响应
@@ -174,6 +180,8 @@ def parse_binary_choice_response(raw_response: str) -> dict:
         - choice: "A" 或 "B"
         - reasoning: 理由
         - inner_monologue: 内心独白（可选）
+
+    超长输出只解析首尾窗口，超出时间预算后不再做后续提取（见 ParseGuard）。
     """
     result = {
         "choice": None,
@@ -181,45 +189,38 @@ def parse_binary_choice_response(raw_response: str) -> dict:
         "inner_monologue": None,
     }
     
-    # 提取 inner_monologue
-    monologue_match = re.search(
-        r'<inner_monologue>(.*?)</inner_monologue>',
-        raw_response,
-        re.DOTALL | re.IGNORECASE
-    )
-    if monologue_match:
-        result["inner_monologue"] = monologue_match.group(1).strip()
-    
-    # 提取 JSON 部分
-    json_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', raw_response, re.DOTALL)
-    if json_match:
-        try:
-            json_content = json_match.group(1).strip()
-            parsed_json = json.loads(json_content)
-            
+    with ParseGuard("parse_binary_choice_response", raw_response) as guard:
+        raw_response = guard.text
+        
+        # 提取 inner_monologue
+        result["inner_monologue"] = extract_tag(raw_response, "inner_monologue")
+        
+        # 提取 JSON 部分（单次扫描，代码块内外均可，优先取包含 choice 的对象）
+        parsed_json = extract_json_object(raw_response, required_keys=("choice",), deadline=guard.deadline)
+        if parsed_json:
             # 提取 choice（必须是 A 或 B）
-            choice = parsed_json.get("choice", "").strip().upper()
+            choice = str(parsed_json.get("choice") or "").strip().upper()
             if choice in ["A", "B"]:
                 result["choice"] = choice
             
             # 提取 reasoning
-            result["reasoning"] = parsed_json.get("reasoning", "").strip()
-            
-        except json.JSONDecodeError as e:
-            # JSON 解析失败，尝试提取关键字段
-            pass
-    
-    # 如果 JSON 解析失败，尝试从文本中提取
-    if not result["choice"]:
-        # 尝试匹配 "choice": "A" 或 "choice": "B"
-        choice_match = re.search(r'"choice"\s*:\s*"([ABab])"', raw_response)
-        if choice_match:
-            result["choice"] = choice_match.group(1).upper()
-    
-    if not result["reasoning"]:
-        # 尝试匹配 "reasoning": "..."
-        reasoning_match = re.search(r'"reasoning"\s*:\s*"([^"]+)"', raw_response)
-        if reasoning_match:
-            result["reasoning"] = reasoning_match.group(1)
+            result["reasoning"] = str(parsed_json.get("reasoning") or "").strip()
+        
+        # 超出时间预算时不再做后续提取
+        if guard.expired():
+            return result
+        
+        # 如果 JSON 解析失败，尝试从文本中提取
+        if not result["choice"]:
+            # 尝试匹配 "choice": "A" 或 "choice": "B"
+            choice_match = _CHOICE_FIELD_PATTERN.search(raw_response)
+            if choice_match:
+                result["choice"] = choice_match.group(1).upper()
+        
+        if not result["reasoning"]:
+            # 尝试匹配 "reasoning": "..."
+            reasoning_match = _REASONING_FIELD_PATTERN.search(raw_response)
+            if reasoning_match:
+                result["reasoning"] = reasoning_match.group(1)
     
     return result
@@ -1,6 +1,7 @@
 """二选一模式阶段一：多评委做出选择并给出理由"""
 
 import asyncio
+import time
 from typing import Optional
 from io import BytesIO
 from pathlib import Path
@@ -12,12 +13,35 @@ from autogen_agentchat.messages import MultiModalMessage, TextMessage
 from autogen_core import Image as AGImage
 from loguru import logger
 
+from app.config import get_settings
 from app.judges.binary_choice_prompts import (
     BINARY_CHOICE_GUIDE,
     JUDGE_PERSONAS,
     parse_binary_choice_response
 )
-from app.judges.utils import make_vision_client, get_model_for_judge
+from app.judges.judge_cache import get_binary_choice_judge_specs, get_model_client
+from app.judges.output_limits import STAGE_SCORING, record_parse_failure
+from app.judges.parse_guard import preview
+from app.judges.structured_output import (
+    MODE_FREEFORM,
+    MODE_STRUCTURED,
+    SCHEMA_BINARY_CHOICE,
+    STRUCTURED_OUTPUT_NOTE,
+    parse_structured_output,
+    record_stage_one_parse,
+    structured_output_enabled,
+)
+from app.judges.stream_parser import (
+    FIELD_CHOICE,
+    ChoiceQuorum,
+    IncrementalJudgeParser,
+    PartialField,
+    ProgressCallback,
+    stream_judge_response,
+)
+from app.timing import PhaseTimer
+
+settings = get_settings()
 
 
 def build_binary_choice_judges() -> tuple[list[AssistantAgent], dict]:
@@ -30,42 +54,41 @@ def build_binary_choice_judges() -> tuple[list[AssistantAgent], dict]:
     judges = []
     debug_contexts = {}
     
-    for judge_id, persona_info in JUDGE_PERSONAS.items():
-        model_name = get_model_for_judge(judge_id)
-        display_name = persona_info.get("display_name", judge_id)
-        persona = persona_info.get("persona", "")
-        
-        # 构建完整的 system message（二选一指南 + 评委人设）
-        system_message = BINARY_CHOICE_GUIDE + persona
-        
+    # 评委规格按配置缓存，只在首次请求时构建
+    specs = get_binary_choice_judge_specs(BINARY_CHOICE_GUIDE, JUDGE_PERSONAS)
+    
+    # 结构化输出模式：网关按 BinaryChoiceOutput 的 JSON Schema 约束输出
+    structured = structured_output_enabled()
+    
+    for spec in specs:
         # 保存调试上下文
-        debug_contexts[judge_id] = {
-            "model_name": model_name,
-            "display_name": display_name,
-            "system_message": system_message,
-            "persona": persona,
+        debug_contexts[spec.judge_id] = {
+            "model_name": spec.model_name,
+            "display_name": spec.display_name,
+            "system_message": spec.system_message,
+            "persona": spec.persona,
             "guide": BINARY_CHOICE_GUIDE,
         }
         
         try:
-            model_client = make_vision_client(model=model_name, family="openai")
-            
             judge = AssistantAgent(
-                name=judge_id,
-                model_client=model_client,
-                system_message=system_message,
+                name=spec.judge_id,
+                model_client=get_model_client(
+                    spec.model_name,
+                    vision=True,
+                    stage=STAGE_SCORING,
+                    judge_id=spec.judge_id,
+                    response_schema=SCHEMA_BINARY_CHOICE if structured else None,
+                ),
+                system_message=spec.system_message + (STRUCTURED_OUTPUT_NOTE if structured else ""),
+                model_client_stream=settings.stage_one_streaming,
             )
             
             judges.append(judge)
-            
-            logger.info("="*80)
-            logger.info(f"[二选一-阶段一] 创建评委: {judge_id} ({display_name})")
-            logger.info(f"模型: {model_name}")
-            logger.debug(f"System Message 长度: {len(system_message)} 字符")
-            logger.info("="*80)
+            logger.debug(f"[二选一-阶段一] 创建评委: {spec.judge_id} ({spec.display_name}), 模型: {spec.model_name}")
             
         except Exception as e:
-            logger.error(f"创建评委失败: {judge_id} - {e}")
+            logger.error(f"创建评委失败: {spec.judge_id} - {e}")
             continue
     
     return judges, debug_contexts
@@ -161,6 +184,8 @@ async def binary_choice_with_all_judges(
     image_url: Optional[str] = None,
     text_content: Optional[str] = None,
     extra_context: Optional[str] = None,
+    timer: Optional[PhaseTimer] = None,
+    on_progress: Optional[ProgressCallback] = None,
 ) -> dict:
     """
     二选一阶段一主函数：所有评委做出选择并给出理由
@@ -173,6 +198,12 @@ async def binary_choice_with_all_judges(
         image_url: 图片 URL（可选）
         text_content: 文本内容（可选）
         extra_context: 额外上下文（可选）
+        timer: 分阶段计时器
+        on_progress: 进度回调：评委输出中的字段（独白、选择）一完整就推送 field 事件，
+            评委完成时推送 judge 事件；某个选项已获得过半票数（剩余评委无法改变结果）时
+            推送 decision 事件（开启 STAGE_ONE_STREAMING 时这些事件在输出结束前到达）。
+            decision 只是提前上报：剩余评委照常输出完毕，本函数仍在所有评委结束后返回，
+            讨论和票数统计使用全部评委的结果
     
     Returns:
         包含所有评委选择结果的字典
@@ -180,6 +211,7 @@ async def binary_choice_with_all_judges(
     logger.info(f"开始二选一阶段一: entry_id={entry_id}")
     logger.info(f"问题: {question}")
     logger.info(f"选项 A: {option_a}, 选项 B: {option_b}")
+    timer = timer or PhaseTimer()
     
     # 验证至少有图片或文本之一
     if not image_url and not text_content:
@@ -191,15 +223,16 @@ async def binary_choice_with_all_judges(
     
     # 1. 构建消息
     try:
-        msg = build_binary_choice_message(
-            question=question,
-            option_a=option_a,
-            option_b=option_b,
-            entry_id=entry_id,
-            image_url=image_url,
-            text_content=text_content,
-            extra_context=extra_context,
-        )
+        with timer.phase("image_fetch"):
+            msg = build_binary_choice_message(
+                question=question,
+                option_a=option_a,
+                option_b=option_b,
+                entry_id=entry_id,
+                image_url=image_url,
+                text_content=text_content,
+                extra_context=extra_context,
+            )
     except Exception as e:
         logger.error(f"构建消息失败: {e}")
         return {
@@ -209,7 +242,8 @@ async def binary_choice_with_all_judges(
         }
     
     # 2. 构建评委团队
-    judges, debug_contexts = build_binary_choice_judges()
+    with timer.phase("build_judges"):
+        judges, debug_contexts = build_binary_choice_judges()
     
     if not judges:
         logger.error("没有可用的评委")
@@ -228,11 +262,66 @@ async def binary_choice_with_all_judges(
     # 3. 并发调用所有评委
     logger.info(f"开始并发调用 {len(judges)} 个评委...")
     
-    tasks = [judge.on_messages([msg], cancellation_token=None) for judge in judges]
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+    quorum = ChoiceQuorum(len(judges))
+    judges_start = time.perf_counter()
+    
+    async def on_decision(choice: Optional[str]):
+        # 只上报多数已形成（耗时 + decision 事件），不取消剩余评委
+        if not choice:
+            return
+        elapsed_ms = (time.perf_counter() - judges_start) * 1000
+        timer.record("quorum", elapsed_ms)
+        logger.info(f"二选一多数已形成: {choice} 已获得过半票数 {quorum.votes}（{elapsed_ms:.0f}ms），等待剩余评委完成")
+        if on_progress:
+            await on_progress("decision", {
+                "choice": choice,
+                "choice_label": option_a if choice == "A" else option_b,
+                "votes": dict(quorum.votes),
+                "elapsed_ms": round(elapsed_ms, 1),
+            })
     
-    # 4. 解析评委响应
+    async def call_judge(judge: AssistantAgent):
+        t0 = time.perf_counter()
+        parser = IncrementalJudgeParser((FIELD_CHOICE,))
+        
+        async def on_field(partial: PartialField):
+            elapsed_ms = (time.perf_counter() - t0) * 1000
+            if partial.field == FIELD_CHOICE:
+                # 选择到达的时间（流式模式下早于整条输出结束）
+                timer.record_judge("stage_one_choice", judge.name, elapsed_ms)
+            if on_progress:
+                await on_progress("field", {
+                    "judge_id": judge.name,
+                    "field": partial.field,
+                    "value": partial.value,
+                    "elapsed_ms": round(elapsed_ms, 1),
+                })
+            if partial.field == FIELD_CHOICE:
+                await on_decision(quorum.add(partial.value))
+        
+        error = None
+        try:
+            return await stream_judge_response(judge, [msg], parser, on_field)
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - t0) * 1000
+            timer.record_judge("stage_one", judge.name, elapsed_ms)
+            if on_progress:
+                await on_progress("judge", {"judge_id": judge.name, "elapsed_ms": round(elapsed_ms, 1), "error": error})
+            if FIELD_CHOICE not in parser.fields:
+                await on_decision(quorum.drop())
+    
+    with timer.phase("judges"):
+        tasks = [call_judge(judge) for judge in judges]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+    
+    # 4. 解析评委响应（结构化输出模式只做 Schema 校验，不做正则提取）
     judge_outputs = []
+    parse_start = time.perf_counter()
+    structured = structured_output_enabled()
+    parse_mode = MODE_STRUCTURED if structured else MODE_FREEFORM
     
     for judge, result in zip(judges, results):
         # 获取评委显示名称
@@ -257,11 +346,22 @@ async def binary_choice_with_all_judges(
             
             logger.info("="*80)
             logger.info(f"[二选一-阶段一] 评委 {judge.name} 原始输出:")
-            logger.info(f"{raw_content}")
+            logger.info(preview(raw_content))
             logger.info("="*80)
             
             # 解析二选一响应
-            data = parse_binary_choice_response(raw_content)
+            if structured:
+                data = parse_structured_output(SCHEMA_BINARY_CHOICE, raw_content)
+            else:
+                data = parse_binary_choice_response(raw_content)
+            
+            model_name = debug_contexts.get(judge.name, {}).get("model_name", judge.name)
+            record_stage_one_parse(
+                model_name,
+                parse_mode,
+                bool(data and data.get("choice") and data.get("reasoning")),
+                timer.judges.get("stage_one", {}).get(judge.name, 0.0),
+            )
             
             if data and data.get("choice") and data.get("reasoning"):
                 # 确定选择的标签
@@ -293,6 +393,7 @@ async def binary_choice_with_all_judges(
                 logger.success(f"评委 {judge.name} 选择成功: {data['choice']} ({choice_label})")
             else:
                 logger.warning(f"评委 {judge.name} 返回的数据不完整")
+                record_parse_failure(STAGE_SCORING, judge.name)
                 judge_outputs.append({
                     "judge_id": judge.name,
                     "judge_display_name": judge_display_name,
@@ -304,6 +405,7 @@ async def binary_choice_with_all_judges(
         
         except Exception as e:
             logger.error(f"解析评委 {judge.name} 响应失败: {e}")
+            record_parse_failure(STAGE_SCORING, judge.name)
             judge_outputs.append({
                 "judge_id": judge.name,
                 "judge_display_name": judge_display_name,
@@ -312,6 +414,8 @@ async def binary_choice_with_all_judges(
                 "reasoning": None,
             })
     
+    timer.record("parse", (time.perf_counter() - parse_start) * 1000)
+    
     # 5. 统计选择
     valid_results = [r for r in judge_outputs if r.get("choice")]
     choice_a_count = len([r for r in valid_results if r["choice"] == "A"])
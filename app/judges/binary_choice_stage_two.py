@@ -1,10 +1,12 @@
 """二选一模式阶段二：评委群聊讨论"""
 
-from typing import Optional
+import time
+from typing import Awaitable, Callable, Optional, Sequence
 from autogen_agentchat.agents import AssistantAgent
 from autogen_agentchat.teams import SelectorGroupChat
-from autogen_agentchat.conditions import MaxMessageTermination
-from autogen_agentchat.messages import TextMessage
+from autogen_agentchat.base import TaskResult
+from autogen_agentchat.messages import BaseChatMessage, TextMessage, SelectSpeakerEvent
+from autogen_core import CancellationToken
 from loguru import logger
 
 from app.judges.binary_choice_prompts import (
@@ -13,8 +15,23 @@ from app.judges.binary_choice_prompts import (
     build_binary_choice_summary_text,
 )
 from app.judges.prompts import SELECTOR_PROMPT_TEMPLATE
-from app.judges.utils import make_text_client, get_model_for_judge
+from app.judges.utils import get_model_for_judge
+from app.judges.judge_cache import (
+    get_debate_judge_specs,
+    get_cached_selector_prompt,
+    get_model_client,
+)
+from app.judges.context_window import DebateChatCompletionContext, turn_context_metrics, turn_context_start
+from app.judges.speaker_selector import build_speaker_selector, SELECTOR_MODE_LOCAL
+from app.judges.debate_rounds import run_parallel_rounds, DEBATE_MODE_PARALLEL, ROUND_METADATA_KEY
+from app.judges.debate_checkpoint import DebateCheckpoint, resume_team_stream, team_checkpoint_state
+from app.judges.termination import build_debate_termination, remaining_token_budget, stream_with_deadline
+from app.judges.cleaner import clean_debate_message
+from app.judges.output_limits import STAGE_DEBATE, STAGE_SELECTOR
+from app.judges.parse_guard import preview
+from app.judges.latency import model_latency, speaker_report
 from app.config import get_settings
+from app.timing import PhaseTimer
 
 settings = get_settings()
 
@@ -41,10 +58,14 @@ def build_binary_choice_debate_judges(
             if "judge_id" in res:
                 judge_result_map[res["judge_id"]] = res
     
-    for judge_id, persona_info in JUDGE_PERSONAS.items():
-        model_name = get_model_for_judge(judge_id)
-        display_name = persona_info.get("display_name", judge_id)
-        persona = persona_info.get("persona", "")
+    # 人设 + 讨论模式说明 的拼接结果按配置缓存
+    specs = get_debate_judge_specs(JUDGE_PERSONAS, BINARY_CHOICE_DEBATE_INSTRUCTION)
+    
+    for spec in specs:
+        judge_id = spec.judge_id
+        model_name = spec.model_name
+        display_name = spec.display_name
+        persona = spec.persona
         
         # 构建自我选择上下文
         self_context = ""
@@ -72,7 +93,7 @@ def build_binary_choice_debate_judges(
 """
         
         # 讨论模式的 system message
-        system_message = persona + BINARY_CHOICE_DEBATE_INSTRUCTION + self_context
+        system_message = spec.system_message + self_context
         
         # 保存调试上下文
         debug_contexts[judge_id] = {
@@ -86,16 +107,16 @@ def build_binary_choice_debate_judges(
         }
         
         try:
-            model_client = make_text_client(model=model_name, family="openai")
-            
             judge = AssistantAgent(
                 name=judge_id,
-                model_client=model_client,
+                model_client=get_model_client(model_name, vision=False, stage=STAGE_DEBATE, judge_id=judge_id),
                 system_message=system_message,
+                # 最近 K 轮原文 + 早前发言滚动摘要，控制 prompt 随讨论轮数的增长
+                model_context=DebateChatCompletionContext(system_message=system_message),
             )
             
             judges.append(judge)
-            logger.info(f"[二选一-阶段二] 创建讨论评委成功: {judge_id} ({display_name})")
+            logger.debug(f"[二选一-阶段二] 创建讨论评委成功: {judge_id} ({display_name})")
             
         except Exception as e:
             logger.error(f"创建讨论评委失败: {judge_id} - {e}")
@@ -114,14 +135,24 @@ def build_selector_prompt(judges: list[AssistantAgent]) -> str:
     Returns:
         完整的选择器 prompt
     """
+    judge_names = [judge.name for judge in judges]
+    return get_cached_selector_prompt(
+        judge_names,
+        JUDGE_PERSONAS,
+        lambda: _build_selector_prompt_text(judge_names),
+    )
+
+
+def _build_selector_prompt_text(judge_names: list[str]) -> str:
+    """拼接选择器 prompt（结果由 build_selector_prompt 缓存）"""
     roles_list = []
     
-    for judge in judges:
-        if judge.name not in JUDGE_PERSONAS:
+    for judge_name in judge_names:
+        if judge_name not in JUDGE_PERSONAS:
             continue
             
-        persona_text = JUDGE_PERSONAS[judge.name]['persona']
-        display_name = JUDGE_PERSONAS[judge.name]['display_name']
+        persona_text = JUDGE_PERSONAS[judge_name]['persona']
+        display_name = JUDGE_PERSONAS[judge_name]['display_name']
         
         # 尝试提取核心性格
         try:
@@ -134,10 +165,10 @@ def build_selector_prompt(judges: list[AssistantAgent]) -> str:
         except Exception:
             core_trait = "性格鲜明"
             
-        roles_list.append(f"- {judge.name}: {display_name} - {core_trait}")
+        roles_list.append(f"- {judge_name}: {display_name} - {core_trait}")
 
     roles = "\n".join(roles_list)
-    participants = ", ".join([judge.name for judge in judges])
+    participants = ", ".join(judge_names)
     
     return SELECTOR_PROMPT_TEMPLATE.format(
         roles=roles,
@@ -153,6 +184,14 @@ async def run_binary_choice_debate(
     option_b: str,
     judge_results: list[dict],
     max_messages: Optional[int] = None,
+    timer: Optional[PhaseTimer] = None,
+    debate_mode: Optional[str] = None,
+    on_message: Optional[Callable[[dict], Awaitable[None]]] = None,
+    on_start: Optional[Callable[[dict], Awaitable[None]]] = None,
+    on_checkpoint: Optional[Callable[[int, dict], Awaitable[None]]] = None,
+    checkpoint: Optional[DebateCheckpoint] = None,
+    deadline_seconds: Optional[float] = None,
+    token_budget: Optional[int] = None,
 ) -> dict:
     """
     二选一阶段二主函数：评委群聊讨论
@@ -164,11 +203,20 @@ async def run_binary_choice_debate(
         option_b: 选项 B
         judge_results: 阶段一的评委选择结果
         max_messages: 最大消息数
+        timer: 分阶段计时器（记录构建、选择器和每轮发言耗时）
+        debate_mode: sequential（逐轮发言）/ parallel（每轮多人并发发言），None 则使用配置
+        on_message: 每产生一条清洗后的发言时回调（用于逐条落库）
+        on_start: 讨论开始前回调，参数为参与评委和调试信息（用于先行落库会话信息）
+        on_checkpoint: 每条发言回调之后调用，参数为 (发言序号, team 状态)（仅逐轮模式）
+        checkpoint: 断点数据，传入时从已落库的发言继续讨论
+        deadline_seconds: 讨论时限（秒），到期后返回已产生的发言，None 则使用配置（<= 0 不限制）
+        token_budget: 评委发言的 token 总预算，None 则使用配置（<= 0 不限制）
     
     Returns:
         包含讨论消息的字典
     """
     logger.info(f"开始二选一阶段二群聊讨论: entry_id={entry_id}")
+    timer = timer or PhaseTimer()
     
     if not judge_results:
         logger.warning("没有评委选择结果，跳过讨论")
@@ -178,18 +226,22 @@ async def run_binary_choice_debate(
             "error": "没有评委选择结果",
         }
     
-    # 1. 生成选择摘要上下文
-    summary_text = build_binary_choice_summary_text(
-        entry_id=entry_id,
-        question=question,
-        option_a=option_a,
-        option_b=option_b,
-        judge_results=judge_results,
-    )
+    # 1. 生成选择摘要上下文（恢复讨论时沿用原讨论的初始消息）
+    if checkpoint:
+        summary_text = checkpoint.initial_message
+    else:
+        summary_text = build_binary_choice_summary_text(
+            entry_id=entry_id,
+            question=question,
+            option_a=option_a,
+            option_b=option_b,
+            judge_results=judge_results,
+        )
     
     logger.debug(f"选择摘要:\n{summary_text}")
     
     # 2. 构建讨论模式的评委
+    build_start = time.perf_counter()
     judges, debug_contexts = build_binary_choice_debate_judges(
         judge_results=judge_results,
     )
@@ -203,27 +255,54 @@ async def run_binary_choice_debate(
         }
     
     # 3. 创建选择器模型客户端
-    selector_client = make_text_client(
-        model=settings.model_selector,
-        family="openai"
-    )
+    selector_client = get_model_client(settings.model_selector, vision=False, stage=STAGE_SELECTOR)
     
-    # 4. 构建选择器 prompt
+    # 4. 构建选择器 prompt（本地选择模式下作为 LLM 兜底）
     selector_prompt = build_selector_prompt(judges)
+    # 并行讨论模式每轮需一次选出多人，只能使用本地选择器
+    debate_mode = (debate_mode or settings.debate_mode).lower()
+    parallel = debate_mode == DEBATE_MODE_PARALLEL
+    speaker_selector = build_speaker_selector(
+        participants=[j.name for j in judges],
+        stances={r["judge_id"]: r.get("choice") for r in judge_results if "judge_id" in r},
+        aliases={
+            judge_id: [info.get("display_name", judge_id)]
+            for judge_id, info in JUDGE_PERSONAS.items()
+        },
+        mode=SELECTOR_MODE_LOCAL if parallel else None,
+        latency_source=lambda: model_latency.snapshot(STAGE_DEBATE),
+    )
+    timer.record("debate_build", (time.perf_counter() - build_start) * 1000)
     
     # 5. 配置终止条件
     max_msgs = max_messages or settings.max_debate_messages
-    logger.info(f"[二选一-阶段二] 配置最大消息数: {max_msgs}")
-    termination = MaxMessageTermination(max_messages=max_msgs)
+    if deadline_seconds is None:
+        deadline_seconds = settings.debate_deadline_seconds
+    if token_budget is None:
+        token_budget = settings.debate_token_budget
+    # 恢复讨论时扣除已落库发言用掉的 token
+    token_budget = remaining_token_budget(token_budget, checkpoint.messages if checkpoint else ())
+    logger.info(
+        f"[二选一-阶段二] 配置最大消息数: {max_msgs}, 讨论模式: {debate_mode}, "
+        f"时限: {deadline_seconds or '不限'} 秒, token 预算: {token_budget or '不限'}"
+    )
     
-    # 6. 创建 SelectorGroupChat
-    try:
-        team = SelectorGroupChat(
+    # 最大消息数 + token 预算 + 收敛检测（评委开始重复观点时提前结束）
+    def team_factory(max_count: int, history: Sequence[BaseChatMessage] = ()) -> SelectorGroupChat:
+        return SelectorGroupChat(
             participants=judges,
             model_client=selector_client,
-            termination_condition=termination,
+            termination_condition=build_debate_termination(
+                max_count, [j.name for j in judges], history, token_budget=token_budget
+            ),
             selector_prompt=selector_prompt,
+            selector_func=speaker_selector,
+            emit_team_events=True,  # 产生 SelectSpeakerEvent，用于区分选择器耗时和发言耗时
         )
+    
+    # 6. 创建 SelectorGroupChat
+    try:
+        team = team_factory(max_msgs)
         
         logger.info(f"创建 SelectorGroupChat 成功，参与评委: {[j.name for j in judges]}")
         
@@ -235,8 +314,20 @@ async def run_binary_choice_debate(
             "error": f"创建群聊失败: {str(e)}",
         }
     
+    if on_start:
+        try:
+            await on_start({
+                "participants": [j.name for j in judges],
+                "judge_contexts": debug_contexts,
+                "selector_prompt": selector_prompt,
+                "initial_message": summary_text,
+            })
+        except Exception as e:
+            logger.warning(f"讨论开始回调失败: {e}")
+    
     # 7. 运行群聊
-    debate_messages = []
+    debate_start = time.perf_counter()
+    debate_messages = list(checkpoint.messages) if checkpoint else []
     all_messages_history = []
     
     try:
@@ -253,18 +344,65 @@ async def run_binary_choice_debate(
             "source": "user",
             "content": summary_text,
         })
+        all_messages_history.extend(
+            {"source": m["speaker"], "content": m["content"]} for m in debate_messages
+        )
         
         logger.info("=" * 80)
         logger.info("[二选一-阶段二] 群聊开始")
         logger.info(f"初始上下文:\n{summary_text}")
         logger.info("=" * 80)
         
-        # 运行 stream
-        result_stream = team.run_stream(task=initial_message)
+        # 运行 stream（并行模式没有 team，时限到期时直接取消本轮）
+        cancellation_token = None if parallel else CancellationToken()
+        if parallel:
+            # 并行模式：每轮多位评委基于同一快照并发发言
+            result_stream = run_parallel_rounds(
+                judges=judges,
+                initial_message=initial_message,
+                max_messages=max_msgs,
+                round_size=settings.debate_round_size,
+                selector=speaker_selector,
+                history=checkpoint.history_messages() if checkpoint else (),
+                termination=build_debate_termination(max_msgs, [j.name for j in judges], token_budget=token_budget),
+            )
+        elif checkpoint:
+            team, result_stream = await resume_team_stream(
+                team=team,
+                team_factory=team_factory,
+                initial_message=initial_message,
+                checkpoint=checkpoint,
+                max_messages=max_msgs,
+                participants=[j.name for j in judges],
+                cancellation_token=cancellation_token,
+            )
+        else:
+            result_stream = team.run_stream(task=initial_message, cancellation_token=cancellation_token)
+        # 时限在等待下一条发言时判断，到期取消进行中的模型调用
+        result_stream = stream_with_deadline(result_stream, deadline_seconds, cancellation_token)
         
-        # 收集消息
-        message_count = 0
+        # 收集消息（恢复时从已有发言之后继续编号）
+        message_count = len(debate_messages)
+        judge_map = {j.name: j for j in judges}
+        turn_mark = time.perf_counter()  # 上一个事件（发言或选择）的时间点
+        selector_ms = None
+        stop_reason = None
+        current_round = None  # 并行模式当前轮次，及该轮开始时完整记录的最后一条序号
+        round_context_end = 0
         async for event in result_stream:
+            now = time.perf_counter()
+            
+            # 讨论结束：记录终止原因（达到最大消息数 / 讨论收敛 / token 预算 / 时限）
+            if isinstance(event, TaskResult):
+                stop_reason = event.stop_reason
+                continue
+            
+            # 选择器完成选择：记录选择器耗时
+            if isinstance(event, SelectSpeakerEvent):
+                selector_ms = (now - turn_mark) * 1000
+                turn_mark = now
+                continue
+            
             event_type = event.__class__.__name__
             
             # 只处理消息类型的event
@@ -276,74 +414,14 @@ async def run_binary_choice_debate(
             if hasattr(event, 'source') and hasattr(event, 'content'):
                 # 过滤掉 user 和 system 消息，只保留评委发言
                 if event.source not in ["user", "system"] and event.source in [j.name for j in judges]:
-                    content = event.content if isinstance(event.content, str) else str(event.content)
-                    
-                    # 清洗逻辑（复用现有的清洗逻辑）
-                    import re
-                    
-                    # 去除 <thinking> 标签内容
-                    content = re.sub(r'<thinking>.*?</thinking>', '', content, flags=re.DOTALL)
-                    
-                    def extract_final_response(text: str) -> str:
-                        """提取最终回复"""
-                        final_markers = [
-                            r"所以最终发言应该是[：:]\\s*",
-                            r"所以组合起来[：:]\\s*",
-                            r"最终发言[：:]\\s*",
-                            r"最终[：:]\\s*",
-                        ]
-                        
-                        for marker in final_markers:
-                            matches = list(re.finditer(marker, text))
-                            if matches:
-                                last_match = matches[-1]
-                                return text[last_match.end():].strip()
-                        
-                        draft_markers = [
-                            r"比如[：:]\\s*",
-                            r"或者[：:]\\s*",
-                            r"或者更符合人设[：:]\\s*",
-                        ]
-                        
-                        last_draft_pos = -1
-                        for marker in draft_markers:
-                            matches = list(re.finditer(marker, text))
-                            if matches:
-                                pos = matches[-1].end()
-                                if pos > last_draft_pos:
-                                    last_draft_pos = pos
-                        
-                        if last_draft_pos != -1:
-                            return text[last_draft_pos:].strip()
-                            
-                        return text
-                    
-                    extracted_content = extract_final_response(content)
+                    turn_ms = (now - turn_mark) * 1000
+                    turn_mark = now
+                    raw_response = event.content if isinstance(event.content, str) else str(event.content)
                     
-                    def is_thinking_block(text_block: str) -> bool:
-                        keywords = ["人设", "扮演", "口头禅", "首先", "然后", "用户", "需要我", "对话", "观点", "反驳", "支持", "要注意", "比如", "或者"]
-                        hit_count = sum(1 for kw in keywords if kw in text_block)
-                        
-                        if (text_block.startswith("我") or text_block.startswith("用户")) and ("扮演" in text_block or "人设" in text_block):
-                            return True
-                        if hit_count >= 3:
-                            return True
-                        return False
+                    # 清洗：去除 <thinking> 标签和思维链，提取最终发言
+                    content = clean_debate_message(raw_response)
                     
-                    lines = extracted_content.split('\n')
-                    cleaned_lines = []
-                    for line in lines:
-                        line = line.strip()
-                        if not line:
-                            continue
-                        if not is_thinking_block(line):
-                            cleaned_lines.append(line)
-                        else:
-                            logger.debug(f"检测到思维链并移除: {line[:50]}...")
-                    
-                    content = '\n'.join(cleaned_lines).strip()
-                    
-                    # 如果清洗后内容为空，跳过
+                    # 如果清洗后内容为空，说明这条消息纯粹是思维链，跳过
                     if not content:
                         logger.warning(f"跳过纯思维链消息: {event.source}")
                         continue
@@ -352,17 +430,28 @@ async def run_binary_choice_debate(
                     
                     # 获取该评委的模型名称
                     model_name = get_model_for_judge(event.source)
+                    timer.record_turn(message_count, event.source, turn_ms, selector_ms)
+                    selector_ms = None
                     
-                    # 保存当前发言时的上下文历史
-                    context_at_this_time = list(all_messages_history)
+                    # 发言时看到的上下文，只记录完整记录中的序号范围：
+                    # 顺序模式看到当前最后一条；并行模式同一轮的发言都只看到本轮开始时的快照
+                    event_round = event.metadata.get(ROUND_METADATA_KEY) if parallel else None
+                    if event_round is None or event_round != current_round:
+                        current_round = event_round
+                        round_context_end = len(all_messages_history) - 1
+                    context_end = round_context_end
+                    # 上下文被压缩时只有最近窗口是原文，摘要覆盖的范围记录在 metrics 中
+                    context_start = turn_context_start(judge_map.get(event.source), context_end)
                     
                     # 保存消息
                     debate_messages.append({
                         "speaker": event.source,
                         "content": content,
-                        "context_history": context_at_this_time,
-                        "raw_response": content,
+                        "context_start": context_start,
+                        "context_end": context_end,
+                        "raw_response": raw_response,
                         "model_name": model_name,
+                        "metrics": turn_context_metrics(event, judge_map.get(event.source)),
                     })
                     
                     # 添加到历史记录
@@ -373,14 +462,38 @@ async def run_binary_choice_debate(
                     
                     logger.info("="*80)
                     logger.info(f"[二选一-第 {message_count} 轮] 发言者: {event.source} (模型: {model_name})")
-                    logger.info(f"上下文消息数: {len(context_at_this_time)}")
-                    logger.info(f"完整回复:\n{content}")
+                    logger.info(f"上下文消息数: {context_end + 1}")
+                    logger.info(f"回复:\n{preview(content)}")
                     logger.info("="*80)
+                    
+                    # 实时回调（回调失败不影响讨论继续）
+                    if on_message:
+                        try:
+                            await on_message(debate_messages[-1])
+                        except Exception as e:
+                            logger.warning(f"讨论消息回调失败: {e}")
+                    
+                    # 断点：消息落库后保存 team 状态（并行模式没有 team，恢复时重放已落库发言）
+                    if on_checkpoint and not parallel:
+                        team_state = await team_checkpoint_state(team)
+                        if team_state is not None:
+                            try:
+                                await on_checkpoint(message_count, team_state)
+                            except Exception as e:
+                                logger.warning(f"保存讨论断点失败: {e}")
         
+        timer.record("debate", (time.perf_counter() - debate_start) * 1000)
         logger.success(f"二选一群聊讨论完成，共 {len(debate_messages)} 条消息")
+        logger.info(f"讨论结束原因: {stop_reason}")
+        if speaker_selector:
+            logger.info(f"本地选择器规则命中统计: {dict(speaker_selector.rule_counts)}")
+        speaker_stats = speaker_report([j.name for j in judges], [m["speaker"] for m in debate_messages], STAGE_DEBATE)
+        timer.record_speakers(speaker_stats)
+        logger.info(f"评委发言占比与滚动延迟: {speaker_stats}")
         
     except Exception as e:
         logger.error(f"运行群聊失败: {e}")
+        timer.record("debate", (time.perf_counter() - debate_start) * 1000)
         return {
             "entry_id": entry_id,
             "messages": debate_messages,
@@ -392,6 +505,8 @@ async def run_binary_choice_debate(
         "entry_id": entry_id,
         "messages": debate_messages,
         "participants": [j.name for j in judges],
+        "stop_reason": stop_reason,
+        "speaker_stats": speaker_stats,
         # 调试信息
         "debug_info": {
             "judge_contexts": debug_contexts,
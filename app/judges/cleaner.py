@@ -0,0 +1,141 @@
+"""讨论发言清洗：去除 <thinking> 标签和思维链，提取评委的最终发言"""
+
+import re
+from typing import Iterable
+
+from loguru import logger
+
+from app.judges.parse_guard import ParseGuard
+
+_THINKING_TAG_PATTERN = re.compile(r"<thinking>.*?</thinking>", re.DOTALL)
+
+# 明确的"最终发言"标记（按优先级排列，命中后取最后一次出现之后的内容）
+_FINAL_MARKER_PATTERNS = tuple(
+    re.compile(pattern)
+    for pattern in (
+        r"所以最终发言应该是[：:]\s*",
+        r"所以组合起来[：:]\s*",
+        r"最终发言[：:]\s*",
+        r"最终[：:]\s*",
+    )
+)
+
+# "草稿"标记（模型常说"比如：…""或者：…"），取所有标记中最后一次出现之后的内容
+_DRAFT_MARKER_PATTERN = re.compile(r"(?:或者更符合人设|比如|或者)[：:]\s*")
+
+THINKING_KEYWORDS = (
+    "人设", "扮演", "口头禅", "首先", "然后", "用户", "需要我",
+    "对话", "观点", "反驳", "支持", "要注意", "比如", "或者",
+)
+_ROLEPLAY_KEYWORDS = frozenset({"扮演", "人设"})
+_THINKING_HIT_THRESHOLD = 3
+
+
+def _keywords_overlap(keywords: tuple[str, ...]) -> bool:
+    """任意两个关键词能否在文本中重叠出现（包含关系，或一个的后缀是另一个的前缀）"""
+    for a in keywords:
+        for b in keywords:
+            if a == b:
+                continue
+            if b in a:
+                return True
+            if any(a.endswith(b[:i]) for i in range(1, min(len(a), len(b)))):
+                return True
+    return False
+
+
+class KeywordMatcher:
+    """
+    单次扫描的多关键词匹配
+
+    所有关键词编译成一个正则交替式，由正则引擎（C 实现）一次扫描文本找出全部命中，
+    效果等同 Aho-Corasick 自动机；纯 Python 实现的自动机逐字符循环反而比多次 in 更慢。
+
+    交替式的匹配不重叠，关键词之间可能重叠出现时会漏掉其中一个，此时退回逐个 in 检查。
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = tuple(dict.fromkeys(k for k in keywords if k))
+        self._pattern = None
+        if self.keywords and not _keywords_overlap(self.keywords):
+            self._pattern = re.compile("|".join(re.escape(k) for k in self.keywords))
+
+    def find_all(self, text: str) -> set[str]:
+        """返回文本中出现过的关键词集合"""
+        if self._pattern is None:
+            return {k for k in self.keywords if k in text}
+        return set(self._pattern.findall(text))
+
+
+_thinking_matcher = KeywordMatcher(THINKING_KEYWORDS)
+
+
+def strip_thinking_tags(text: str) -> str:
+    """去除 <thinking>…</thinking> 标签及其内容"""
+    if "<thinking>" not in text:
+        return text
+    return _THINKING_TAG_PATTERN.sub("", text)
+
+
+def _last_match_end(pattern: re.Pattern, text: str) -> int:
+    end = -1
+    for match in pattern.finditer(text):
+        end = match.end()
+    return end
+
+
+def extract_final_response(text: str) -> str:
+    """
+    尝试从思维链中提取最终回复
+
+    - 策略 A：按优先级寻找"最终发言"标记，取最后一次出现之后的内容
+    - 策略 B：寻找最后一个"草稿"标记（比如：/或者：），取其之后的内容
+    - 都没有时原样返回
+    """
+    for pattern in _FINAL_MARKER_PATTERNS:
+        end = _last_match_end(pattern, text)
+        if end != -1:
+            return text[end:].strip()
+
+    end = _last_match_end(_DRAFT_MARKER_PATTERN, text)
+    if end != -1:
+        return text[end:].strip()
+
+    return text
+
+
+def is_thinking_block(text_block: str) -> bool:
+    """
+    判断一行是否为思维链
+
+    - 以"我"或"用户"开头，且提到"扮演"或"人设"
+    - 或命中至少 3 个不同的思维链关键词
+    """
+    hits = _thinking_matcher.find_all(text_block)
+    if text_block.startswith(("我", "用户")) and hits & _ROLEPLAY_KEYWORDS:
+        return True
+    return len(hits) >= _THINKING_HIT_THRESHOLD
+
+
+def clean_debate_message(content: str) -> str:
+    """
+    清洗一条讨论发言
+
+    去除 <thinking> 标签 → 提取最终回复 → 逐行去除残留的思维链。
+    返回空字符串表示整条消息都是思维链。
+    超长发言只清洗首尾窗口（最终回复在结尾），截断和耗时计入 ParseGuard 统计。
+    """
+    with ParseGuard("clean_debate_message", content) as guard:
+        extracted = extract_final_response(strip_thinking_tags(guard.text))
+
+        cleaned_lines = []
+        for line in extracted.split("\n"):
+            line = line.strip()
+            if not line:
+                continue
+            if is_thinking_block(line):
+                logger.debug(f"检测到思维链并移除: {line[:50]}...")
+                continue
+            cleaned_lines.append(line)
+
+    return "\n".join(cleaned_lines).strip()
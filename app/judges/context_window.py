@@ -0,0 +1,193 @@
+"""讨论评委的上下文窗口：保留开头摘要 + 最近 K 轮原文，更早的发言压缩为滚动摘要"""
+
+import re
+from typing import List, Optional
+
+from autogen_core.model_context import ChatCompletionContext
+from autogen_core.models import (
+    AssistantMessage,
+    FunctionExecutionResultMessage,
+    LLMMessage,
+    UserMessage,
+)
+
+from app.config import get_settings
+
+settings = get_settings()
+
+_CJK_PATTERN = re.compile(r"[\u3000-\u303f\u3400-\u4dbf\u4e00-\u9fff\uff00-\uffef]")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    粗略估算 token 数（不依赖具体模型的分词器）
+
+    中日韩字符约 1 字 1 token，其余字符约 4 字符 1 token。
+    """
+    if not text:
+        return 0
+    cjk = len(_CJK_PATTERN.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def _message_text(message: LLMMessage) -> str:
+    content = message.content
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(part if isinstance(part, str) else str(part) for part in content)
+    return str(content)
+
+
+def _message_source(message: LLMMessage) -> str:
+    return getattr(message, "source", "") or ""
+
+
+def estimate_messages_tokens(messages: List[LLMMessage]) -> int:
+    """估算一组消息的 token 数（每条消息额外计 4 个 token 的格式开销）"""
+    return sum(estimate_tokens(_message_text(m)) + 4 for m in messages)
+
+
+class DebateChatCompletionContext(ChatCompletionContext):
+    """
+    讨论评委的模型上下文
+
+    发给模型的消息 = 开头的评分摘要（原文）+ 早前发言的滚动摘要 + 最近 recent_turns 条发言（原文）。
+
+    滚动摘要：发言离开最近窗口时，压缩成一行"发言人: 前若干字"追加到摘要中；
+    摘要超出 summary_token_budget 时从最旧的行开始丢弃。
+
+    每次 get_messages() 都会记录压缩前后的 prompt token 估算值（last_stats），
+    供讨论引擎按轮记录。
+    """
+
+    def __init__(
+        self,
+        recent_turns: Optional[int] = None,
+        summary_token_budget: Optional[int] = None,
+        summary_line_chars: Optional[int] = None,
+        system_message: str = "",
+        initial_messages: Optional[List[LLMMessage]] = None,
+    ) -> None:
+        super().__init__(initial_messages)
+        self.recent_turns = recent_turns if recent_turns is not None else settings.debate_context_recent_turns
+        self.summary_token_budget = (
+            summary_token_budget if summary_token_budget is not None else settings.debate_context_summary_tokens
+        )
+        self.summary_line_chars = (
+            summary_line_chars if summary_line_chars is not None else settings.debate_context_summary_line_chars
+        )
+        self._system_tokens = estimate_tokens(system_message) + 4 if system_message else 0
+        self._reset_summary()
+        self.last_stats: dict = {}
+
+    def _reset_summary(self) -> None:
+        self._summary_lines: list[str] = []
+        self._summary_tokens = 0
+        self._summarized_upto = 1  # 已压缩进摘要的消息下标（第 0 条为评分摘要，始终保留原文）
+        self._dropped = 0
+
+    def _compress(self, message: LLMMessage) -> str:
+        text = re.sub(r"\s+", " ", _message_text(message)).strip()
+        if len(text) > self.summary_line_chars:
+            text = text[: self.summary_line_chars] + "…"
+        speaker = "我" if isinstance(message, AssistantMessage) else _message_source(message)
+        return f"- {speaker}: {text}"
+
+    def _roll_summary(self, upto: int) -> None:
+        """把 [_summarized_upto, upto) 之间的消息压缩进摘要"""
+        for message in self._messages[self._summarized_upto:upto]:
+            if isinstance(message, FunctionExecutionResultMessage):
+                continue
+            line = self._compress(message)
+            self._summary_lines.append(line)
+            self._summary_tokens += estimate_tokens(line) + 1
+
+        self._summarized_upto = max(self._summarized_upto, upto)
+
+        while self._summary_lines and self._summary_tokens > self.summary_token_budget:
+            line = self._summary_lines.pop(0)
+            self._summary_tokens -= estimate_tokens(line) + 1
+            self._dropped += 1
+
+    def _summary_message(self) -> Optional[UserMessage]:
+        if not self._summary_lines and not self._dropped:
+            return None
+        header = "【早前讨论摘要】"
+        if self._dropped:
+            header += f"（更早的 {self._dropped} 条发言已省略）"
+        return UserMessage(content="\n".join([header, *self._summary_lines]), source="summary")
+
+    async def get_messages(self) -> List[LLMMessage]:
+        messages = list(self._messages)
+        full_tokens = self._system_tokens + estimate_messages_tokens(messages)
+
+        if self.recent_turns > 0 and len(messages) > self.recent_turns + 1:
+            tail_start = len(messages) - self.recent_turns
+            self._roll_summary(tail_start)
+            # 保持最近窗口从完整的一轮开始（不以工具调用结果开头）
+            tail = messages[tail_start:]
+            while tail and isinstance(tail[0], FunctionExecutionResultMessage):
+                tail = tail[1:]
+            summary = self._summary_message()
+            messages = [messages[0], *([summary] if summary else []), *tail]
+            window = {
+                "context_recent": len(tail),
+                "context_summarized": self._summarized_upto - 1,
+                "context_summary_dropped": self._dropped,
+            }
+        else:
+            window = {}
+
+        self.last_stats = {
+            "prompt_tokens_full": full_tokens,
+            "prompt_tokens_sent": self._system_tokens + estimate_messages_tokens(messages),
+            "context_messages": len(messages),
+            **window,
+        }
+        return messages
+
+    async def clear(self) -> None:
+        await super().clear()
+        self._reset_summary()
+
+    async def load_state(self, state) -> None:
+        await super().load_state(state)
+        self._reset_summary()
+
+
+def turn_context_start(agent, context_end: int) -> int:
+    """
+    发言时看到的原文在完整记录中的起始序号
+
+    未压缩时为 0（看到第 0 条到 context_end 的全部原文）；
+    压缩后模型看到的是第 0 条评分摘要 + 滚动摘要 + 最近 context_recent 条原文，返回最近窗口第一条的序号。
+    """
+    context = getattr(agent, "model_context", None) if agent is not None else None
+    if not isinstance(context, DebateChatCompletionContext):
+        return 0
+    recent = context.last_stats.get("context_recent")
+    if not recent:
+        return 0
+    return max(1, context_end - recent + 1)
+
+
+def turn_context_metrics(message, agent) -> dict:
+    """
+    汇总一轮发言的 prompt token 数据
+
+    - prompt_tokens_full / prompt_tokens_sent: 压缩前 / 实际发送的估算值
+    - context_recent / context_summarized / context_summary_dropped: 上下文被压缩时，
+      原文窗口的条数、压缩进摘要的发言数、因摘要超出预算而省略的发言数
+    - prompt_tokens / completion_tokens: 模型返回的实际用量（若有）
+    """
+    metrics = {}
+    context = getattr(agent, "model_context", None) if agent is not None else None
+    if isinstance(context, DebateChatCompletionContext):
+        metrics.update(context.last_stats)
+
+    usage = getattr(message, "models_usage", None)
+    if usage is not None:
+        metrics["prompt_tokens"] = usage.prompt_tokens
+        metrics["completion_tokens"] = usage.completion_tokens
+    return metrics
@@ -0,0 +1,116 @@
+"""讨论断点：每轮保存 team 状态，中断后从最后一条已落库的发言继续"""
+
+from dataclasses import dataclass, field
+from typing import Any, AsyncGenerator, Callable, Optional, Sequence
+
+from autogen_agentchat.messages import BaseChatMessage, TextMessage
+from autogen_agentchat.teams import SelectorGroupChat
+from autogen_core import CancellationToken
+from loguru import logger
+
+
+@dataclass
+class DebateCheckpoint:
+    """恢复讨论所需的数据（来自数据库中的会话记录）"""
+    initial_message: str
+    messages: list[dict] = field(default_factory=list)  # 已落库的发言（speaker / content）
+    team_state: Optional[dict] = None  # 最后一次 team.save_state() 的结果
+
+    def history_messages(self) -> list[TextMessage]:
+        """已落库发言转换为聊天消息（用于重放）"""
+        return [TextMessage(content=m["content"], source=m["speaker"]) for m in self.messages]
+
+
+def _state_matches(team_state: dict, participants: Sequence[str], expected: int) -> bool:
+    """
+    检查 team 状态与已落库的发言是否一致
+
+    save_state() 在讨论进行中调用，可能与实际进度差一条；
+    管理器线程中的评委发言数与落库条数不一致时不使用该状态。
+    """
+    agent_states = (team_state or {}).get("agent_states") or {}
+    if any(name not in agent_states for name in participants):
+        return False
+    for state in agent_states.values():
+        thread = state.get("message_thread") if isinstance(state, dict) else None
+        if thread is not None:
+            spoken = sum(1 for m in thread if isinstance(m, dict) and m.get("source") in participants)
+            return spoken == expected
+    return False
+
+
+async def _skip_replayed(stream: AsyncGenerator, replayed: list) -> AsyncGenerator:
+    """过滤掉作为 task 重新输入的历史消息，只产出新的事件"""
+    replayed_ids = {id(m) for m in replayed}
+    async for event in stream:
+        if id(event) in replayed_ids:
+            continue
+        yield event
+
+
+async def _empty_stream() -> AsyncGenerator:
+    return
+    yield
+
+
+async def resume_team_stream(
+    team: SelectorGroupChat,
+    team_factory: Callable[[int, Sequence[BaseChatMessage]], SelectorGroupChat],
+    initial_message: TextMessage,
+    checkpoint: DebateCheckpoint,
+    max_messages: int,
+    participants: Sequence[str],
+    cancellation_token: Optional[CancellationToken] = None,
+) -> tuple[SelectorGroupChat, AsyncGenerator]:
+    """
+    从断点继续运行群聊
+
+    - 有可用的 team 状态：新建一个只剩余下消息数的 team，load_state 后 run_stream() 继续
+    - 否则（状态缺失、与落库发言不一致或加载失败）：把初始消息 + 已落库发言作为 task 重放，
+      评委从完整记录继续讨论（上下文与原讨论一致，只是丢失了选择器内部状态）
+
+    Args:
+        team: 按完整消息数创建的 team（重放时使用）
+        team_factory: 按 (最大消息数, 已有消息) 创建 team 的函数（已有消息用于预热收敛检测）
+        initial_message: 初始消息（评分摘要）
+        checkpoint: 断点数据
+        max_messages: 最大消息数（包含初始消息）
+        participants: 评委名称列表
+        cancellation_token: 传给 run_stream() 的取消令牌（讨论时限到期时取消）
+
+    Returns:
+        (实际运行的 team, 事件流)
+    """
+    history = checkpoint.history_messages()
+    remaining = max_messages - 1 - len(history)
+    if remaining <= 0:
+        logger.info("[阶段二] 断点处讨论已达到最大消息数，无需继续")
+        return team, _empty_stream()
+
+    if checkpoint.team_state and _state_matches(checkpoint.team_state, participants, len(history)):
+        resumed = team_factory(remaining, [initial_message, *history])
+        try:
+            await resumed.load_state(checkpoint.team_state)
+            logger.info(f"[阶段二] 从 team 状态恢复讨论: 已有 {len(history)} 条发言，剩余 {remaining} 条")
+            return resumed, resumed.run_stream(cancellation_token=cancellation_token)
+        except Exception as e:
+            logger.warning(f"加载讨论状态失败，改为重放已落库发言: {e}")
+    elif checkpoint.team_state:
+        logger.warning("讨论状态与已落库发言不一致，改为重放已落库发言")
+
+    logger.info(f"[阶段二] 重放 {len(history)} 条已落库发言后继续讨论")
+    task = [initial_message, *history]
+    return team, _skip_replayed(team.run_stream(task=task, cancellation_token=cancellation_token), task)
+
+
+async def team_checkpoint_state(team: SelectorGroupChat) -> Optional[dict[str, Any]]:
+    """
+    保存当前 team 状态（失败时返回 None，不影响讨论）
+
+    注意：状态包含每位评委的完整模型上下文，每轮覆盖写入同一行，不随轮数累积。
+    """
+    try:
+        return dict(await team.save_state())
+    except Exception as e:
+        logger.warning(f"保存讨论状态失败: {e}")
+        return None
@@ -0,0 +1,103 @@
+"""并行（快问快答）讨论：每轮多位评委基于同一份对话快照并发发言"""
+
+import asyncio
+from typing import AsyncGenerator, Optional, Sequence, Union
+
+from autogen_agentchat.agents import AssistantAgent
+from autogen_agentchat.base import TaskResult, TerminationCondition
+from autogen_agentchat.messages import BaseChatMessage, TextMessage
+from autogen_core import CancellationToken
+from loguru import logger
+
+from app.judges.speaker_selector import LocalSpeakerSelector
+
+DEBATE_MODE_SEQUENTIAL = "sequential"
+DEBATE_MODE_PARALLEL = "parallel"
+
+# 并行模式产出的发言在 metadata 中带上轮次，同一轮的发言看到的是同一份快照
+ROUND_METADATA_KEY = "debate_round"
+
+
+async def run_parallel_rounds(
+    judges: Sequence[AssistantAgent],
+    initial_message: TextMessage,
+    max_messages: int,
+    round_size: int,
+    selector: LocalSpeakerSelector,
+    history: Sequence[BaseChatMessage] = (),
+    termination: Optional[TerminationCondition] = None,
+) -> AsyncGenerator[Union[BaseChatMessage, TaskResult], None]:
+    """
+    按轮次运行讨论，产出与 team.run_stream 相同形式的消息事件
+
+    - 每轮由本地选择器选出 round_size 位评委（同一轮不重复）
+    - 被选中的评委看到的是本轮开始时的同一份对话快照，并发调用模型
+    - 本轮的发言按选择顺序（而非完成顺序）依次追加，结果可复现
+    - 某位评委调用失败只跳过该发言；一轮全部失败则中止讨论
+    - 每轮结束后检查终止条件（如收敛检测），满足时提前结束
+
+    Args:
+        judges: 评委 Agent 列表
+        initial_message: 初始消息（评分摘要）
+        max_messages: 最大消息数（与 MaxMessageTermination 一致，包含初始消息）
+        round_size: 每轮并发发言的评委数
+        selector: 本地发言人选择器
+        history: 已有的评委发言（从断点恢复时传入，不会再次产出）
+        termination: 终止条件（与 team 的 termination_condition 相同）
+
+    Yields:
+        初始消息（恢复时不产出）、每条新的评委发言（TextMessage 等聊天消息），
+        最后产出包含终止原因的 TaskResult
+    """
+    agents = {judge.name: judge for judge in judges}
+    transcript: list[BaseChatMessage] = [initial_message, *history]
+    delivered = {name: 0 for name in agents}  # 每位评委已收到的消息数
+    remaining = max_messages - len(transcript)
+    round_no = 0
+    stop_reason = None
+
+    if not history:
+        yield initial_message
+
+    if termination is not None:
+        stop = await termination(list(transcript))
+        stop_reason = stop.content if stop else None
+
+    while remaining > 0 and stop_reason is None:
+        round_no += 1
+        turns = [(m.source, m.to_text()) for m in transcript if m.source in agents]
+        speakers = selector.select_round(turns, size=min(round_size, remaining))
+        if not speakers:
+            break
+
+        snapshot_len = len(transcript)
+        logger.info(f"[并行讨论] 第 {round_no} 轮发言人: {speakers}")
+
+        async def speak(name: str) -> BaseChatMessage:
+            # 只发送该评委尚未看到的其他人的消息（快照范围内），自己的发言已在 Agent 上下文中
+            new_messages = [m for m in transcript[delivered[name]:snapshot_len] if m.source != name]
+            delivered[name] = snapshot_len
+            response = await agents[name].on_messages(new_messages, CancellationToken())
+            return response.chat_message
+
+        results = await asyncio.gather(*(speak(name) for name in speakers), return_exceptions=True)
+
+        produced = []
+        for name, result in zip(speakers, results):
+            if isinstance(result, BaseException):
+                logger.warning(f"[并行讨论] 评委发言失败: {name} - {result}")
+                continue
+            result.metadata[ROUND_METADATA_KEY] = str(round_no)
+            transcript.append(result)
+            produced.append(result)
+            yield result
+
+        if not produced:
+            raise RuntimeError(f"第 {round_no} 轮所有评委发言均失败")
+        remaining -= len(produced)
+
+        if termination is not None:
+            stop = await termination(produced)
+            stop_reason = stop.content if stop else None
+
+    yield TaskResult(messages=transcript, stop_reason=stop_reason)
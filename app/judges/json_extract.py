@@ -0,0 +1,126 @@
+"""从模型输出中提取 JSON 对象和 XML 标签（单次线性扫描，替代多级正则）"""
+
+import json
+import re
+import time
+from functools import lru_cache
+from typing import Iterator, Optional, Sequence
+
+# 扫描时只需要关心的字符，其余字符由正则引擎（C 实现）直接跳过
+_STRUCTURAL_PATTERN = re.compile(r'[{}"\\\n]')
+
+
+@lru_cache(maxsize=16)
+def _tag_pattern(tag: str) -> re.Pattern:
+    return re.compile(rf"<{re.escape(tag)}>(.*?)</{re.escape(tag)}>", re.DOTALL | re.IGNORECASE)
+
+
+def extract_tag(text: str, tag: str) -> Optional[str]:
+    """
+    提取第一个 <tag>…</tag> 中的内容（不区分大小写，去除首尾空白）
+
+    没有闭合标签时返回 None。
+    """
+    match = _tag_pattern(tag).search(text)
+    return match.group(1).strip() if match else None
+
+
+def find_json_spans(text: str) -> list[tuple[int, int]]:
+    """
+    找出文本中所有花括号配平的片段 [start, end)，按起始位置排序（外层在内层之前）
+
+    单次扫描，O(n)（只逐个处理花括号、引号、反斜杠和换行）：
+    - 用栈记录未闭合的 {，遇到 } 出栈得到一个配平片段
+    - 只在花括号内部识别 JSON 字符串（处理 \\ 转义），字符串中的花括号不计入
+    - 正文里多余的 {（如独白中的 "{笑}" 或截断的输出）不会吞掉后面的 JSON：
+      未闭合的 { 留在栈中，后面配平的片段照常记录；
+      多余的 { 和 } 恰好把 JSON 包在中间时，外层片段解析失败后会继续尝试内层
+    - JSON 字符串不能跨行，遇到换行即视为字符串结束，避免正文中落单的引号
+      导致后面的内容都被当成字符串
+    """
+    stack: list[int] = []
+    spans: list[tuple[int, int]] = []
+    in_string = False
+    skip = -1  # 被反斜杠转义的字符位置
+
+    for match in _STRUCTURAL_PATTERN.finditer(text):
+        i = match.start()
+        if i == skip:
+            continue
+        ch = text[i]
+
+        if in_string:
+            if ch == "\\":
+                skip = i + 1
+            elif ch == '"' or ch == "\n":
+                in_string = False
+            continue
+
+        if ch == "{":
+            stack.append(i)
+        elif ch == "}":
+            if stack:
+                spans.append((stack.pop(), i + 1))
+        elif ch == '"' and stack:
+            in_string = True
+
+    spans.sort()
+    return spans
+
+
+def iter_json_objects(
+    text: str,
+    spans: Optional[Sequence[tuple[int, int]]] = None,
+    deadline: Optional[float] = None,
+) -> Iterator[dict]:
+    """
+    按出现顺序逐个解析配平片段，产出其中的 JSON 对象
+
+    某个片段解析成功后，其内部的片段（嵌套对象）不再单独产出。
+    层层嵌套又都解析失败的片段会让 json.loads 的总耗时接近 O(n²)，
+    给出 deadline（time.perf_counter() 时间点）时，超时后不再尝试剩余片段。
+    """
+    if spans is None:
+        spans = find_json_spans(text)
+    parsed_end = -1
+    for start, end in spans:
+        if end <= parsed_end:
+            continue
+        if deadline is not None and time.perf_counter() > deadline:
+            return
+        try:
+            value = json.loads(text[start:end])
+        except (json.JSONDecodeError, RecursionError):
+            continue
+        if isinstance(value, dict):
+            parsed_end = end
+            yield value
+
+
+def extract_json_object(
+    text: str,
+    required_keys: Sequence[str] = (),
+    spans: Optional[Sequence[tuple[int, int]]] = None,
+    deadline: Optional[float] = None,
+) -> Optional[dict]:
+    """
+    提取模型输出中的 JSON 对象（纯 JSON、Markdown 代码块或夹在正文中均可）
+
+    优先返回包含全部 required_keys 的第一个对象，其次返回第一个非空对象；
+    没有可解析的对象时返回 None。
+
+    Args:
+        text: 模型输出
+        required_keys: 期望包含的字段
+        spans: 已经扫描过的配平片段（避免重复扫描）
+        deadline: 解析截止时间（time.perf_counter() 时间点），超时后返回已找到的结果
+    """
+    fallback = None
+    for obj in iter_json_objects(text, spans, deadline):
+        if required_keys and all(key in obj for key in required_keys):
+            return obj
+        if fallback is None and obj:
+            if not required_keys:
+                return obj
+            fallback = obj
+    return fallback
@@ -0,0 +1,229 @@
+"""评委构建缓存：按人设/配置哈希缓存可复用的评委规格和模型客户端"""
+
+import hashlib
+import json
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Hashable, Optional
+
+from autogen_ext.models.openai import OpenAIChatCompletionClient
+from loguru import logger
+
+from app.config import get_settings
+from app.judges.prompts import COMMON_SCORING_GUIDE, JUDGE_PERSONAS, DEBATE_MODE_INSTRUCTION
+from app.judges.binary_choice_prompts import BINARY_CHOICE_GUIDE, BINARY_CHOICE_DEBATE_INSTRUCTION
+from app.judges.utils import make_vision_client, make_text_client, get_model_for_judge
+from app.judges.output_limits import LimitedChatCompletionClient, resolve_output_limits
+from app.judges.structured_output import response_format
+
+settings = get_settings()
+
+
+@dataclass(frozen=True)
+class JudgeSpec:
+    """
+    评委规格（无状态部分，可跨请求复用）
+
+    注意：AssistantAgent 本身带有对话上下文（有状态），每次请求仍需新建，
+    这里只缓存拼接好的 system message、模型名等不可变数据。
+    """
+    judge_id: str
+    display_name: str
+    model_name: str
+    persona: str
+    system_message: str
+
+
+class _LRUCache:
+    """简单的 LRU 缓存（自定义 prompts 可能无限多，需要限制容量）"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], object]):
+        if key in self._data:
+            self._data.move_to_end(key)
+            self.hits += 1
+            return self._data[key]
+
+        self.misses += 1
+        value = factory()
+        self._data[key] = value
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_spec_cache = _LRUCache(maxsize=settings.judge_spec_cache_size)
+_selector_prompt_cache = _LRUCache(maxsize=settings.judge_spec_cache_size)
+_client_cache: dict[tuple[str, bool], OpenAIChatCompletionClient] = {}
+_limited_client_cache: dict[tuple[str, bool, str, str, Optional[str]], LimitedChatCompletionClient] = {}
+
+
+# 默认配置对象（模块级常量，生命周期与进程相同），命中时无需序列化计算哈希
+_DEFAULT_OBJECT_IDS = {
+    id(COMMON_SCORING_GUIDE),
+    id(JUDGE_PERSONAS),
+    id(DEBATE_MODE_INSTRUCTION),
+    id(BINARY_CHOICE_GUIDE),
+    id(BINARY_CHOICE_DEBATE_INSTRUCTION),
+}
+
+
+def config_hash(*parts) -> str:
+    """计算配置（评分规范、人设、讨论说明等）的稳定哈希"""
+    payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _cache_key(kind: str, *parts) -> tuple:
+    """
+    生成缓存 key
+
+    - 默认配置：直接用常量对象身份作为 key（快速路径）
+    - 自定义配置：按内容哈希，重复的 custom_prompts 可命中同一条缓存
+    """
+    if all(id(p) in _DEFAULT_OBJECT_IDS for p in parts):
+        return (kind, "default", tuple(id(p) for p in parts))
+    return (kind, config_hash(*parts))
+
+
+def get_model_client(
+    model: str,
+    vision: bool,
+    stage: Optional[str] = None,
+    judge_id: Optional[str] = None,
+    response_schema: Optional[str] = None,
+) -> OpenAIChatCompletionClient | LimitedChatCompletionClient:
+    """
+    获取（共享的）模型客户端
+
+    客户端只持有连接池和配置，可以被多个请求的 Agent 并发复用，
+    避免每次请求都重新创建 HTTP 连接。
+
+    指定 stage 时返回附加了该阶段 / 评委输出上限（max_tokens、stop）的客户端，
+    底层仍共享同一个连接池。指定 response_schema 时附加结构化输出的 response_format。
+    """
+    key = (model, vision)
+    client = _client_cache.get(key)
+    if client is None:
+        client = make_vision_client(model=model) if vision else make_text_client(model=model)
+        _client_cache[key] = client
+        logger.info(f"创建模型客户端: model={model}, vision={vision}")
+    if stage is None:
+        return client
+
+    limited_key = (model, vision, stage, judge_id or model, response_schema)
+    limited = _limited_client_cache.get(limited_key)
+    if limited is None:
+        limits = resolve_output_limits(stage, judge_id)
+        create_args = {"response_format": response_format(response_schema)} if response_schema else None
+        limited = LimitedChatCompletionClient(client, stage, judge_id or model, limits, create_args)
+        _limited_client_cache[limited_key] = limited
+        logger.info(
+            f"模型输出上限: stage={stage}, judge={judge_id or model}, "
+            f"max_tokens={limits.max_tokens}, stop={list(limits.stop)}"
+        )
+    return limited
+
+
+def _build_specs(
+    personas: dict,
+    prefix: str = "",
+    suffix: str = "",
+    stage: str = "",
+) -> tuple[JudgeSpec, ...]:
+    specs = []
+    for judge_id, persona_info in personas.items():
+        persona = persona_info.get("persona", "")
+        spec = JudgeSpec(
+            judge_id=judge_id,
+            display_name=persona_info.get("display_name", judge_id),
+            model_name=get_model_for_judge(judge_id),
+            persona=persona,
+            system_message=prefix + persona + suffix,
+        )
+        specs.append(spec)
+
+        logger.info("=" * 80)
+        logger.info(f"[{stage}] 构建评委规格: {spec.judge_id} ({spec.display_name})")
+        logger.info(f"模型: {spec.model_name}")
+        logger.debug(f"System Message 长度: {len(spec.system_message)} 字符")
+        logger.info("=" * 80)
+    return tuple(specs)
+
+
+def get_vision_judge_specs(scoring_guide: str, personas: dict) -> tuple[JudgeSpec, ...]:
+    """阶段一评委规格：评分规范 + 人设"""
+    key = _cache_key("vision", scoring_guide, personas)
+    return _spec_cache.get_or_create(
+        key,
+        lambda: _build_specs(personas, prefix=scoring_guide, stage="阶段一"),
+    )
+
+
+def get_debate_judge_specs(personas: dict, debate_instruction: str) -> tuple[JudgeSpec, ...]:
+    """
+    阶段二评委规格：人设 + 讨论模式说明
+
+    每个请求的自我评价上下文（第一阶段得分）不在缓存内，由调用方追加。
+    """
+    key = _cache_key("debate", personas, debate_instruction)
+    return _spec_cache.get_or_create(
+        key,
+        lambda: _build_specs(personas, suffix=debate_instruction, stage="阶段二"),
+    )
+
+
+def get_binary_choice_judge_specs(guide: str, personas: dict) -> tuple[JudgeSpec, ...]:
+    """二选一阶段一评委规格：二选一指南 + 人设"""
+    key = _cache_key("binary_choice", guide, personas)
+    return _spec_cache.get_or_create(
+        key,
+        lambda: _build_specs(personas, prefix=guide, stage="二选一-阶段一"),
+    )
+
+
+def get_cached_selector_prompt(
+    judge_names: list[str],
+    personas: dict,
+    builder: Callable[[], str],
+) -> str:
+    """按参与评委及人设缓存选择器 prompt"""
+    key = (_cache_key("selector", personas), tuple(judge_names))
+    return _selector_prompt_cache.get_or_create(key, builder)
+
+
+def cache_stats() -> dict:
+    """缓存命中情况（用于诊断）"""
+    return {
+        "judge_specs": {
+            "size": len(_spec_cache),
+            "hits": _spec_cache.hits,
+            "misses": _spec_cache.misses,
+        },
+        "selector_prompts": {
+            "size": len(_selector_prompt_cache),
+            "hits": _selector_prompt_cache.hits,
+            "misses": _selector_prompt_cache.misses,
+        },
+        "model_clients": len(_client_cache),
+    }
+
+
+def clear_caches() -> None:
+    """清空缓存（人设配置变更后调用）"""
+    _spec_cache.clear()
+    _selector_prompt_cache.clear()
+    logger.info("评委规格缓存已清空")
@@ -0,0 +1,106 @@
+"""模型调用延迟的滚动统计（用于延迟感知的发言人选择和诊断）"""
+
+import statistics
+from collections import Counter
+from typing import Optional, Sequence
+
+from app.config import get_settings
+
+settings = get_settings()
+
+
+class LatencyTracker:
+    """
+    按 (阶段, 评委) 统计模型调用延迟
+
+    使用指数加权移动平均（EWMA），最近的调用权重更高，网关/模型变慢后能较快反映出来。
+    进程内共享，跨请求累计。
+    """
+
+    def __init__(self, alpha: Optional[float] = None):
+        self.alpha = alpha if alpha is not None else settings.model_latency_ewma_alpha
+        self._ewma: dict[tuple[str, str], float] = {}
+        self._calls: Counter = Counter()
+
+    def observe(self, stage: str, judge_id: str, latency_ms: float) -> None:
+        key = (stage, judge_id)
+        previous = self._ewma.get(key)
+        if previous is None:
+            self._ewma[key] = latency_ms
+        else:
+            self._ewma[key] = previous + self.alpha * (latency_ms - previous)
+        self._calls[key] += 1
+
+    def get(self, stage: str, judge_id: str) -> Optional[float]:
+        return self._ewma.get((stage, judge_id))
+
+    def snapshot(self, stage: str) -> dict[str, float]:
+        """某阶段各评委当前的滚动延迟（毫秒）"""
+        return {judge_id: ms for (s, judge_id), ms in self._ewma.items() if s == stage}
+
+    def stats(self) -> dict:
+        """各阶段 / 评委的滚动延迟和调用次数（用于诊断）"""
+        stats: dict[str, dict] = {}
+        for (stage, judge_id), ms in self._ewma.items():
+            stats.setdefault(stage, {})[judge_id] = {
+                "latency_ms": round(ms, 1),
+                "calls": self._calls[(stage, judge_id)],
+            }
+        return stats
+
+    def clear(self) -> None:
+        self._ewma.clear()
+        self._calls.clear()
+
+
+model_latency = LatencyTracker()
+
+
+def latency_weights(
+    participants: Sequence[str],
+    latencies: dict[str, float],
+    exponent: Optional[float] = None,
+    min_share: Optional[float] = None,
+) -> dict[str, float]:
+    """
+    按延迟计算每位评委的发言权重（均分时为 1）
+
+    权重 = (延迟中位数 / 该评委延迟) ^ exponent，限制在 [min_share, 1 / min_share] 之间：
+    快的评委多说几轮，慢的评委至少保留 min_share 倍的均分份额。
+    没有延迟数据的评委按中位数处理。
+    """
+    exponent = exponent if exponent is not None else settings.debate_latency_exponent
+    min_share = min_share if min_share is not None else settings.debate_latency_min_share
+    known = [latencies[p] for p in participants if latencies.get(p)]
+    if not known or exponent <= 0:
+        return {p: 1.0 for p in participants}
+
+    reference = statistics.median(known)
+    floor = min(max(min_share, 1e-3), 1.0)
+    weights = {}
+    for p in participants:
+        latency = latencies.get(p) or reference
+        weight = (reference / latency) ** exponent
+        weights[p] = min(max(weight, floor), 1.0 / floor)
+    return weights
+
+
+def speaker_report(participants: Sequence[str], speakers: Sequence[str], stage: str) -> dict[str, dict]:
+    """
+    每位评委的发言占比和滚动延迟（用于权衡延迟与发言公平性）
+
+    Args:
+        participants: 评委名称列表
+        speakers: 按顺序的发言人列表
+        stage: 延迟统计的阶段
+    """
+    counts = Counter(speakers)
+    total = len(speakers)
+    return {
+        p: {
+            "turns": counts.get(p, 0),
+            "share": round(counts.get(p, 0) / total, 3) if total else 0.0,
+            "latency_ms": round(ms, 1) if (ms := model_latency.get(stage, p)) is not None else None,
+        }
+        for p in participants
+    }
@@ -0,0 +1,218 @@
+"""模型输出上限：按阶段 / 评委设置 max_tokens 和 stop，并统计输出被截断的次数"""
+
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator, Literal, Mapping, Optional, Sequence, Union
+
+from autogen_core import CancellationToken
+from autogen_core.models import (
+    ChatCompletionClient,
+    CreateResult,
+    LLMMessage,
+    ModelCapabilities,
+    ModelInfo,
+    RequestUsage,
+)
+from autogen_core.tools import Tool, ToolSchema
+from loguru import logger
+from pydantic import BaseModel
+
+from app.config import get_settings
+from app.judges.latency import model_latency
+
+settings = get_settings()
+
+STAGE_SCORING = "scoring"  # 阶段一评分 / 二选一阶段一：JSON + <inner_monologue>
+STAGE_DEBATE = "debate"  # 讨论发言：最多三句话
+STAGE_SELECTOR = "selector"  # 选择器：只返回评委名称
+
+_STAGE_MAX_TOKENS = {
+    STAGE_SCORING: lambda: settings.scoring_max_tokens,
+    STAGE_DEBATE: lambda: settings.debate_max_tokens,
+    STAGE_SELECTOR: lambda: settings.selector_max_tokens,
+}
+_STAGE_STOP_SEQUENCES = {
+    STAGE_SCORING: lambda: settings.scoring_stop_sequences,
+    STAGE_DEBATE: lambda: settings.debate_stop_sequences,
+    STAGE_SELECTOR: lambda: settings.selector_stop_sequences,
+}
+
+
+@dataclass(frozen=True)
+class OutputLimits:
+    """一次模型调用的输出限制（max_tokens 为 None 表示不限制）"""
+    max_tokens: Optional[int] = None
+    stop: tuple[str, ...] = ()
+
+    def create_args(self) -> dict[str, Any]:
+        args: dict[str, Any] = {}
+        if self.max_tokens:
+            args["max_tokens"] = self.max_tokens
+        if self.stop:
+            args["stop"] = list(self.stop)
+        return args
+
+
+def resolve_output_limits(stage: str, judge_id: Optional[str] = None) -> OutputLimits:
+    """
+    计算某阶段某评委的输出限制
+
+    评委级配置（JUDGE_MAX_TOKENS / JUDGE_STOP_SEQUENCES）优先于阶段默认值；
+    max_tokens <= 0 表示不限制。
+    """
+    max_tokens = _STAGE_MAX_TOKENS[stage]()
+    stop = _STAGE_STOP_SEQUENCES[stage]()
+    if judge_id:
+        max_tokens = settings.judge_max_tokens.get(judge_id, {}).get(stage, max_tokens)
+        stop = settings.judge_stop_sequences.get(judge_id, {}).get(stage, stop)
+    return OutputLimits(
+        max_tokens=max_tokens if max_tokens and max_tokens > 0 else None,
+        stop=tuple(stop),
+    )
+
+
+def _new_counter() -> dict[str, int]:
+    return {"calls": 0, "truncated": 0, "parse_failures": 0}
+
+
+# {阶段: {评委: 计数}}，进程内累计（用于对照截断率和解析失败率调整上限）
+_stats: dict[str, dict[str, dict[str, int]]] = defaultdict(lambda: defaultdict(_new_counter))
+
+
+def record_completion(stage: str, judge_id: str, result: CreateResult, limits: OutputLimits) -> None:
+    """记录一次模型调用，输出因达到 max_tokens 被截断时告警"""
+    counter = _stats[stage][judge_id]
+    counter["calls"] += 1
+    if result.finish_reason == "length":
+        counter["truncated"] += 1
+        logger.warning(
+            f"[{stage}] {judge_id} 输出达到上限被截断: max_tokens={limits.max_tokens}, "
+            f"completion_tokens={result.usage.completion_tokens}"
+        )
+
+
+def record_parse_failure(stage: str, judge_id: str) -> None:
+    """记录一次响应解析失败（阶段一 JSON 不完整等）"""
+    _stats[stage][judge_id]["parse_failures"] += 1
+
+
+def output_limit_stats() -> dict:
+    """各阶段 / 评委的输出上限、调用次数、截断次数和解析失败次数（用于诊断）"""
+    stats = {}
+    for stage, judges in _stats.items():
+        stats[stage] = {}
+        for judge_id, counter in judges.items():
+            limits = resolve_output_limits(stage, judge_id)
+            calls = counter["calls"]
+            stats[stage][judge_id] = {
+                "max_tokens": limits.max_tokens,
+                "stop": list(limits.stop),
+                **counter,
+                "truncated_rate": round(counter["truncated"] / calls, 3) if calls else 0.0,
+                "parse_failure_rate": round(counter["parse_failures"] / calls, 3) if calls else 0.0,
+            }
+    return stats
+
+
+def reset_output_limit_stats() -> None:
+    _stats.clear()
+
+
+class LimitedChatCompletionClient(ChatCompletionClient):
+    """
+    给共享的模型客户端附加输出限制
+
+    每次调用通过 extra_create_args 传入 max_tokens / stop 以及 create_args 中的其他参数
+    （如结构化输出的 response_format；调用方显式传入的参数优先），
+    底层客户端（连接池）仍按模型共享；调用结果的 finish_reason 计入截断统计，
+    调用耗时计入该阶段 / 评委的滚动延迟。
+    """
+
+    def __init__(
+        self,
+        client: ChatCompletionClient,
+        stage: str,
+        judge_id: str,
+        limits: OutputLimits,
+        create_args: Optional[Mapping[str, Any]] = None,
+    ):
+        self.client = client
+        self.stage = stage
+        self.judge_id = judge_id
+        self.limits = limits
+        self.create_args = dict(create_args or {})
+
+    def _create_args(self, extra_create_args: Mapping[str, Any]) -> dict[str, Any]:
+        return {**self.limits.create_args(), **self.create_args, **extra_create_args}
+
+    async def create(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        tool_choice: Tool | Literal["auto", "required", "none"] = "auto",
+        json_output: Optional[bool | type[BaseModel]] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> CreateResult:
+        start = time.perf_counter()
+        result = await self.client.create(
+            messages,
+            tools=tools,
+            tool_choice=tool_choice,
+            json_output=json_output,
+            extra_create_args=self._create_args(extra_create_args),
+            cancellation_token=cancellation_token,
+        )
+        model_latency.observe(self.stage, self.judge_id, (time.perf_counter() - start) * 1000)
+        record_completion(self.stage, self.judge_id, result, self.limits)
+        return result
+
+    async def create_stream(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools: Sequence[Tool | ToolSchema] = [],
+        tool_choice: Tool | Literal["auto", "required", "none"] = "auto",
+        json_output: Optional[bool | type[BaseModel]] = None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> AsyncGenerator[Union[str, CreateResult], None]:
+        start = time.perf_counter()
+        async for chunk in self.client.create_stream(
+            messages,
+            tools=tools,
+            tool_choice=tool_choice,
+            json_output=json_output,
+            extra_create_args=self._create_args(extra_create_args),
+            cancellation_token=cancellation_token,
+        ):
+            if isinstance(chunk, CreateResult):
+                model_latency.observe(self.stage, self.judge_id, (time.perf_counter() - start) * 1000)
+                record_completion(self.stage, self.judge_id, chunk, self.limits)
+            yield chunk
+
+    async def close(self) -> None:
+        # 底层客户端由缓存共享，不在这里关闭
+        return None
+
+    def actual_usage(self) -> RequestUsage:
+        return self.client.actual_usage()
+
+    def total_usage(self) -> RequestUsage:
+        return self.client.total_usage()
+
+    def count_tokens(self, messages: Sequence[LLMMessage], *, tools: Sequence[Tool | ToolSchema] = []) -> int:
+        return self.client.count_tokens(messages, tools=tools)
+
+    def remaining_tokens(self, messages: Sequence[LLMMessage], *, tools: Sequence[Tool | ToolSchema] = []) -> int:
+        return self.client.remaining_tokens(messages, tools=tools)
+
+    @property
+    def capabilities(self) -> ModelCapabilities:  # type: ignore
+        return self.client.capabilities
+
+    @property
+    def model_info(self) -> ModelInfo:
+        return self.client.model_info
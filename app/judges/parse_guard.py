@@ -0,0 +1,97 @@
+"""解析保护：限制交给解析器 / 清洗的文本长度和单次解析耗时，异常输出计入统计而不是拖住事件循环"""
+
+import time
+from collections import defaultdict
+from typing import Optional
+
+from loguru import logger
+
+from app.config import get_settings
+
+settings = get_settings()
+
+CLIP_MARKER = "\n……\n"
+
+
+def clip_output(text: str, max_chars: Optional[int] = None) -> str:
+    """
+    超长输出只保留首尾各一半，中间以省略标记连接
+
+    评分输出的独白在开头、JSON 在结尾，讨论发言的最终回复也在结尾，首尾窗口足够解析；
+    max_chars <= 0 表示不限制。
+    """
+    limit = settings.parse_max_chars if max_chars is None else max_chars
+    if limit <= 0 or len(text) <= limit:
+        return text
+    half = limit // 2
+    return text[:half] + CLIP_MARKER + text[-half:]
+
+
+def preview(text: str, max_chars: Optional[int] = None) -> str:
+    """日志中的输出预览（超长时注明总长度；max_chars <= 0 表示输出完整内容）"""
+    limit = settings.log_output_preview_chars if max_chars is None else max_chars
+    if limit <= 0 or len(text) <= limit:
+        return text
+    return f"{text[:limit]}…（共 {len(text)} 字符）"
+
+
+def _new_counter() -> dict[str, float]:
+    return {"calls": 0, "clipped": 0, "over_budget": 0, "max_input_chars": 0, "max_ms": 0.0}
+
+
+# {解析器: 计数}，进程内累计
+_stats: dict[str, dict[str, float]] = defaultdict(_new_counter)
+
+
+class ParseGuard:
+    """
+    一次解析调用的保护：截断超长输入、给出截止时间，结束时记录统计
+
+        with ParseGuard("parse_judge_response", raw) as guard:
+            data = extract_json_object(guard.text, deadline=guard.deadline)
+
+    解析器在每次提取尝试之前检查 deadline，超时后不再尝试，直接走解析失败的兜底结果。
+    """
+
+    def __init__(self, parser: str, text: str):
+        self.parser = parser
+        self.input_chars = len(text)
+        self.text = clip_output(text)
+        self.clipped = len(self.text) != self.input_chars
+        budget_ms = settings.parse_time_budget_ms
+        self._start = time.perf_counter()
+        self.deadline: Optional[float] = self._start + budget_ms / 1000 if budget_ms > 0 else None
+
+    def expired(self) -> bool:
+        return self.deadline is not None and time.perf_counter() > self.deadline
+
+    def __enter__(self) -> "ParseGuard":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        elapsed_ms = (time.perf_counter() - self._start) * 1000
+        over_budget = self.expired()
+
+        counter = _stats[self.parser]
+        counter["calls"] += 1
+        counter["max_input_chars"] = max(counter["max_input_chars"], self.input_chars)
+        counter["max_ms"] = round(max(counter["max_ms"], elapsed_ms), 2)
+        if self.clipped:
+            counter["clipped"] += 1
+        if over_budget:
+            counter["over_budget"] += 1
+
+        if self.clipped or over_budget:
+            logger.warning(
+                f"[{self.parser}] 异常输出: {self.input_chars} 字符"
+                f"{f'（截断为 {len(self.text)}）' if self.clipped else ''}, 解析耗时 {elapsed_ms:.1f}ms"
+            )
+
+
+def parse_guard_stats() -> dict:
+    """各解析器的调用次数、截断次数、超时次数和最大输入 / 耗时（用于诊断）"""
+    return {parser: dict(counter) for parser, counter in _stats.items()}
+
+
+def reset_parse_guard_stats() -> None:
+    _stats.clear()
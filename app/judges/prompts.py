@@ -1,5 +1,7 @@
-import json
-import re
+from typing import Optional
+
+from app.judges.json_extract import extract_json_object, extract_tag, find_json_spans
+from app.judges.parse_guard import ParseGuard
 
 # ============ 1. 通用评分规范 (核心引擎) ============
 
@@ -314,50 +316,36 @@ def parse_judge_response(raw_response: str) -> dict:
     解析评委的响应。
     由于我们引入了 <inner_monologue>，现在的响应包含 XML 和 JSON。
     我们需要提取 JSON 部分，并且提取 XML 标签中的 inner_monologue。
+    超长输出只解析首尾窗口，解析超出时间预算时按 JSON 格式错误兜底（见 ParseGuard）。
     """
-    # 首先尝试提取 XML 标签中的 inner_monologue
-    inner_monologue_from_xml = None
-    # 使用 re.IGNORECASE 和 re.DOTALL (s flag in regex)
-    xml_pattern = r'<inner_monologue>([\s\S]*?)</inner_monologue>'
-    xml_match = re.search(xml_pattern, raw_response, re.IGNORECASE)
-    if xml_match:
-        inner_monologue_from_xml = xml_match.group(1).strip()
+    with ParseGuard("parse_judge_response", raw_response) as guard:
+        return _parse_judge_response(guard.text, guard.deadline)
+
+
+def _parse_judge_response(raw_response: str, deadline: Optional[float]) -> dict:
+    # 首先提取 XML 标签中的 inner_monologue
+    inner_monologue_from_xml = extract_tag(raw_response, "inner_monologue")
     
-    # 然后提取 JSON
-    try:
-        # 1. 尝试直接解析 (如果模型偶尔只输出了 JSON)
-        data = json.loads(raw_response)
-    except json.JSONDecodeError:
-        # 2. 使用正则提取 JSON 代码块 ```json ... ``` 或者直接提取 {...}
-        # 优先寻找 markdown 代码块
-        json_block_pattern = r"```json\s*(\{[\s\S]*?\})\s*```"
-        match = re.search(json_block_pattern, raw_response)
-        
-        if match:
-            json_str = match.group(1)
-        else:
-            # 如果没有代码块，寻找最外层的 {}
-            # 这是一个简化的查找，假设 JSON 结构是完整的
-            json_pattern = r"(\{[\s\S]*\})"
-            match = re.search(json_pattern, raw_response)
-            if match:
-                json_str = match.group(1)
-            else:
-                # 兜底：构造一个错误的 JSON
-                return {
-                    "overall_score": 0,
-                    "one_liner": "评分系统解析失败",
-                    "inner_monologue": inner_monologue_from_xml or f"我话太多了，导致系统崩溃了... (Raw: {raw_response[:50]}...)"
-                }
-                
-        try:
-            data = json.loads(json_str)
-        except json.JSONDecodeError:
-            return {
-                "overall_score": 0,
-                "one_liner": "JSON 格式错误",
-                "inner_monologue": inner_monologue_from_xml or "输出格式混乱，无法读取。"
-            }
+    # 然后提取 JSON：单次扫描找出所有配平的 {...} 片段，优先取包含 overall_score 的对象
+    # （独白中出现的 "{}" 或代码块外的多余花括号不会干扰）
+    spans = find_json_spans(raw_response)
+    if not spans:
+        # 兜底：构造一个错误的 JSON
+        return {
+            "overall_score": 0,
+            "one_liner": "评分系统解析失败",
+            "inner_monologue": inner_monologue_from_xml or f"我话太多了，导致系统崩溃了... (Raw: {raw_response[:50]}...)",
+            "parse_failed": True,
+        }
+    
+    data = extract_json_object(raw_response, required_keys=("overall_score",), spans=spans, deadline=deadline)
+    if data is None:
+        return {
+            "overall_score": 0,
+            "one_liner": "JSON 格式错误",
+            "inner_monologue": inner_monologue_from_xml or "输出格式混乱，无法读取。",
+            "parse_failed": True,
+        }
     
     # 3. 优先使用 XML 中的 inner_monologue
     # 用户反馈：XML 中的内容更真实，JSON 中的往往被"和谐"过
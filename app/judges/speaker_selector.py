@@ -0,0 +1,304 @@
+"""本地规则发言人选择器（替代每轮一次的 LLM 选择器调用）"""
+
+import re
+from collections import Counter
+from typing import Callable, Optional, Sequence, Union
+
+from autogen_agentchat.messages import BaseChatMessage
+from loguru import logger
+
+from app.config import get_settings
+from app.judges.latency import latency_weights
+
+settings = get_settings()
+
+SELECTOR_MODE_LLM = "llm"
+SELECTOR_MODE_LOCAL = "local"
+SELECTOR_MODE_HYBRID = "hybrid"
+SELECTOR_MODES = (SELECTOR_MODE_LLM, SELECTOR_MODE_LOCAL, SELECTOR_MODE_HYBRID)
+
+Stance = Union[float, int, str, None]
+
+# 并行讨论中，延迟不超过本轮最慢评委该倍数的评委视为"不增加本轮耗时"
+_ROUND_LATENCY_TOLERANCE = 1.2
+
+
+class LocalSpeakerSelector:
+    """
+    按 SELECTOR_PROMPT_TEMPLATE 的规则在本地确定下一位发言人
+
+    规则（优先级从高到低）：
+    1. 防止两人霸屏：最近 pingpong_window 轮只有两人互动时，选第三人
+    2. 收束控场：讨论达到 closing_turn 轮后，由收尾评委（默认 Qwen）做总结
+    3. 点名回应：上一条发言 @ 了谁，就让谁回应
+    4. 冲突优先：在发言较少的评委中，选与上一位立场差距最大的人来回怼
+    5. 雨露均沾：选发言最少、最久没说话的评委
+
+    任何情况下都不会让同一评委连续发言。
+
+    strict=False（混合模式）时只执行确定性强的规则 1~3，
+    其余情况返回 None，交由 LLM 选择器判断。
+
+    提供 latency_source 时（延迟感知），规则 4、5 按"发言数 / 延迟权重"计算谁发言更少：
+    模型快的评委多说几轮，慢的评委至少保留 min_share 的份额（见 latency_weights）；
+    并行讨论时优先把延迟相近的评委排在同一轮，避免快评委等慢评委。
+    """
+
+    def __init__(
+        self,
+        participants: list[str],
+        stances: Optional[dict[str, Stance]] = None,
+        aliases: Optional[dict[str, list[str]]] = None,
+        strict: bool = True,
+        closing_judge: Optional[str] = None,
+        closing_turn: Optional[int] = None,
+        pingpong_window: Optional[int] = None,
+        conflict_score_gap: Optional[float] = None,
+        latency_source: Optional[Callable[[], dict[str, float]]] = None,
+    ):
+        """
+        Args:
+            participants: 评委名称列表（与 Agent name 一致，顺序用于打破平局）
+            stances: 每位评委第一阶段的立场（评分模式为分数，二选一模式为 "A"/"B"）
+            aliases: 每位评委可被 @ 的别名（如显示名）
+            strict: True 时总是给出结果；False 时只处理确定性规则
+            latency_source: 返回各评委当前滚动延迟（毫秒）的函数，None 表示不考虑延迟
+        """
+        self.participants = list(participants)
+        self.stances = stances or {}
+        self.strict = strict
+        self.closing_judge = closing_judge if closing_judge is not None else settings.debate_closing_judge
+        self.closing_turn = closing_turn if closing_turn is not None else settings.debate_closing_turn
+        self.pingpong_window = pingpong_window if pingpong_window is not None else settings.debate_pingpong_window
+        self.conflict_score_gap = (
+            conflict_score_gap if conflict_score_gap is not None else settings.debate_conflict_score_gap
+        )
+        self.latency_source = latency_source
+        self.rule_counts: Counter = Counter()
+
+        # @提及匹配：按别名长度降序，避免短别名抢先匹配
+        alias_map = {}
+        for name in self.participants:
+            for alias in [name, *((aliases or {}).get(name, []))]:
+                if alias:
+                    alias_map[alias.lower()] = name
+        self._alias_to_name = alias_map
+        self._mention_pattern = re.compile(
+            "@(" + "|".join(re.escape(a) for a in sorted(alias_map, key=len, reverse=True)) + ")",
+            re.IGNORECASE,
+        ) if alias_map else None
+
+    def __call__(self, thread: Sequence) -> Optional[str]:
+        """SelectorGroupChat 的 selector_func 接口"""
+        turns = [
+            (msg.source, msg.to_text())
+            for msg in thread
+            if isinstance(msg, BaseChatMessage) and msg.source in self.participants
+        ]
+        speaker, rule = self.select(turns)
+        if speaker is not None:
+            self.rule_counts[rule] += 1
+            logger.debug(f"[本地选择器] 第 {len(turns) + 1} 轮 -> {speaker}（规则: {rule}）")
+        else:
+            self.rule_counts["llm_fallback"] += 1
+        return speaker
+
+    def select(
+        self,
+        turns: list[tuple[str, str]],
+        exclude: Sequence[str] = (),
+    ) -> tuple[Optional[str], str]:
+        """
+        根据已发生的发言选择下一位发言人
+
+        Args:
+            turns: [(发言人, 内容), ...]（只包含评委发言）
+            exclude: 本次不参与选择的评委（如同一轮中已选中的评委）
+
+        Returns:
+            (发言人或 None, 命中的规则名)
+        """
+        pool = [p for p in self.participants if p not in exclude] or list(self.participants)
+        if not turns:
+            return self._quietest(pool, turns), "opening"
+
+        last_speaker, last_content = turns[-1]
+        candidates = [p for p in pool if p != last_speaker] or pool
+
+        # 1. 防止两人霸屏
+        window = [speaker for speaker, _ in turns[-self.pingpong_window:]]
+        if len(window) >= self.pingpong_window and len(set(window)) <= 2:
+            others = [p for p in candidates if p not in set(window)]
+            if others:
+                return self._most_conflicting(others, last_speaker, turns), "break_pingpong"
+
+        # 2. 收束控场
+        if (
+            self.closing_judge in candidates
+            and len(turns) >= self.closing_turn
+            and self.closing_judge not in [s for s, _ in turns[self.closing_turn - 1:]]
+        ):
+            return self.closing_judge, "closing"
+
+        # 3. 点名回应
+        mentioned = self._first_mention(last_content, candidates)
+        if mentioned:
+            return mentioned, "mention"
+
+        if not self.strict:
+            return None, "llm_fallback"
+
+        # 4. 冲突优先（只在发言较少的评委中选，避免冲突规则导致两人霸屏）
+        counts = self._weighted_counts(turns)
+        min_count = min(counts[p] for p in candidates)
+        fair_band = [p for p in candidates if counts[p] <= min_count + 1]
+        rival = self._most_conflicting(fair_band, last_speaker, turns, require_gap=True)
+        if rival:
+            return rival, "conflict"
+
+        # 5. 雨露均沾
+        return self._quietest(candidates, turns), "fairness"
+
+    def select_round(self, turns: list[tuple[str, str]], size: int) -> list[str]:
+        """
+        为并行讨论选出一轮发言人（同一轮内不重复）
+
+        逐个按规则选择，每选出一人就假设其已发言，使同一轮的人选也遵循冲突/均衡规则。
+        """
+        chosen: list[str] = []
+        simulated = list(turns)
+        latencies = self._latencies()
+        for _ in range(min(size, len(self.participants))):
+            exclude = chosen + self._round_slowdowns(chosen, simulated, latencies)
+            speaker, rule = self.select(simulated, exclude=exclude)
+            if speaker is None or speaker in chosen:
+                break
+            self.rule_counts[rule] += 1
+            chosen.append(speaker)
+            simulated.append((speaker, ""))
+        return chosen
+
+    def _latencies(self) -> dict[str, float]:
+        if self.latency_source is None:
+            return {}
+        return self.latency_source() or {}
+
+    def _weighted_counts(self, turns: list[tuple[str, str]]) -> dict[str, float]:
+        """每位评委的发言数除以延迟权重（不考虑延迟时即发言数）"""
+        counts = Counter(speaker for speaker, _ in turns)
+        latencies = self._latencies()
+        if not latencies:
+            return {p: counts.get(p, 0) for p in self.participants}
+        weights = latency_weights(self.participants, latencies)
+        return {p: counts.get(p, 0) / weights[p] for p in self.participants}
+
+    def _round_slowdowns(
+        self,
+        chosen: list[str],
+        turns: list[tuple[str, str]],
+        latencies: dict[str, float],
+    ) -> list[str]:
+        """
+        并行一轮中会拖慢本轮的评委（比已选评委中最慢的还慢）
+
+        一轮的耗时取决于最慢的评委，快评委和慢评委同轮时快的要等慢的。
+        发言最少的评委不排除（保证慢评委仍有机会），排除后无人可选时也不排除。
+        """
+        if not chosen or not latencies:
+            return []
+        round_latency = max(latencies.get(p, 0.0) for p in chosen)
+        remaining = [p for p in self.participants if p not in chosen]
+        counts = self._weighted_counts(turns)
+        min_count = min((counts[p] for p in remaining), default=0)
+        slower = [
+            p for p in remaining
+            if latencies.get(p, round_latency) > round_latency * _ROUND_LATENCY_TOLERANCE and counts[p] > min_count
+        ]
+        return slower if len(slower) < len(remaining) else []
+
+    def _first_mention(self, content: str, candidates: list[str]) -> Optional[str]:
+        if not self._mention_pattern:
+            return None
+        for match in self._mention_pattern.finditer(content):
+            name = self._alias_to_name.get(match.group(1).lower())
+            if name in candidates:
+                return name
+        return None
+
+    def _stance_gap(self, a: str, b: str) -> Optional[float]:
+        """两位评委的立场差距（未知时返回 None）"""
+        sa, sb = self.stances.get(a), self.stances.get(b)
+        if sa is None or sb is None:
+            return None
+        if isinstance(sa, (int, float)) and isinstance(sb, (int, float)):
+            return abs(float(sa) - float(sb))
+        # 二选一：选择不同即为对立
+        return float("inf") if str(sa) != str(sb) else 0.0
+
+    def _most_conflicting(
+        self,
+        candidates: list[str],
+        last_speaker: str,
+        turns: list[tuple[str, str]],
+        require_gap: bool = False,
+    ) -> Optional[str]:
+        """选出与上一位发言人立场差距最大的评委（平局时选更安静的）"""
+        scored = []
+        for p in candidates:
+            gap = self._stance_gap(p, last_speaker)
+            if require_gap and (gap is None or gap < self.conflict_score_gap):
+                continue
+            scored.append((gap if gap is not None else -1.0, p))
+
+        if not scored:
+            return None
+
+        best_gap = max(gap for gap, _ in scored)
+        return self._quietest([p for gap, p in scored if gap == best_gap], turns)
+
+    def _quietest(self, candidates: list[str], turns: list[tuple[str, str]]) -> str:
+        """发言最少（延迟感知时按权重折算）→ 最久没说话 → 延迟更低 → 参与者顺序"""
+        counts = self._weighted_counts(turns)
+        last_spoken = {speaker: idx for idx, (speaker, _) in enumerate(turns)}
+        latencies = self._latencies()
+        order = {p: i for i, p in enumerate(self.participants)}
+        return min(
+            candidates,
+            key=lambda p: (counts.get(p, 0), last_spoken.get(p, -1), latencies.get(p, 0.0), order.get(p, 0)),
+        )
+
+
+def build_speaker_selector(
+    participants: list[str],
+    stances: Optional[dict[str, Stance]] = None,
+    aliases: Optional[dict[str, list[str]]] = None,
+    mode: Optional[str] = None,
+    latency_source: Optional[Callable[[], dict[str, float]]] = None,
+) -> Optional[LocalSpeakerSelector]:
+    """
+    按配置创建 selector_func
+
+    Args:
+        mode: llm（每轮调用 LLM）/ local（完全本地规则）/ hybrid（确定性规则本地处理，其余交给 LLM）
+        latency_source: 各评委滚动延迟的来源，仅在 DEBATE_LATENCY_AWARE 开启时使用
+
+    Returns:
+        LocalSpeakerSelector，llm 模式返回 None
+    """
+    mode = (mode or settings.debate_selector_mode).lower()
+    if mode not in SELECTOR_MODES:
+        logger.warning(f"未知的发言人选择模式: {mode}，使用 {SELECTOR_MODE_LLM}")
+        mode = SELECTOR_MODE_LLM
+
+    if mode == SELECTOR_MODE_LLM:
+        return None
+
+    latency_aware = settings.debate_latency_aware and latency_source is not None
+    logger.info(f"[阶段二] 使用本地发言人选择器: mode={mode}, 延迟感知: {latency_aware}")
+    return LocalSpeakerSelector(
+        participants=participants,
+        stances=stances,
+        aliases=aliases,
+        strict=(mode == SELECTOR_MODE_LOCAL),
+        latency_source=latency_source if latency_aware else None,
+    )
@@ -1,6 +1,7 @@
 """阶段一：多评委并发看图评分"""
 
 import asyncio
+import time
 from typing import Optional
 from io import BytesIO
 from pathlib import Path
@@ -12,8 +13,30 @@ from autogen_agentchat.messages import MultiModalMessage, TextMessage
 from autogen_core import Image as AGImage
 from loguru import logger
 
+from app.config import get_settings
 from app.judges.prompts import COMMON_SCORING_GUIDE, JUDGE_PERSONAS, parse_judge_response
-from app.judges.utils import make_vision_client, get_model_for_judge
+from app.judges.judge_cache import get_vision_judge_specs, get_model_client
+from app.judges.output_limits import STAGE_SCORING, record_parse_failure
+from app.judges.parse_guard import preview
+from app.judges.structured_output import (
+    MODE_FREEFORM,
+    MODE_STRUCTURED,
+    SCHEMA_SCORING,
+    STRUCTURED_OUTPUT_NOTE,
+    parse_structured_output,
+    record_stage_one_parse,
+    structured_output_enabled,
+)
+from app.judges.stream_parser import (
+    FIELD_OVERALL_SCORE,
+    IncrementalJudgeParser,
+    PartialField,
+    ProgressCallback,
+    stream_judge_response,
+)
+from app.timing import PhaseTimer
+
+settings = get_settings()
 
 
 def build_vision_judges(
@@ -39,43 +62,42 @@ def build_vision_judges(
     # 使用自定义或默认的评委人设
     personas = custom_personas or JUDGE_PERSONAS
     
-    for judge_id, persona_info in personas.items():
-        model_name = get_model_for_judge(judge_id)
-        display_name = persona_info.get("display_name", judge_id)
-        persona = persona_info.get("persona", "")
-        
-        # 构建完整的 system message
-        system_message = scoring_guide + persona
-        
+    # 评委规格（system message 拼接等）按配置哈希缓存，默认人设只构建一次
+    specs = get_vision_judge_specs(scoring_guide, personas)
+    
+    # 结构化输出模式：网关按 JudgeScoreOutput 的 JSON Schema 约束输出
+    structured = structured_output_enabled()
+    
+    for spec in specs:
         # 保存调试上下文
-        debug_contexts[judge_id] = {
-            "model_name": model_name,
-            "display_name": display_name,
-            "system_message": system_message,
-            "persona": persona,
+        debug_contexts[spec.judge_id] = {
+            "model_name": spec.model_name,
+            "display_name": spec.display_name,
+            "system_message": spec.system_message,
+            "persona": spec.persona,
             "scoring_guide": scoring_guide,
         }
         
         try:
-            model_client = make_vision_client(model=model_name, family="openai")
-            
+            # Agent 带有对话状态，每次请求新建；模型客户端可共享
             judge = AssistantAgent(
-                name=judge_id,
-                model_client=model_client,
-                system_message=system_message,
+                name=spec.judge_id,
+                model_client=get_model_client(
+                    spec.model_name,
+                    vision=True,
+                    stage=STAGE_SCORING,
+                    judge_id=spec.judge_id,
+                    response_schema=SCHEMA_SCORING if structured else None,
+                ),
+                system_message=spec.system_message + (STRUCTURED_OUTPUT_NOTE if structured else ""),
+                model_client_stream=settings.stage_one_streaming,
             )
             
             judges.append(judge)
-            
-            logger.info("="*80)
-            logger.info(f"[阶段一] 创建评委: {judge_id} ({display_name})")
-            logger.info(f"模型: {model_name}")
-            logger.debug(f"System Message 长度: {len(system_message)} 字符")
-            # logger.debug(f"System Message:\n{system_message[:500]}...")  # 只显示前500字符
-            logger.info("="*80)
+            logger.debug(f"[阶段一] 创建评委: {spec.judge_id} ({spec.display_name}), 模型: {spec.model_name}")
             
         except Exception as e:
-            logger.error(f"创建评委失败: {judge_id} - {e}")
+            logger.error(f"创建评委失败: {spec.judge_id} - {e}")
             continue
     
     return judges, debug_contexts
@@ -147,6 +169,8 @@ async def score_image_with_all_judges(
     extra_text: Optional[str] = None,
     custom_scoring_guide: Optional[str] = None,
     custom_personas: Optional[dict] = None,
+    timer: Optional[PhaseTimer] = None,
+    on_progress: Optional[ProgressCallback] = None,
 ) -> dict:
     """
     阶段一主函数：所有评委并发看图评分
@@ -156,20 +180,25 @@ async def score_image_with_all_judges(
         entry_id: 作品 ID
         competition_type: 比赛类型
         extra_text: 补充说明
+        timer: 分阶段计时器（记录图片获取、评委构建、各评委调用和解析耗时）
+        on_progress: 进度回调，评委输出中的字段（独白、总分）一完整就推送 field 事件，
+            评委完成时推送 judge 事件（开启 STAGE_ONE_STREAMING 时字段在输出结束前到达）
     
     Returns:
         包含所有评委评分和排序结果的字典
     """
     logger.info(f"开始阶段一评分: entry_id={entry_id}, competition_type={competition_type}")
+    timer = timer or PhaseTimer()
     
     # 1. 构建多模态消息
     try:
-        mm_msg = build_multimodal_message(
-            image_url=image_url,
-            entry_id=entry_id,
-            competition_type=competition_type,
-            extra_text=extra_text,
-        )
+        with timer.phase("image_fetch"):
+            mm_msg = build_multimodal_message(
+                image_url=image_url,
+                entry_id=entry_id,
+                competition_type=competition_type,
+                extra_text=extra_text,
+            )
     except Exception as e:
         logger.error(f"构建多模态消息失败: {e}")
         return {
@@ -181,10 +210,11 @@ async def score_image_with_all_judges(
         }
     
     # 2. 构建评委团队
-    judges, debug_contexts = build_vision_judges(
-        custom_scoring_guide=custom_scoring_guide,
-        custom_personas=custom_personas
-    )
+    with timer.phase("build_judges"):
+        judges, debug_contexts = build_vision_judges(
+            custom_scoring_guide=custom_scoring_guide,
+            custom_personas=custom_personas
+        )
     
     if not judges:
         logger.error("没有可用的评委")
@@ -202,11 +232,44 @@ async def score_image_with_all_judges(
     # 3. 并发调用所有评委
     logger.info(f"开始并发调用 {len(judges)} 个评委...")
     
-    tasks = [judge.on_messages([mm_msg], cancellation_token=None) for judge in judges]
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+    async def call_judge(judge: AssistantAgent):
+        t0 = time.perf_counter()
+        parser = IncrementalJudgeParser((FIELD_OVERALL_SCORE,))
+        
+        async def on_field(partial: PartialField):
+            elapsed_ms = (time.perf_counter() - t0) * 1000
+            if partial.field == FIELD_OVERALL_SCORE:
+                # 总分到达的时间（流式模式下早于整条输出结束）
+                timer.record_judge("stage_one_score", judge.name, elapsed_ms)
+            if on_progress:
+                await on_progress("field", {
+                    "judge_id": judge.name,
+                    "field": partial.field,
+                    "value": partial.value,
+                    "elapsed_ms": round(elapsed_ms, 1),
+                })
+        
+        error = None
+        try:
+            return await stream_judge_response(judge, [mm_msg], parser, on_field)
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - t0) * 1000
+            timer.record_judge("stage_one", judge.name, elapsed_ms)
+            if on_progress:
+                await on_progress("judge", {"judge_id": judge.name, "elapsed_ms": round(elapsed_ms, 1), "error": error})
+    
+    with timer.phase("judges"):
+        tasks = [call_judge(judge) for judge in judges]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
     
-    # 4. 解析评委响应
+    # 4. 解析评委响应（结构化输出模式只做 Schema 校验，不做正则提取）
     judge_outputs = []
+    parse_start = time.perf_counter()
+    structured = structured_output_enabled()
+    parse_mode = MODE_STRUCTURED if structured else MODE_FREEFORM
     
     for judge, result in zip(judges, results):
         # 获取评委显示名称
@@ -231,11 +294,23 @@ async def score_image_with_all_judges(
             
             logger.info("="*80)
             logger.info(f"[阶段一] 评委 {judge.name} 原始输出:")
-            logger.info(f"{raw_content}")
+            logger.info(preview(raw_content))
             logger.info("="*80)
             
             # 解析 JSON
-            data = parse_judge_response(raw_content)
+            if structured:
+                data = parse_structured_output(SCHEMA_SCORING, raw_content)
+            else:
+                data = parse_judge_response(raw_content)
+            
+            parsed = bool(data) and "overall_score" in data and not data.get("parse_failed")
+            model_name = debug_contexts.get(judge.name, {}).get("model_name", judge.name)
+            record_stage_one_parse(
+                model_name, parse_mode, parsed, timer.judges.get("stage_one", {}).get(judge.name, 0.0)
+            )
+            if data and data.pop("parse_failed", False):
+                # 兜底结果（0 分）照常返回，但计入解析失败
+                record_parse_failure(STAGE_SCORING, judge.name)
             
             if data and "overall_score" in data:
                 # 确保必要字段存在
@@ -260,6 +335,7 @@ async def score_image_with_all_judges(
                 logger.info(f"评委 {judge.name} 最终数据 keys: {list(data.keys())}") # Debug log
             else:
                 logger.warning(f"评委 {judge.name} 返回的 JSON 格式不正确")
+                record_parse_failure(STAGE_SCORING, judge.name)
                 judge_outputs.append({
                     "judge_id": judge.name,
                     "judge_display_name": judge_display_name,
@@ -271,6 +347,7 @@ async def score_image_with_all_judges(
         
         except Exception as e:
             logger.error(f"解析评委 {judge.name} 响应失败: {e}")
+            record_parse_failure(STAGE_SCORING, judge.name)
             judge_outputs.append({
                 "judge_id": judge.name,
                 "judge_display_name": judge_display_name,
@@ -279,6 +356,8 @@ async def score_image_with_all_judges(
                 "overall_score": 0.0,
             })
     
+    timer.record("parse", (time.perf_counter() - parse_start) * 1000)
+    
     # 5. 排序（按总分降序）
     valid_results = [r for r in judge_outputs if r.get("overall_score", 0) > 0]
     sorted_results = sorted(valid_results, key=lambda r: r["overall_score"], reverse=True)
@@ -0,0 +1,188 @@
+"""评委输出的增量解析：边接收模型 token 边识别已完整的字段（阶段一流式模式）"""
+
+import re
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional, Sequence
+
+from autogen_agentchat.agents import AssistantAgent
+from autogen_agentchat.base import Response
+from autogen_agentchat.messages import BaseChatMessage, ModelClientStreamingChunkEvent
+from autogen_core import CancellationToken
+
+FIELD_INNER_MONOLOGUE = "inner_monologue"
+FIELD_OVERALL_SCORE = "overall_score"
+FIELD_CHOICE = "choice"
+
+_MONOLOGUE_OPEN = re.compile(r"<inner_monologue>", re.IGNORECASE)
+_MONOLOGUE_CLOSE = re.compile(r"</inner_monologue>", re.IGNORECASE)
+
+# 值后面必须出现分隔符才算完整（"overall_score": 7 可能还会变成 7.5）
+_FIELD_PATTERNS = {
+    FIELD_OVERALL_SCORE: re.compile(r'"overall_score"\s*:\s*(-?\d+(?:\.\d+)?)\s*[,}\n]'),
+    FIELD_CHOICE: re.compile(r'"choice"\s*:\s*"\s*([ABab])\s*"'),
+}
+
+# 一个完整字段（键 + 空白 + 值）的最大长度：未匹配时只需从缓冲区末尾这么长的位置重新查找
+_MAX_FIELD_CHARS = 64
+
+# 进度回调：(事件类型, 数据)
+ProgressCallback = Callable[[str, dict], Awaitable[None]]
+
+
+@dataclass(frozen=True)
+class PartialField:
+    """流式输出中已完整的一个字段"""
+    field: str
+    value: Any
+    offset: int  # 字段在输出中结束的位置（字符）
+
+
+class IncrementalJudgeParser:
+    """
+    增量解析评委输出
+
+    每次 feed 一段新 token，返回其中新完整的字段：
+    - inner_monologue：</inner_monologue> 到达时产出
+    - overall_score / choice：JSON 中的值完整时产出（独白内部的同名文本不算）
+
+    每个字段只产出一次。只扫描新到达的文本（加上少量回看），总耗时与输出长度成线性。
+    这里的结果是提前得到的临时值，完整输出仍由 parse_judge_response /
+    parse_binary_choice_response 解析，以其结果为准。
+    """
+
+    def __init__(self, fields: Sequence[str] = (FIELD_OVERALL_SCORE,)):
+        self._buffer = ""
+        self._pending = {name: _FIELD_PATTERNS[name] for name in fields}
+        self._search_from = {name: 0 for name in fields}
+        self._monologue_start: Optional[int] = None  # 独白内容起点（已看到开始标签）
+        self._monologue_end: Optional[int] = None  # 结束标签之后的位置
+        self._tag_search_from = 0
+        self.fields: dict[str, Any] = {}
+
+    @property
+    def text(self) -> str:
+        return self._buffer
+
+    def feed(self, chunk: str) -> list[PartialField]:
+        if not chunk:
+            return []
+        self._buffer += chunk
+        found = []
+
+        monologue = self._scan_monologue()
+        if monologue:
+            found.append(monologue)
+
+        for name, pattern in list(self._pending.items()):
+            match = self._search_field(name, pattern)
+            if match:
+                value = match.group(1)
+                value = float(value) if name == FIELD_OVERALL_SCORE else value.upper()
+                found.append(self._complete(name, value, match.end()))
+        return found
+
+    def _search_field(self, name: str, pattern: re.Pattern) -> Optional[re.Match]:
+        """在独白之外的文本中查找字段，未找到时推进下次查找的起点"""
+        start = self._search_from[name]
+        end = len(self._buffer)
+        if self._monologue_start is not None:
+            # 先查开始标签之前的部分，再查结束标签之后的部分
+            if start < self._monologue_start:
+                match = pattern.search(self._buffer, start, self._monologue_start)
+                if match:
+                    return match
+            if self._monologue_end is None:
+                self._search_from[name] = max(start, self._monologue_start - _MAX_FIELD_CHARS)
+                return None
+            start = max(start, self._monologue_end)
+        match = pattern.search(self._buffer, start, end)
+        if not match:
+            self._search_from[name] = max(start, end - _MAX_FIELD_CHARS)
+        return match
+
+    def _complete(self, name: str, value: Any, offset: int) -> PartialField:
+        self._pending.pop(name, None)
+        self.fields[name] = value
+        return PartialField(name, value, offset)
+
+    def _scan_monologue(self) -> Optional[PartialField]:
+        if self._monologue_end is not None:
+            return None
+        tag_chars = len("</inner_monologue>")
+        if self._monologue_start is None:
+            match = _MONOLOGUE_OPEN.search(self._buffer, self._tag_search_from)
+            if not match:
+                self._tag_search_from = max(0, len(self._buffer) - tag_chars)
+                return None
+            self._monologue_start = self._tag_search_from = match.end()
+        match = _MONOLOGUE_CLOSE.search(self._buffer, self._tag_search_from)
+        if not match:
+            self._tag_search_from = max(self._monologue_start, len(self._buffer) - tag_chars)
+            return None
+        self._monologue_end = match.end()
+        content = self._buffer[self._monologue_start:match.start()].strip()
+        return self._complete(FIELD_INNER_MONOLOGUE, content, match.end())
+
+
+class ChoiceQuorum:
+    """
+    二选一的多数判定：某个选项的票数超过评委总数的一半后，结果不会再被剩余评委改变
+
+    只判定一次；评委调用失败时调用 drop 减少总数（判定门槛随之降低）。
+    判定只用于提前上报（进度事件、耗时），不会取消剩余评委：
+    讨论和最终票数需要每位评委的选择与理由。
+    """
+
+    def __init__(self, total: int):
+        self.total = total
+        self.votes = {"A": 0, "B": 0}
+        self.decided: Optional[str] = None
+
+    def add(self, choice: str) -> Optional[str]:
+        """记一票，刚好形成多数时返回该选项"""
+        self.votes[choice] += 1
+        return self._check()
+
+    def drop(self) -> Optional[str]:
+        """一位评委无法给出选择"""
+        self.total -= 1
+        return self._check()
+
+    def _check(self) -> Optional[str]:
+        if self.decided:
+            return None
+        for choice, count in self.votes.items():
+            if count * 2 > self.total:
+                self.decided = choice
+                return choice
+        return None
+
+
+async def stream_judge_response(
+    judge: AssistantAgent,
+    messages: Sequence[BaseChatMessage],
+    parser: IncrementalJudgeParser,
+    on_field: Callable[[PartialField], Awaitable[None]],
+    cancellation_token: Optional[CancellationToken] = None,
+) -> Response:
+    """
+    调用评委并把输出送入增量解析器，每个字段完整时回调 on_field
+
+    评委开启 model_client_stream 时逐 token 解析；否则在完整响应到达后一次性解析
+    （回调时机与原先相同，调用方不必区分两种模式）。
+    """
+    token = cancellation_token or CancellationToken()
+    response = None
+    async for event in judge.on_messages_stream(messages, token):
+        if isinstance(event, ModelClientStreamingChunkEvent):
+            for partial in parser.feed(event.content):
+                await on_field(partial)
+        elif isinstance(event, Response):
+            response = event
+
+    # 非流式时一次性送入完整响应；末尾补一个换行，让结尾处的数值也能判定为完整
+    content = response.chat_message.content
+    tail = content if not parser.text and isinstance(content, str) else ""
+    for partial in parser.feed(tail + "\n"):
+        await on_field(partial)
+    return response
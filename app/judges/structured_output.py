@@ -0,0 +1,106 @@
+"""阶段一结构化输出：按响应模型生成 JSON Schema 交给网关约束输出，并用预编译的校验器解析"""
+
+from collections import defaultdict
+from typing import Any, Optional
+
+from pydantic import TypeAdapter, ValidationError
+
+from app.config import get_settings
+from app.models.binary_choice_schemas import BinaryChoiceOutput
+from app.models.schemas import JudgeScoreOutput
+
+settings = get_settings()
+
+SCHEMA_SCORING = "judge_score"
+SCHEMA_BINARY_CHOICE = "binary_choice"
+
+MODE_STRUCTURED = "structured"
+MODE_FREEFORM = "freeform"
+
+# 校验器在导入时（服务启动时）构建一次，请求中只做校验
+_ADAPTERS: dict[str, TypeAdapter] = {
+    SCHEMA_SCORING: TypeAdapter(JudgeScoreOutput),
+    SCHEMA_BINARY_CHOICE: TypeAdapter(BinaryChoiceOutput),
+}
+
+_RESPONSE_FORMATS: dict[str, dict] = {
+    name: {
+        "type": "json_schema",
+        "json_schema": {"name": name, "schema": adapter.json_schema(), "strict": False},
+    }
+    for name, adapter in _ADAPTERS.items()
+}
+
+# 结构化输出模式下追加到评委 system message 的说明（原提示词要求 XML + JSON）
+STRUCTURED_OUTPUT_NOTE = """
+
+## 输出方式（覆盖上面的输出格式）
+本次只输出一个 JSON 对象，不要输出 <inner_monologue> 标签或 Markdown 代码块。
+先在 inner_monologue 字段中写你的内心独白，再填写其余字段。
+"""
+
+
+def structured_output_enabled() -> bool:
+    return settings.stage_one_structured_output
+
+
+def response_format(schema: str) -> dict:
+    """发给网关的 response_format（JSON Schema 由响应模型生成）"""
+    return _RESPONSE_FORMATS[schema]
+
+
+def parse_structured_output(schema: str, raw: str) -> Optional[dict]:
+    """
+    校验结构化输出，成功返回字段字典，不符合 Schema 时返回 None
+
+    不做任何正则提取：网关已约束输出格式，校验失败即记为解析失败。
+    """
+    try:
+        return _ADAPTERS[schema].validate_json(raw).model_dump()
+    except ValidationError:
+        return None
+
+
+def _new_counter() -> dict[str, float]:
+    return {"calls": 0, "parse_failures": 0, "latency_ms_total": 0.0}
+
+
+# {模型: {模式: 计数}}，进程内累计（对照结构化输出与自由格式的解析失败率和延迟）
+_stats: dict[str, dict[str, dict[str, float]]] = defaultdict(lambda: defaultdict(_new_counter))
+
+
+def record_stage_one_parse(model: str, mode: str, ok: bool, latency_ms: float) -> None:
+    """记录一次阶段一调用的解析结果和耗时"""
+    counter = _stats[model][mode]
+    counter["calls"] += 1
+    counter["latency_ms_total"] += latency_ms
+    if not ok:
+        counter["parse_failures"] += 1
+
+
+def structured_output_stats() -> dict[str, Any]:
+    """
+    各模型在结构化输出 / 自由格式下的调用次数、解析失败率和平均耗时
+
+    两种模式都有数据时给出 latency_delta_ms（结构化输出相对自由格式的平均耗时差）。
+    """
+    stats = {}
+    for model, modes in _stats.items():
+        stats[model] = {}
+        for mode, counter in modes.items():
+            calls = counter["calls"]
+            stats[model][mode] = {
+                "calls": calls,
+                "parse_failures": counter["parse_failures"],
+                "parse_failure_rate": round(counter["parse_failures"] / calls, 3) if calls else 0.0,
+                "avg_latency_ms": round(counter["latency_ms_total"] / calls, 1) if calls else 0.0,
+            }
+        if MODE_STRUCTURED in stats[model] and MODE_FREEFORM in stats[model]:
+            stats[model]["latency_delta_ms"] = round(
+                stats[model][MODE_STRUCTURED]["avg_latency_ms"] - stats[model][MODE_FREEFORM]["avg_latency_ms"], 1
+            )
+    return stats
+
+
+def reset_structured_output_stats() -> None:
+    _stats.clear()
@@ -0,0 +1,260 @@
+"""讨论终止条件：最大消息数、评委开始车轱辘话时提前结束、token 预算和时限"""
+
+import asyncio
+import re
+import time
+from typing import AsyncGenerator, Optional, Sequence
+
+from autogen_agentchat.base import TaskResult, TerminatedException, TerminationCondition
+from autogen_agentchat.conditions import MaxMessageTermination, TokenUsageTermination
+from autogen_agentchat.messages import BaseAgentEvent, BaseChatMessage, StopMessage
+from autogen_core import CancellationToken, Component
+from loguru import logger
+from pydantic import BaseModel
+from typing_extensions import Self
+
+from app.config import get_settings
+
+settings = get_settings()
+
+_MENTION_PATTERN = re.compile(r"@\S+")
+_SEGMENT_PATTERN = re.compile(r"\w+")
+
+
+def shingles(text: str, size: int) -> set[str]:
+    """
+    字符 n-gram 集合（忽略 @提及，不区分大小写）
+
+    中文没有天然分词，按字符切片即可衡量复述程度，不依赖分词器。
+    按空白和标点分段后在段内切片，避免跨句拼接出"新"的 n-gram。
+    """
+    grams = set()
+    for segment in _SEGMENT_PATTERN.findall(_MENTION_PATTERN.sub("", text).lower()):
+        if len(segment) <= size:
+            grams.add(segment)
+        else:
+            grams.update(segment[i:i + size] for i in range(len(segment) - size + 1))
+    return grams
+
+
+class ConvergenceTerminationConfig(BaseModel):
+    min_turns: int
+    patience: int
+    novelty_threshold: float
+    shingle_size: int
+
+
+class ConvergenceTermination(TerminationCondition, Component[ConvergenceTerminationConfig]):
+    """
+    讨论收敛时终止：连续多轮发言的"新内容占比"过低
+
+    新内容占比 = 本轮发言中此前（初始消息 + 全部已有发言）从未出现过的字符 n-gram 所占比例。
+    只在本地做集合运算，不额外调用模型。
+
+    - 评委发言达到 min_turns 轮之后才开始判断
+    - 连续 patience 轮的新内容占比都低于 novelty_threshold 时终止
+    - 终止原因写入 StopMessage / stop_reason，每轮的占比记录在 novelty_history 中
+
+    Args:
+        min_turns: 开始判断前至少需要的评委发言数
+        patience: 连续低新意的轮数
+        novelty_threshold: 新内容占比阈值（0~1）
+        shingle_size: 字符 n-gram 的长度
+        sources: 参与判断的发言人（None 表示除 user 外的所有人）
+    """
+
+    component_config_schema = ConvergenceTerminationConfig
+
+    def __init__(
+        self,
+        min_turns: Optional[int] = None,
+        patience: Optional[int] = None,
+        novelty_threshold: Optional[float] = None,
+        shingle_size: Optional[int] = None,
+        sources: Optional[Sequence[str]] = None,
+    ) -> None:
+        self.min_turns = min_turns if min_turns is not None else settings.debate_convergence_min_turns
+        self.patience = patience if patience is not None else settings.debate_convergence_patience
+        self.novelty_threshold = (
+            novelty_threshold if novelty_threshold is not None else settings.debate_convergence_novelty
+        )
+        self.shingle_size = shingle_size if shingle_size is not None else settings.debate_convergence_shingle_size
+        self.sources = set(sources) if sources is not None else None
+        self._reset_state()
+
+    def _reset_state(self) -> None:
+        self._seen: set[str] = set()
+        self._turns = 0
+        self._stale = 0
+        self._terminated = False
+        self.stop_reason: Optional[str] = None
+        self.novelty_history: list[tuple[str, float]] = []
+
+    @property
+    def terminated(self) -> bool:
+        return self._terminated
+
+    def _is_judge(self, source: str) -> bool:
+        if self.sources is not None:
+            return source in self.sources
+        return source != "user"
+
+    def observe(self, source: str, text: str) -> Optional[float]:
+        """
+        记录一条消息，返回其新内容占比（非评委消息只计入已出现内容，返回 None）
+        """
+        grams = shingles(text, self.shingle_size)
+        if not self._is_judge(source):
+            self._seen |= grams
+            return None
+
+        novelty = len(grams - self._seen) / len(grams) if grams else 0.0
+        self._seen |= grams
+        self._turns += 1
+        self.novelty_history.append((source, round(novelty, 3)))
+
+        if novelty < self.novelty_threshold:
+            self._stale += 1
+        else:
+            self._stale = 0
+        return novelty
+
+    async def __call__(self, messages: Sequence[BaseAgentEvent | BaseChatMessage]) -> StopMessage | None:
+        if self._terminated:
+            raise TerminatedException("Termination condition has already been reached")
+
+        for message in messages:
+            if not isinstance(message, BaseChatMessage):
+                continue
+            self.observe(message.source, message.to_text())
+
+        if self._turns >= self.min_turns and self._stale >= self.patience:
+            recent = ", ".join(f"{n:.2f}" for _, n in self.novelty_history[-self.patience:])
+            self.stop_reason = (
+                f"讨论已收敛：连续 {self._stale} 轮发言新内容占比低于 {self.novelty_threshold:.2f}"
+                f"（最近: {recent}）"
+            )
+            self._terminated = True
+            return StopMessage(content=self.stop_reason, source="ConvergenceTermination")
+        return None
+
+    async def reset(self) -> None:
+        self._reset_state()
+
+    def _to_config(self) -> ConvergenceTerminationConfig:
+        return ConvergenceTerminationConfig(
+            min_turns=self.min_turns,
+            patience=self.patience,
+            novelty_threshold=self.novelty_threshold,
+            shingle_size=self.shingle_size,
+        )
+
+    @classmethod
+    def _from_config(cls, config: ConvergenceTerminationConfig) -> Self:
+        return cls(
+            min_turns=config.min_turns,
+            patience=config.patience,
+            novelty_threshold=config.novelty_threshold,
+            shingle_size=config.shingle_size,
+        )
+
+
+def build_debate_termination(
+    max_messages: int,
+    participants: Sequence[str],
+    history: Sequence[BaseChatMessage] = (),
+    token_budget: Optional[int] = None,
+) -> TerminationCondition:
+    """
+    讨论的终止条件：最大消息数，启用时叠加收敛检测和 token 预算
+
+    Args:
+        max_messages: 最大消息数
+        participants: 评委名称列表
+        history: 恢复讨论时已有的消息（预先计入收敛检测，不计入消息数）
+        token_budget: 评委发言的 prompt + completion token 总预算（None / <= 0 表示不限制）
+    """
+    termination: TerminationCondition = MaxMessageTermination(max_messages=max_messages)
+    if token_budget and token_budget > 0:
+        termination = termination | TokenUsageTermination(max_total_token=token_budget)
+    if not settings.debate_convergence_enabled:
+        return termination
+
+    convergence = ConvergenceTermination(sources=participants)
+    for message in history:
+        convergence.observe(message.source, message.to_text())
+    return termination | convergence
+
+
+def remaining_token_budget(token_budget: Optional[int], messages: Sequence[dict]) -> Optional[int]:
+    """
+    扣除已落库发言用掉的 token 后的剩余预算（恢复讨论时使用）
+
+    至少保留 1，预算已用完时下一条发言后即结束。
+    """
+    if not token_budget or token_budget <= 0:
+        return None
+    used = 0
+    for message in messages:
+        metrics = message.get("metrics") or {}
+        used += (metrics.get("prompt_tokens") or 0) + (metrics.get("completion_tokens") or 0)
+    return max(token_budget - used, 1)
+
+
+async def stream_with_deadline(
+    stream: AsyncGenerator,
+    deadline_seconds: Optional[float],
+    cancellation_token: Optional[CancellationToken] = None,
+) -> AsyncGenerator:
+    """
+    给讨论事件流加上时限
+
+    终止条件只在新消息产生时检查，慢模型的一次调用就可能超时很久，
+    所以时限在等待下一条消息时判断：到期后取消正在进行的模型调用，
+    产出一个带终止原因的 TaskResult 后结束（已产生的发言照常保留）。
+
+    Args:
+        stream: run_stream() / run_parallel_rounds() 的事件流
+        deadline_seconds: 时限（None / <= 0 表示不限制）
+        cancellation_token: 传给 run_stream() 的取消令牌；没有时直接取消等待中的任务
+    """
+    if not deadline_seconds or deadline_seconds <= 0:
+        async for event in stream:
+            yield event
+        return
+
+    deadline = time.monotonic() + deadline_seconds
+    pending: Optional[asyncio.Future] = None
+    try:
+        while True:
+            pending = asyncio.ensure_future(anext(stream))
+            await asyncio.wait({pending}, timeout=max(deadline - time.monotonic(), 0))
+            if pending.done():
+                try:
+                    event = pending.result()
+                except StopAsyncIteration:
+                    return
+                pending = None
+                yield event
+                continue
+
+            logger.warning(f"讨论达到时限 {deadline_seconds:g} 秒，取消进行中的发言")
+            if cancellation_token is not None:
+                cancellation_token.cancel()
+            else:
+                pending.cancel()
+            try:
+                await pending
+            except (asyncio.CancelledError, StopAsyncIteration):
+                pass
+            except Exception as e:
+                logger.debug(f"取消讨论时的异常: {e}")
+            pending = None
+            yield TaskResult(messages=[], stop_reason=f"讨论达到时限：{deadline_seconds:g} 秒")
+            return
+    finally:
+        if pending is not None and not pending.done():
+            # 调用方提前退出时事件流仍在运行，只能取消
+            pending.cancel()
+        else:
+            await stream.aclose()
@@ -3,6 +3,8 @@
 from typing import Optional
 from autogen_ext.models.openai import OpenAIChatCompletionClient
 from app.config import get_settings
+from app.judges.json_extract import extract_json_object
+from app.judges.parse_guard import ParseGuard
 
 settings = get_settings()
 
@@ -81,41 +83,13 @@ def parse_json_from_response(content: str) -> Optional[dict]:
     支持：
     - 纯 JSON
     - Markdown 代码块包裹的 JSON
+    - 夹在其他文本中的 JSON（取第一个非空对象）
     
     Args:
         content: 模型响应内容
     
     Returns:
-        解析后的 dict，失败返回 None
+        解析后的 dict，失败返回 None（超长输出只解析首尾窗口，超出时间预算同样返回 None）
     """
-    import json
-    import re
-    
-    # 尝试直接解析
-    try:
-        return json.loads(content)
-    except json.JSONDecodeError:
-        pass
-    
-    # 尝试从 markdown 代码块中提取
-    code_block_pattern = r"```(?:json)?\s*(\{.*?\})\s*```"
-    match = re.search(code_block_pattern, content, re.DOTALL)
-    
-    if match:
-        try:
-            return json.loads(match.group(1))
-        except json.JSONDecodeError:
-            pass
-    
-    # 尝试查找第一个完整的 JSON 对象
-    json_pattern = r"\{(?:[^{}]|(?:\{(?:[^{}]|(?:\{[^{}]*\}))*\}))*\}"
-    match = re.search(json_pattern, content, re.DOTALL)
-    
-    if match:
-        try:
-            return json.loads(match.group(0))
-        except json.JSONDecodeError:
-            pass
-    
-    return None
-
+    with ParseGuard("parse_json_from_response", content) as guard:
+        return extract_json_object(guard.text, deadline=guard.deadline)
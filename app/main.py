@@ -9,7 +9,7 @@ from fastapi.responses import FileResponse
 from loguru import logger
 
 from app.config import get_settings
-from app.db.database import init_database
+from app.db.database import db_writer, init_database, wal_checkpointer
 from app.api.routes import router
 from app.api.binary_choice_routes import router as binary_choice_router
 from app.logger import setup_logger
@@ -32,6 +32,8 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"数据库初始化失败: {e}")
         raise
+    db_writer.start()
+    wal_checkpointer.start()
     
     logger.success("系统启动完成！")
     logger.info(f"API 文档地址: http://{settings.server_host}:{settings.server_port}/docs")
@@ -40,6 +42,8 @@ async def lifespan(app: FastAPI):
     
     # 关闭时
     logger.info("AI Judge System 正在关闭...")
+    await db_writer.stop()  # 先提交已排队的写操作
+    await wal_checkpointer.stop()
 
 
 # 创建 FastAPI 应用
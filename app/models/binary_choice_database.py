@@ -4,7 +4,7 @@ from datetime import datetime
 from sqlalchemy import Column, String, Integer, Text, DateTime, JSON, ForeignKey
 from sqlalchemy.orm import relationship
 
-from app.models.database import Base
+from app.models.database import Base, QueryableJSON
 
 
 class BinaryChoiceEntry(Base):
@@ -23,6 +23,7 @@ class BinaryChoiceEntry(Base):
     option_b = Column(String(200), nullable=False)  # 选项 B：如"没错"
     
     extra_context = Column(Text, nullable=True)  # 补充说明
+    timings = Column(QueryableJSON, nullable=True)  # 分阶段耗时
     
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -88,14 +89,20 @@ class BinaryChoiceDebateSession(Base):
         index=True
     )
     
-    participants = Column(JSON, nullable=False)  # 参与评委列表
-    config = Column(JSON, nullable=True)  # 配置信息
+    participants = Column(QueryableJSON, nullable=False)  # 参与评委列表
+    config = Column(QueryableJSON, nullable=True)  # 配置信息
     
     # 调试信息
     judge_contexts = Column(JSON, nullable=True)
     selector_prompt = Column(Text, nullable=True)
     initial_message = Column(Text, nullable=True)
     
+    # 逐条落库与断点恢复
+    status = Column(String(20), nullable=True)  # running / completed / failed（旧数据为空，视为已完成）
+    team_state = Column(JSON, nullable=True)  # 最后一次保存的 team 状态（autogen save_state）
+    checkpoint_sequence = Column(Integer, nullable=True)  # team_state 对应的最后一条发言序号
+    stop_reason = Column(Text, nullable=True)  # 讨论结束原因（达到最大消息数 / 讨论收敛）
+    
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # 关联关系
@@ -124,9 +131,12 @@ class BinaryChoiceMessage(Base):
     content = Column(Text, nullable=False)  # 发言内容
     
     # 调试信息
-    context_history = Column(JSON, nullable=True)
+    context_history = Column(JSON, nullable=True)  # 旧版：上下文完整拷贝（新数据使用序号范围）
+    context_start = Column(Integer, nullable=True)  # 上下文起始序号（0 为会话初始消息）
+    context_end = Column(Integer, nullable=True)  # 上下文结束序号（含）
     raw_response = Column(Text, nullable=True)
     model_name = Column(String(100), nullable=True)
+    metrics = Column(QueryableJSON, nullable=True)  # 本轮 prompt token 统计（压缩前/实际发送/模型用量）
     
     created_at = Column(DateTime, default=datetime.utcnow)
     
@@ -1,6 +1,6 @@
 """二选一模式的 Pydantic 数据模型"""
 
-from typing import Optional, List
+from typing import Literal, Optional, List
 from pydantic import BaseModel, Field
 from datetime import datetime
 
@@ -35,6 +35,15 @@ class BinaryChoiceRequest(BaseModel):
         }
 
 
+# ============ 模型结构化输出 ============
+
+class BinaryChoiceOutput(BaseModel):
+    """二选一评委的输出结构（结构化输出模式下作为 JSON Schema 发给网关，并用于校验）"""
+    inner_monologue: str = Field(..., description="内心独白：最直白的真实想法（先写这个）")
+    choice: Literal["A", "B"] = Field(..., description="选择：A 或 B")
+    reasoning: str = Field(..., description="公开理由（2-3 句话）")
+
+
 # ============ 响应模型 ============
 
 class BinaryChoiceJudgeResult(BaseModel):
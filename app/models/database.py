@@ -2,11 +2,16 @@
 
 from datetime import datetime
 from sqlalchemy import Column, String, Float, Integer, Text, DateTime, JSON, ForeignKey
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
 Base = declarative_base()
 
+# 需要按内容查询 / 统计的 JSON 列：PostgreSQL 上使用 JSONB（可建 GIN 索引、支持 @> 等运算符），其他数据库为 JSON。
+# 只整体读写的大块调试数据（上下文、team 状态）仍用 JSON：写入时不必解析成二进制格式，也保留原始键顺序。
+QueryableJSON = JSON().with_variant(JSONB(), "postgresql")
+
 
 class Entry(Base):
     """参赛作品表"""
@@ -16,6 +21,7 @@ class Entry(Base):
     image_url = Column(String(500), nullable=False)
     competition_type = Column(String(50), nullable=False, index=True)
     extra_text = Column(Text, nullable=True)
+    timings = Column(QueryableJSON, nullable=True)  # 分阶段耗时 {"phases": {...}, "judges": {...}, "turns": [...]}
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -36,12 +42,12 @@ class JudgeResult(Base):
     
     # 评分数据
     overall_score = Column(Float, nullable=False)
-    dimension_scores = Column(JSON, nullable=True)  # [{"name": "风格统一度", "score": 8, ...}, ...]
-    strengths = Column(JSON, nullable=True)  # ["优点1", "优点2", ...]
-    weaknesses = Column(JSON, nullable=True)  # ["缺点1", "缺点2", ...]
+    dimension_scores = Column(QueryableJSON, nullable=True)  # [{"name": "风格统一度", "score": 8, ...}, ...]
+    strengths = Column(QueryableJSON, nullable=True)  # ["优点1", "优点2", ...]
+    weaknesses = Column(QueryableJSON, nullable=True)  # ["缺点1", "缺点2", ...]
     one_liner = Column(Text, nullable=True)
     comment_for_audience = Column(Text, nullable=True)
-    safety_notes = Column(JSON, nullable=True)
+    safety_notes = Column(QueryableJSON, nullable=True)
     
     # 调试信息
     raw_output = Column(Text, nullable=True)
@@ -61,14 +67,20 @@ class DebateSession(Base):
     
     debate_id = Column(String(150), primary_key=True, index=True)
     entry_id = Column(String(100), ForeignKey("entries.entry_id"), nullable=False, index=True)
-    participants = Column(JSON, nullable=False)  # ["chatgpt5_judge", "grok_judge", ...]
-    config = Column(JSON, nullable=True)  # {"max_messages": 12, "selector_model": "gpt-4o-mini"}
+    participants = Column(QueryableJSON, nullable=False)  # ["chatgpt5_judge", "grok_judge", ...]
+    config = Column(QueryableJSON, nullable=True)  # {"max_messages": 12, "selector_model": "gpt-4o-mini"}
     
     # 调试信息
     judge_contexts = Column(JSON, nullable=True)  # 每个评委的上下文信息（system_message等）
     selector_prompt = Column(Text, nullable=True)  # 选择器的提示词
     initial_message = Column(Text, nullable=True)  # 初始消息内容
     
+    # 逐条落库与断点恢复
+    status = Column(String(20), nullable=True)  # running / completed / failed（旧数据为空，视为已完成）
+    team_state = Column(JSON, nullable=True)  # 最后一次保存的 team 状态（autogen save_state）
+    checkpoint_sequence = Column(Integer, nullable=True)  # team_state 对应的最后一条发言序号
+    stop_reason = Column(Text, nullable=True)  # 讨论结束原因（达到最大消息数 / 讨论收敛）
+    
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # 关联关系
@@ -87,9 +99,12 @@ class DebateMessage(Base):
     content = Column(Text, nullable=False)  # 发言内容
     
     # 调试信息
-    context_history = Column(JSON, nullable=True)  # 发言时的上下文历史（之前所有消息）
+    context_history = Column(JSON, nullable=True)  # 旧版：发言时的上下文历史完整拷贝（新数据使用下面的序号范围）
+    context_start = Column(Integer, nullable=True)  # 发言时看到的上下文起始序号（0 为会话初始消息）
+    context_end = Column(Integer, nullable=True)  # 发言时看到的上下文结束序号（含）
     raw_response = Column(Text, nullable=True)  # AI 模型的原始响应
     model_name = Column(String(100), nullable=True)  # 使用的模型
+    metrics = Column(QueryableJSON, nullable=True)  # 本轮 prompt token 统计（压缩前/实际发送/模型用量）
     
     created_at = Column(DateTime, default=datetime.utcnow)
     
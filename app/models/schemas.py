@@ -29,6 +29,10 @@ class JudgeEntryRequest(BaseModel):
     competition_type: str = Field(default="outfit", description="比赛类型")
     extra_text: Optional[str] = Field(None, description="补充说明")
     custom_prompts: Optional[JudgeCustomPrompts] = Field(None, description="自定义提示词配置")
+    background_debate: bool = Field(
+        False,
+        description="是否在后台运行阶段二讨论（评分结果落库后立即返回，讨论通过 debate_url 轮询或流式获取）",
+    )
     
     class Config:
         json_schema_extra = {
@@ -40,6 +44,17 @@ class JudgeEntryRequest(BaseModel):
         }
 
 
+# ============ 模型结构化输出 ============
+
+class JudgeScoreOutput(BaseModel):
+    """阶段一评委的输出结构（结构化输出模式下作为 JSON Schema 发给网关，并用于校验）"""
+    inner_monologue: str = Field(..., description="内心独白：最直白的真实想法（先写这个）")
+    overall_score: float = Field(..., ge=0, le=10, description="总分（0-10）")
+    one_liner: str = Field(..., description="一句话点评")
+    strengths: List[str] = Field(default_factory=list, description="优点列表")
+    weaknesses: List[str] = Field(default_factory=list, description="缺点列表")
+
+
 # ============ 响应模型 ============
 
 class DimensionScore(BaseModel):
@@ -107,6 +122,11 @@ class JudgeEntryResponse(BaseModel):
     judge_results: List[JudgeResultResponse] = Field(..., description="所有评委的评分")
     sorted_results: List[JudgeResultResponse] = Field(..., description="按分数排序的评委评分")
     debate: Optional[DebateResponse] = Field(None, description="群聊讨论内容")
+    debate_status: Optional[str] = Field(
+        None, description="讨论状态：pending / running / completed / failed"
+    )
+    debate_url: Optional[str] = Field(None, description="轮询讨论状态和内容的 URL")
+    debate_stream_url: Optional[str] = Field(None, description="流式获取讨论消息的 URL（SSE）")
     
     class Config:
         json_schema_extra = {
@@ -138,3 +158,12 @@ class JudgeEntryResponse(BaseModel):
             }
         }
 
+
+class DebateStatusResponse(BaseModel):
+    """讨论状态（用于后台讨论模式的轮询）"""
+    entry_id: str = Field(..., description="作品 ID")
+    debate_status: str = Field(
+        ..., description="讨论状态：pending / running / completed / failed / not_started / interrupted"
+    )
+    debate: Optional[DebateResponse] = Field(None, description="当前已产生的讨论内容")
+    error: Optional[str] = Field(None, description="讨论失败原因")
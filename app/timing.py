@@ -0,0 +1,110 @@
+"""请求耗时分阶段统计（Server-Timing / 调试接口）"""
+
+import re
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+
+def _metric_name(name: str) -> str:
+    """Server-Timing 指标名只允许 token 字符"""
+    return re.sub(r"[^A-Za-z0-9_\-.]", "_", name)
+
+
+class PhaseTimer:
+    """
+    分阶段计时器
+
+    - phase(): 命名阶段（如 image_fetch / judges / db_save_results）
+    - record_judge(): 单个评委的调用耗时
+    - record_turn(): 讨论中每一轮发言的耗时（含选择器耗时）
+    - record_speakers(): 讨论中每位评委的发言占比和模型滚动延迟
+
+    所有耗时单位为毫秒。
+    """
+
+    def __init__(self):
+        self._start = time.perf_counter()
+        self.phases: dict[str, float] = {}
+        self.judges: dict[str, dict[str, float]] = {}
+        self.turns: list[dict] = []
+        self.speakers: dict[str, dict] = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        """统计一个阶段的耗时（同名阶段累加）"""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - t0) * 1000)
+
+    def record(self, name: str, duration_ms: float) -> None:
+        """记录（累加）一个阶段的耗时"""
+        self.phases[name] = round(self.phases.get(name, 0.0) + duration_ms, 2)
+
+    def record_judge(self, stage: str, judge_id: str, duration_ms: float) -> None:
+        """记录某个阶段中单个评委的耗时"""
+        self.judges.setdefault(stage, {})[judge_id] = round(duration_ms, 2)
+
+    def record_turn(
+        self,
+        sequence: int,
+        speaker: str,
+        duration_ms: float,
+        selector_ms: Optional[float] = None,
+    ) -> None:
+        """记录讨论中一轮发言的耗时"""
+        turn = {"sequence": sequence, "speaker": speaker, "duration_ms": round(duration_ms, 2)}
+        if selector_ms is not None:
+            turn["selector_ms"] = round(selector_ms, 2)
+        self.turns.append(turn)
+
+    def record_speakers(self, speakers: dict[str, dict]) -> None:
+        """记录讨论中每位评委的发言数、占比和滚动延迟"""
+        self.speakers = dict(speakers)
+
+    @property
+    def total_ms(self) -> float:
+        return round((time.perf_counter() - self._start) * 1000, 2)
+
+    def to_dict(self) -> dict:
+        """导出为可 JSON 序列化的字典（用于落库和调试接口）"""
+        return {
+            "total_ms": self.total_ms,
+            "phases": dict(self.phases),
+            "judges": {stage: dict(judges) for stage, judges in self.judges.items()},
+            "turns": list(self.turns),
+            "speakers": dict(self.speakers),
+        }
+
+    def server_timing_header(self) -> str:
+        """
+        生成 Server-Timing 响应头
+
+        包含各阶段和各评委的耗时；讨论轮次较多，只汇总在 debate 阶段中。
+        """
+        metrics = [f"{_metric_name(name)};dur={ms}" for name, ms in self.phases.items()]
+        for stage, judges in self.judges.items():
+            for judge_id, ms in judges.items():
+                metrics.append(f"{_metric_name(f'{stage}.{judge_id}')};dur={ms}")
+        metrics.append(f"total;dur={self.total_ms}")
+        return ", ".join(metrics)
+
+
+def merge_timing_dicts(base: Optional[dict], extra: dict) -> dict:
+    """合并两份 to_dict() 导出的耗时数据（后台讨论完成后补充到已保存的耗时中）"""
+    merged = {
+        "total_ms": (base or {}).get("total_ms", 0.0),
+        "phases": dict((base or {}).get("phases", {})),
+        "judges": {stage: dict(j) for stage, j in (base or {}).get("judges", {}).items()},
+        "turns": list((base or {}).get("turns", [])),
+        "speakers": dict((base or {}).get("speakers", {})),
+    }
+    merged["phases"].update(extra.get("phases", {}))
+    for stage, judges in extra.get("judges", {}).items():
+        merged["judges"].setdefault(stage, {}).update(judges)
+    merged["turns"].extend(extra.get("turns", []))
+    merged["speakers"].update(extra.get("speakers", {}))
+    merged["total_ms"] = round(merged["total_ms"] + extra.get("total_ms", 0.0), 2)
+    return merged
@@ -0,0 +1,145 @@
+"""批量插入基准：每个作品保存 5 条评委结果 + 20 条讨论消息，对比逐个 ORM 对象 add 与 Core 多行 INSERT 的吞吐"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from loguru import logger
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
+
+from app.models.database import Base, DebateMessage, DebateSession, JudgeResult
+from app.db.crud import save_debate_session, save_entry, save_judge_results
+from app.db.database import create_write_engine, is_sqlite
+from app.db.writer import DatabaseWriter
+from benchmarks.bench_sqlite_profile import make_judge_results, percentile
+
+
+async def orm_save_judge_results(db: AsyncSession, entry_id: str, judge_results: list[dict]) -> None:
+    """改造前：每条结果一个 ORM 对象，提交时由 unit of work 逐个处理"""
+    for judge_data in judge_results:
+        db.add(JudgeResult(entry_id=entry_id, **{k: v for k, v in judge_data.items() if k != "entry_id"}))
+
+
+async def orm_save_debate_session(db: AsyncSession, entry_id: str, debate_id: str, messages: list[dict]) -> None:
+    """改造前：查询旧会话后删除，会话和每条消息各一个 ORM 对象"""
+    existing = (await db.execute(select(DebateSession).where(DebateSession.debate_id == debate_id))).scalar_one_or_none()
+    if existing:
+        await db.execute(delete(DebateMessage).where(DebateMessage.debate_id == debate_id))
+        await db.delete(existing)
+        await db.flush()
+    db.add(DebateSession(debate_id=debate_id, entry_id=entry_id, participants=[], config={}))
+    for idx, msg in enumerate(messages):
+        db.add(DebateMessage(debate_id=debate_id, sequence=idx + 1, **msg))
+
+
+def make_messages(count: int) -> list[dict]:
+    return [
+        {
+            "speaker": f"judge_{i % 5}",
+            "content": "评" * 200,
+            "context_start": 0,
+            "context_end": i,
+            "raw_response": "想" * 300,
+            "model_name": "gpt-4o",
+            "metrics": {"prompt_tokens": 1200 + i, "completion_tokens": 80},
+        }
+        for i in range(count)
+    ]
+
+
+async def save_bulk(db: AsyncSession, entry_id: str, judges: list[dict], messages: list[dict]) -> None:
+    await save_entry(db, entry_id=entry_id, image_url="u", competition_type="outfit")
+    await save_judge_results(db, entry_id, judges)
+    await save_debate_session(db, entry_id=entry_id, debate_id=f"{entry_id}_debate", participants=[], messages=messages)
+
+
+async def save_orm(db: AsyncSession, entry_id: str, judges: list[dict], messages: list[dict]) -> None:
+    await save_entry(db, entry_id=entry_id, image_url="u", competition_type="outfit")
+    await orm_save_judge_results(db, entry_id, judges)
+    await orm_save_debate_session(db, entry_id, f"{entry_id}_debate", messages)
+
+
+async def bench(label: str, url: str, save, entries: int, concurrency: int, judges: int, messages: int) -> dict:
+    write_engine = create_write_engine(url)
+    writer = DatabaseWriter(
+        async_sessionmaker(write_engine, class_=AsyncSession, expire_on_commit=False), enabled=is_sqlite(url)
+    )
+    async with write_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    judge_rows = make_judge_results("e")[:1] * judges
+    message_rows = make_messages(messages)
+    latencies: list[float] = []
+
+    async def worker(w: int):
+        for i in range(w, entries, concurrency):
+            start = time.perf_counter()
+            await writer.submit(save, f"e{i}", judge_rows, message_rows)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(w) for w in range(concurrency)))
+    seconds = time.perf_counter() - start
+
+    await writer.stop()
+    async with write_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await write_engine.dispose()
+
+    return {
+        "label": label,
+        "entries_per_s": round(entries / seconds, 1),
+        "rows_per_s": round(entries * (1 + judges + 1 + messages) / seconds),
+        "p50_ms": round(percentile(latencies, 0.5), 2),
+        "p99_ms": round(percentile(latencies, 0.99), 2),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=500, help="保存的作品数")
+    parser.add_argument("--concurrency", type=int, default=32, help="并发请求数")
+    parser.add_argument("--judges", type=int, default=5, help="每个作品的评委结果数")
+    parser.add_argument("--messages", type=int, default=20, help="每个作品的讨论消息数")
+    parser.add_argument(
+        "--postgres-url",
+        default=os.environ.get("TEST_POSTGRES_URL"),
+        help="同时测试 PostgreSQL（会清空其中的表，默认读取 TEST_POSTGRES_URL）",
+    )
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    backends = [("sqlite", f"sqlite+aiosqlite:///{path}")]
+    if args.postgres_url:
+        backends.append(("postgresql", args.postgres_url))
+
+    print(f"{'backend':<11} {'mode':<5} {'entries/s':>10} {'rows/s':>8} {'p50_ms':>8} {'p99_ms':>8}")
+    try:
+        for backend, url in backends:
+            for label, save in (("orm", save_orm), ("bulk", save_bulk)):
+                r = await bench(label, url, save, args.entries, args.concurrency, args.judges, args.messages)
+                print(
+                    f"{backend:<11} {r['label']:<5} {r['entries_per_s']:>10} {r['rows_per_s']:>8} "
+                    f"{r['p50_ms']:>8} {r['p99_ms']:>8}"
+                )
+    finally:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,124 @@
+"""讨论发言清洗基准：对比原先内联在讨论循环中的清洗逻辑与 app.judges.cleaner 的耗时"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from loguru import logger
+
+from app.judges.cleaner import clean_debate_message
+
+CORPUS_PATH = Path(__file__).parent.parent / "tests" / "data" / "thinking_chain_samples.json"
+
+
+def load_corpus(path: Path = CORPUS_PATH) -> list[dict]:
+    """加载记录下来的评委原始发言样本"""
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def legacy_clean(content: str) -> str:
+    """原先 stage_two.py 讨论循环中的清洗逻辑（每条消息重新定义嵌套函数、现编译正则）"""
+    content = re.sub(r'<thinking>.*?</thinking>', '', content, flags=re.DOTALL)
+
+    def extract_final_response(text: str) -> str:
+        final_markers = [
+            r"所以最终发言应该是[：:]\s*",
+            r"所以组合起来[：:]\s*",
+            r"最终发言[：:]\s*",
+            r"最终[：:]\s*",
+        ]
+        for marker in final_markers:
+            matches = list(re.finditer(marker, text))
+            if matches:
+                last_match = matches[-1]
+                return text[last_match.end():].strip()
+
+        draft_markers = [
+            r"比如[：:]\s*",
+            r"或者[：:]\s*",
+            r"或者更符合人设[：:]\s*",
+        ]
+        last_draft_pos = -1
+        for marker in draft_markers:
+            matches = list(re.finditer(marker, text))
+            if matches:
+                pos = matches[-1].end()
+                if pos > last_draft_pos:
+                    last_draft_pos = pos
+        if last_draft_pos != -1:
+            return text[last_draft_pos:].strip()
+        return text
+
+    extracted_content = extract_final_response(content)
+
+    def is_thinking_block(text_block: str) -> bool:
+        keywords = ["人设", "扮演", "口头禅", "首先", "然后", "用户", "需要我", "对话", "观点", "反驳", "支持", "要注意", "比如", "或者"]
+        hit_count = 0
+        for kw in keywords:
+            if kw in text_block:
+                hit_count += 1
+        if (text_block.startswith("我") or text_block.startswith("用户")) and ("扮演" in text_block or "人设" in text_block):
+            return True
+        if hit_count >= 3:
+            return True
+        return False
+
+    lines = extracted_content.split('\n')
+    cleaned_lines = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if not is_thinking_block(line):
+            cleaned_lines.append(line)
+
+    return '\n'.join(cleaned_lines).strip()
+
+
+def bench(label: str, clean, texts: list[str], rounds: int) -> dict:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for text in texts:
+            clean(text)
+    seconds = time.perf_counter() - start
+    calls = rounds * len(texts)
+    return {
+        "label": label,
+        "calls": calls,
+        "us_per_message": round(seconds / calls * 1e6, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=2000, help="语料重复轮数")
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    texts = [sample["raw"] for sample in load_corpus()]
+
+    mismatched = [t[:30] for t in texts if legacy_clean(t) != clean_debate_message(t)]
+    if mismatched:
+        print(f"警告: {len(mismatched)} 条样本清洗结果与旧逻辑不一致: {mismatched}")
+
+    results = [
+        bench("legacy", legacy_clean, texts, args.rounds),
+        bench("cleaner", clean_debate_message, texts, args.rounds),
+    ]
+
+    print(f"语料: {len(texts)} 条样本 x {args.rounds} 轮")
+    print(f"{'cleaner':<10} {'calls':>10} {'us/msg':>10}")
+    for r in results:
+        print(f"{r['label']:<10} {r['calls']:>10} {r['us_per_message']:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""数据库后端基准：同一读写混合负载下，对比 SQLite（写入队列）与 PostgreSQL（连接池直接提交）的写入吞吐和耗时"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
+
+from app.models.database import Base
+from app.db.crud import get_entry_by_id
+from app.db.database import create_read_engine, create_write_engine, is_sqlite
+from app.db.writer import DatabaseWriter
+from benchmarks.bench_db_writer import request_writes
+from benchmarks.bench_sqlite_profile import percentile
+
+
+async def bench(label: str, url: str, writers: int, requests: int, messages: int, readers: int) -> dict:
+    # 与 app.db.database 相同的组合：SQLite 读写分离 + 写入队列，其他数据库共用连接池、直接提交
+    read_engine = create_read_engine(url)
+    write_engine = create_write_engine(url) if is_sqlite(url) else read_engine
+    writer = DatabaseWriter(
+        async_sessionmaker(write_engine, class_=AsyncSession, expire_on_commit=False), enabled=is_sqlite(url)
+    )
+    async with write_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    read_sessions = async_sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False)
+
+    latencies: list[float] = []
+    reads = 0
+    done = asyncio.Event()
+
+    async def write_worker(w: int):
+        for r in range(requests):
+            for operation, kwargs in request_writes(f"e{w}_{r}", messages):
+                start = time.perf_counter()
+                await writer.submit(operation, **kwargs)
+                latencies.append((time.perf_counter() - start) * 1000)
+
+    async def read_worker(r: int):
+        nonlocal reads
+        while not done.is_set():
+            async with read_sessions() as db:
+                await get_entry_by_id(db, f"e{r % writers}_0")
+            reads += 1
+            await asyncio.sleep(0)
+
+    read_tasks = [asyncio.create_task(read_worker(r)) for r in range(readers)]
+    start = time.perf_counter()
+    await asyncio.gather(*(write_worker(w) for w in range(writers)))
+    seconds = time.perf_counter() - start
+    done.set()
+    await asyncio.gather(*read_tasks)
+
+    await writer.stop()
+    async with write_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await read_engine.dispose()
+    if write_engine is not read_engine:
+        await write_engine.dispose()
+
+    return {
+        "label": label,
+        "writes_per_s": round(len(latencies) / seconds, 1),
+        "p50_ms": round(percentile(latencies, 0.5), 2),
+        "p99_ms": round(percentile(latencies, 0.99), 2),
+        "reads_per_s": round(reads / seconds, 1),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--postgres-url",
+        default=os.environ.get("TEST_POSTGRES_URL"),
+        help="PostgreSQL 连接串（postgresql+asyncpg://...，会清空其中的表，默认读取 TEST_POSTGRES_URL；不提供时只测 SQLite）",
+    )
+    parser.add_argument("--writers", type=int, default=16, help="并发评分请求数")
+    parser.add_argument("--requests", type=int, default=10, help="每个并发请求依次处理的作品数")
+    parser.add_argument("--messages", type=int, default=12, help="每个作品的讨论发言数")
+    parser.add_argument("--readers", type=int, default=8, help="并发查询请求数")
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    backends = [("sqlite", f"sqlite+aiosqlite:///{path}")]
+    if args.postgres_url:
+        backends.append(("postgresql", args.postgres_url))
+
+    print(f"{'backend':<11} {'writes/s':>9} {'p50_ms':>8} {'p99_ms':>8} {'reads/s':>9}")
+    try:
+        for label, url in backends:
+            r = await bench(label, url, args.writers, args.requests, args.messages, args.readers)
+            print(f"{r['label']:<11} {r['writes_per_s']:>9} {r['p50_ms']:>8} {r['p99_ms']:>8} {r['reads_per_s']:>9}")
+    finally:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
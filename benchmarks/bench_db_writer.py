@@ -0,0 +1,145 @@
+"""写入队列基准：读写混合负载下，对比各请求直接提交与单写者队列（group commit + 只读连接池）的写入耗时"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from loguru import logger
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from app.models.database import Base
+from app.db.crud import append_debate_message, get_entry_by_id, open_debate_session, save_entry, save_judge_results
+from app.db.database import create_read_engine, create_write_engine
+from app.db.sqlite_profile import install_sqlite_profile
+from app.db.writer import DatabaseWriter
+from benchmarks.bench_sqlite_profile import make_judge_results, percentile
+
+
+def request_writes(entry_id: str, messages: int) -> list[tuple]:
+    """一次评分请求的写操作：作品、评委结果、讨论会话和逐条发言"""
+    writes = [
+        (save_entry, {"entry_id": entry_id, "image_url": "u", "competition_type": "outfit"}),
+        (save_judge_results, {"entry_id": entry_id, "judge_results": make_judge_results(entry_id)}),
+        (open_debate_session, {"entry_id": entry_id, "debate_id": f"{entry_id}_debate"}),
+    ]
+    for i in range(messages):
+        msg = {"speaker": f"judge_{i % 5}", "content": "评" * 120, "context_start": 0, "context_end": i}
+        writes.append((append_debate_message, {"debate_id": f"{entry_id}_debate", "sequence": i + 1, "msg_data": msg}))
+    return writes
+
+
+async def bench(mode: str, writers: int, requests: int, messages: int, readers: int) -> dict:
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    url = f"sqlite+aiosqlite:///{path}"
+
+    if mode == "direct":
+        # 改造前：读写共用一个连接池，每个写操作在请求自己的会话中提交
+        read_engine = write_engine = create_async_engine(url)
+        install_sqlite_profile(write_engine)
+        session_factory = async_sessionmaker(write_engine, class_=AsyncSession, expire_on_commit=False)
+
+        async def submit(operation, **kwargs):
+            async with session_factory() as db:
+                result = await operation(db, **kwargs)
+                await db.commit()
+                return result
+
+        writer = None
+    else:
+        read_engine = create_read_engine(url)
+        write_engine = create_write_engine(url)
+        writer = DatabaseWriter(
+            async_sessionmaker(write_engine, class_=AsyncSession, expire_on_commit=False), enabled=True
+        )
+        submit = writer.submit
+
+    async with write_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    read_sessions = async_sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False)
+
+    latencies: list[float] = []
+    locked = 0
+    reads = 0
+    done = asyncio.Event()
+
+    async def write_worker(w: int):
+        nonlocal locked
+        for r in range(requests):
+            for operation, kwargs in request_writes(f"e{w}_{r}", messages):
+                start = time.perf_counter()
+                try:
+                    await submit(operation, **kwargs)
+                except OperationalError as e:
+                    if "locked" not in str(e):
+                        raise
+                    locked += 1
+                    continue
+                latencies.append((time.perf_counter() - start) * 1000)
+
+    async def read_worker(r: int):
+        nonlocal reads
+        while not done.is_set():
+            async with read_sessions() as db:
+                await get_entry_by_id(db, f"e{r % writers}_0")
+            reads += 1
+            await asyncio.sleep(0)
+
+    read_tasks = [asyncio.create_task(read_worker(r)) for r in range(readers)]
+    start = time.perf_counter()
+    await asyncio.gather(*(write_worker(w) for w in range(writers)))
+    seconds = time.perf_counter() - start
+    done.set()
+    await asyncio.gather(*read_tasks)
+
+    writer_stats = {}
+    if writer:
+        writer_stats = writer.stats()
+        await writer.stop()
+    await read_engine.dispose()
+    await write_engine.dispose()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+    return {
+        "label": mode,
+        "writes_per_s": round(len(latencies) / seconds, 1),
+        "p50_ms": round(percentile(latencies, 0.5), 2),
+        "p99_ms": round(percentile(latencies, 0.99), 2),
+        "locked": locked,
+        "reads_per_s": round(reads / seconds, 1),
+        "avg_batch": writer_stats.get("avg_batch_size", 1.0),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--writers", type=int, default=16, help="并发评分请求数")
+    parser.add_argument("--requests", type=int, default=10, help="每个并发请求依次处理的作品数")
+    parser.add_argument("--messages", type=int, default=12, help="每个作品的讨论发言数")
+    parser.add_argument("--readers", type=int, default=8, help="并发查询请求数")
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    print(f"{'mode':<8} {'writes/s':>9} {'p50_ms':>8} {'p99_ms':>8} {'locked':>7} {'reads/s':>9} {'avg_batch':>10}")
+    for mode in ("direct", "writer"):
+        r = await bench(mode, args.writers, args.requests, args.messages, args.readers)
+        print(
+            f"{r['label']:<8} {r['writes_per_s']:>9} {r['p50_ms']:>8} {r['p99_ms']:>8} "
+            f"{r['locked']:>7} {r['reads_per_s']:>9} {r['avg_batch']:>10}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
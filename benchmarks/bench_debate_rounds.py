@@ -0,0 +1,70 @@
+"""讨论模式基准：对比逐轮发言（sequential）与并行轮次（parallel）的讨论耗时"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from loguru import logger
+
+from benchmarks.fake_clients import install_fake_clients
+from benchmarks.bench_speaker_selector import make_judge_results
+from app.config import get_settings
+from app.judges.stage_two import run_debate_for_entry
+
+
+async def bench(debate_mode: str, selector_mode: str, round_size: int, runs: int, max_messages: int) -> dict:
+    settings = get_settings()
+    settings.debate_selector_mode = selector_mode
+    settings.debate_round_size = round_size
+    settings.debate_convergence_enabled = False  # 模拟发言高度重复，关闭收敛检测以跑满消息数
+
+    turns = 0
+    start = time.perf_counter()
+    for i in range(runs):
+        result = await run_debate_for_entry(
+            entry_id=f"bench_{debate_mode}_{i}",
+            competition_type="outfit",
+            judge_results=make_judge_results(),
+            max_messages=max_messages,
+            debate_mode=debate_mode,
+        )
+        turns += len(result["messages"])
+    elapsed = time.perf_counter() - start
+    return {
+        "label": f"{debate_mode}/{selector_mode}" + (f"/x{round_size}" if debate_mode == "parallel" else ""),
+        "turns": turns,
+        "seconds": round(elapsed, 2),
+        "seconds_per_debate": round(elapsed / runs, 2),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=3, help="每种配置运行的讨论次数")
+    parser.add_argument("--max-messages", type=int, default=20, help="每场讨论的最大消息数")
+    parser.add_argument("--judge-latency", type=float, default=0.3, help="模拟评委模型延迟（秒）")
+    parser.add_argument("--selector-latency", type=float, default=0.3, help="模拟选择器模型延迟（秒）")
+    parser.add_argument("--round-sizes", nargs="+", type=int, default=[2, 3, 5])
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    install_fake_clients(args.judge_latency, args.selector_latency)
+
+    configs = [("sequential", "llm", 1), ("sequential", "local", 1)]
+    configs += [("parallel", "local", size) for size in args.round_sizes]
+    results = [await bench(*config, args.runs, args.max_messages) for config in configs]
+
+    print(f"{'config':<22} {'turns':>6} {'seconds':>8} {'s/debate':>9}")
+    for r in results:
+        print(f"{r['label']:<22} {r['turns']:>6} {r['seconds']:>8} {r['seconds_per_debate']:>9}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,109 @@
+"""讨论记录存储基准：对比每条消息保存完整上下文拷贝与只保存序号范围的存储体积和写入耗时"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from app.models.database import Base
+from app.db.crud import save_entry, save_debate_session, get_entry_by_id
+from app.db.transcript import build_transcript, message_context
+
+
+def make_messages(count: int, content_chars: int, full_copy: bool) -> tuple[str, list[dict]]:
+    """构造一场讨论的消息（full_copy=True 为旧格式：每条消息保存完整上下文拷贝）"""
+    initial = "【本轮参赛作品信息】" + "摘" * 800
+    history = [{"source": "user", "content": initial}]
+    messages = []
+    for i in range(count):
+        content = f"第 {i + 1} 条发言：" + "评" * content_chars
+        msg = {"speaker": f"judge_{i % 5}", "content": content, "raw_response": content}
+        if full_copy:
+            msg["context_history"] = list(history)
+        else:
+            msg["context_start"] = 0
+            msg["context_end"] = len(history) - 1
+        messages.append(msg)
+        history.append({"source": msg["speaker"], "content": content})
+    return initial, messages
+
+
+async def bench(label: str, full_copy: bool, debates: int, count: int, content_chars: int) -> dict:
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    write_seconds = 0.0
+    for d in range(debates):
+        initial, messages = make_messages(count, content_chars, full_copy)
+        async with session_factory() as db:
+            await save_entry(db, entry_id=f"e{d}", image_url="u", competition_type="outfit")
+            await db.commit()
+            start = time.perf_counter()
+            await save_debate_session(
+                db,
+                entry_id=f"e{d}",
+                debate_id=f"e{d}_debate",
+                participants=[],
+                messages=messages,
+                initial_message=initial,
+            )
+            await db.commit()
+            write_seconds += time.perf_counter() - start
+
+    # 读取并还原每条消息的上下文（调试接口的工作量）
+    start = time.perf_counter()
+    async with session_factory() as db:
+        for d in range(debates):
+            entry = await get_entry_by_id(db, f"e{d}")
+            session = entry.debate_sessions[0]
+            transcript = build_transcript(session.initial_message, session.messages)
+            for msg in session.messages:
+                message_context(transcript, msg)
+    read_seconds = time.perf_counter() - start
+
+    await engine.dispose()
+    size = os.path.getsize(path)
+    os.remove(path)
+    return {
+        "label": label,
+        "size_kb": round(size / 1024, 1),
+        "write_ms_per_debate": round(write_seconds / debates * 1000, 2),
+        "read_ms_per_debate": round(read_seconds / debates * 1000, 2),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--debates", type=int, default=20, help="讨论场数")
+    parser.add_argument("--messages", type=int, default=20, help="每场讨论的消息数")
+    parser.add_argument("--content-chars", type=int, default=120, help="每条发言的字数")
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    results = [
+        await bench("full_copy", True, args.debates, args.messages, args.content_chars),
+        await bench("range", False, args.debates, args.messages, args.content_chars),
+    ]
+
+    print(f"{'storage':<10} {'size_kb':>10} {'write_ms':>10} {'read_ms':>10}")
+    for r in results:
+        print(f"{r['label']:<10} {r['size_kb']:>10} {r['write_ms_per_debate']:>10} {r['read_ms_per_debate']:>10}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
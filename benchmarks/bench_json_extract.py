@@ -0,0 +1,118 @@
+"""JSON 提取基准：对比原先的多级正则提取与 app.judges.json_extract 的单次扫描（正确率和耗时）"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from loguru import logger
+
+from app.judges.json_extract import extract_json_object
+from tests.judge_output_fuzz import make_fuzz_corpus
+
+
+def legacy_parse_json_from_response(content: str):
+    """原先 utils.parse_json_from_response 的实现"""
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError:
+        pass
+    match = re.search(r"```(?:json)?\s*(\{.*?\})\s*```", content, re.DOTALL)
+    if match:
+        try:
+            return json.loads(match.group(1))
+        except json.JSONDecodeError:
+            pass
+    json_pattern = r"\{(?:[^{}]|(?:\{(?:[^{}]|(?:\{[^{}]*\}))*\}))*\}"
+    match = re.search(json_pattern, content, re.DOTALL)
+    if match:
+        try:
+            return json.loads(match.group(0))
+        except json.JSONDecodeError:
+            pass
+    return None
+
+
+def legacy_parse_judge_json(raw_response: str):
+    """原先 prompts.parse_judge_response 中提取 JSON 的部分"""
+    try:
+        return json.loads(raw_response)
+    except json.JSONDecodeError:
+        match = re.search(r"```json\s*(\{[\s\S]*?\})\s*```", raw_response)
+        if match:
+            json_str = match.group(1)
+        else:
+            match = re.search(r"(\{[\s\S]*\})", raw_response)
+            if not match:
+                return None
+            json_str = match.group(1)
+        try:
+            return json.loads(json_str)
+        except json.JSONDecodeError:
+            return None
+
+
+def new_parse_judge_json(raw_response: str):
+    return extract_json_object(raw_response, required_keys=("overall_score",))
+
+
+def adversarial_inputs(size: int) -> list[tuple[str, dict]]:
+    """长输出：大量落单的 { 和引号，JSON 在最后"""
+    data = {"overall_score": 6.5, "one_liner": "还行"}
+    payload = json.dumps(data, ensure_ascii=False)
+    return [
+        ("我想想 {" * (size // 5) + payload, data),
+        ('他说 "{还行' * (size // 6) + "\n" + payload, data),
+        ("{a" * (size // 2) + "\n" + payload, data),
+    ]
+
+
+def bench(label: str, parse, corpus: list[tuple[str, dict]], rounds: int) -> dict:
+    correct = sum(1 for raw, expected in corpus if parse(raw) == expected)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for raw, _ in corpus:
+            parse(raw)
+    seconds = time.perf_counter() - start
+    return {
+        "label": label,
+        "accuracy": round(correct / len(corpus), 3),
+        "us_per_output": round(seconds / (rounds * len(corpus)) * 1e6, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=500, help="模糊语料条数")
+    parser.add_argument("--rounds", type=int, default=5, help="语料重复轮数")
+    parser.add_argument("--adversarial-chars", type=int, default=20000, help="对抗输入的长度（字符）")
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    corpora = {
+        "fuzz": make_fuzz_corpus(args.size),
+        "adversarial": adversarial_inputs(args.adversarial_chars),
+    }
+    parsers = [
+        ("legacy_judge", legacy_parse_judge_json),
+        ("legacy_utils", legacy_parse_json_from_response),
+        ("json_extract", new_parse_judge_json),
+    ]
+
+    print(f"{'corpus':<12} {'parser':<14} {'accuracy':>9} {'us/output':>12}")
+    for name, corpus in corpora.items():
+        rounds = args.rounds if name == "fuzz" else 1
+        for label, parse in parsers:
+            r = bench(label, parse, corpus, rounds)
+            print(f"{name:<12} {r['label']:<14} {r['accuracy']:>9} {r['us_per_output']:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""延迟感知发言人选择基准：个别评委模型较慢时，对比开启 / 关闭延迟感知的讨论耗时和发言占比"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from loguru import logger
+
+from benchmarks.fake_clients import JUDGE_NAMES, install_fake_clients
+from benchmarks.bench_speaker_selector import make_judge_results
+from app.config import get_settings
+from app.judges.stage_two import run_debate_for_entry
+
+
+def parse_latencies(items: list[str]) -> dict[str, float]:
+    """解析 Doubao=1.2 形式的评委延迟覆盖"""
+    latencies = {}
+    for item in items:
+        name, _, value = item.partition("=")
+        latencies[name] = float(value)
+    return latencies
+
+
+async def bench(debate_mode: str, latency_aware: bool, runs: int, max_messages: int) -> dict:
+    settings = get_settings()
+    settings.debate_latency_aware = latency_aware
+
+    turns: dict[str, int] = {name: 0 for name in JUDGE_NAMES}
+    start = time.perf_counter()
+    for i in range(runs):
+        result = await run_debate_for_entry(
+            entry_id=f"bench_latency_{debate_mode}_{i}",
+            competition_type="outfit",
+            judge_results=make_judge_results(),
+            max_messages=max_messages,
+            debate_mode=debate_mode,
+        )
+        for message in result["messages"]:
+            turns[message["speaker"]] += 1
+    elapsed = time.perf_counter() - start
+
+    total = sum(turns.values()) or 1
+    return {
+        "label": f"{debate_mode}/{'latency' if latency_aware else 'plain'}",
+        "seconds_per_debate": round(elapsed / runs, 2),
+        "share": {name: round(count / total, 2) for name, count in turns.items()},
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=3, help="每种配置运行的讨论次数")
+    parser.add_argument("--max-messages", type=int, default=20, help="每场讨论的最大消息数")
+    parser.add_argument("--judge-latency", type=float, default=0.3, help="模拟评委模型延迟（秒）")
+    parser.add_argument(
+        "--slow", nargs="*", default=["Doubao=1.2", "Gemini=0.9"], help="个别评委的模拟延迟，如 Doubao=1.2",
+    )
+    parser.add_argument("--round-size", type=int, default=3, help="并行模式每轮发言的评委数")
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    install_fake_clients(args.judge_latency, 0.0, judge_latencies=parse_latencies(args.slow))
+    settings = get_settings()
+    settings.debate_selector_mode = "local"
+    settings.debate_round_size = args.round_size
+    settings.debate_convergence_enabled = False  # 模拟发言高度重复，关闭收敛检测以跑满消息数
+
+    # 预热一场，让滚动延迟有数据（线上由此前的请求积累）
+    await bench("sequential", False, 1, args.max_messages)
+
+    results = [
+        await bench(mode, aware, args.runs, args.max_messages)
+        for mode in ("sequential", "parallel")
+        for aware in (False, True)
+    ]
+
+    print(f"{'config':<20} {'s/debate':>9}  " + " ".join(f"{name:>8}" for name in JUDGE_NAMES))
+    for r in results:
+        shares = " ".join(f"{r['share'][name]:>8}" for name in JUDGE_NAMES)
+        print(f"{r['label']:<20} {r['seconds_per_debate']:>9}  {shares}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
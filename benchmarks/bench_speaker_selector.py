@@ -0,0 +1,87 @@
+"""发言人选择模式基准：对比 llm / local / hybrid 三种模式的讨论速度（每分钟轮数）"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from loguru import logger
+
+from benchmarks.fake_clients import JUDGE_NAMES, install_fake_clients
+from app.config import get_settings
+from app.judges.stage_two import run_debate_for_entry
+
+
+def make_judge_results() -> list[dict]:
+    """构造阶段一结果（分数拉开差距，便于触发冲突规则）"""
+    scores = [9.0, 2.5, 7.0, 4.0, 6.0]
+    return [
+        {
+            "judge_id": name,
+            "judge_display_name": name,
+            "overall_score": score,
+            "one_liner": f"{name} 的观点",
+        }
+        for name, score in zip(JUDGE_NAMES, scores)
+    ]
+
+
+async def bench_mode(mode: str, runs: int, max_messages: int, clients: dict) -> dict:
+    settings = get_settings()
+    settings.debate_selector_mode = mode
+    for client in clients.values():
+        client.calls = 0
+
+    turns = 0
+    start = time.perf_counter()
+    for i in range(runs):
+        result = await run_debate_for_entry(
+            entry_id=f"bench_{mode}_{i}",
+            competition_type="outfit",
+            judge_results=make_judge_results(),
+            max_messages=max_messages,
+        )
+        turns += len(result["messages"])
+    elapsed = time.perf_counter() - start
+
+    selector_calls = sum(c.calls for c in clients.values() if c.kind == "selector")
+    return {
+        "mode": mode,
+        "turns": turns,
+        "seconds": round(elapsed, 2),
+        "turns_per_minute": round(turns / elapsed * 60, 1),
+        "selector_calls": selector_calls,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=3, help="每种模式运行的讨论次数")
+    parser.add_argument("--max-messages", type=int, default=20, help="每场讨论的最大消息数")
+    parser.add_argument("--judge-latency", type=float, default=0.3, help="模拟评委模型延迟（秒）")
+    parser.add_argument("--selector-latency", type=float, default=0.3, help="模拟选择器模型延迟（秒）")
+    parser.add_argument("--modes", nargs="+", default=["llm", "local", "hybrid"])
+    args = parser.parse_args()
+
+    # 基准只关注结果，屏蔽讨论过程日志
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    clients = install_fake_clients(args.judge_latency, args.selector_latency)
+
+    results = [await bench_mode(mode, args.runs, args.max_messages, clients) for mode in args.modes]
+
+    print(f"{'mode':<8} {'turns':>6} {'seconds':>8} {'turns/min':>10} {'selector_calls':>15}")
+    for r in results:
+        print(
+            f"{r['mode']:<8} {r['turns']:>6} {r['seconds']:>8} "
+            f"{r['turns_per_minute']:>10} {r['selector_calls']:>15}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
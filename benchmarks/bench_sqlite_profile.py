@@ -0,0 +1,143 @@
+"""SQLite 写并发基准：多个请求同时保存作品和评委结果（并有读请求）时，对比各连接配置的写入耗时和锁冲突"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from loguru import logger
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from app.models.database import Base
+from app.db.crud import save_entry, save_judge_results, get_entry_by_id
+from app.db.sqlite_profile import (
+    PROFILE_DEFAULT,
+    PROFILE_PRODUCTION,
+    SQLiteProfile,
+    install_sqlite_profile,
+    resolve_sqlite_profile,
+)
+
+
+def make_judge_results(entry_id: str) -> list[dict]:
+    return [
+        {
+            "judge_id": f"judge_{i}",
+            "judge_display_name": f"评委 {i}",
+            "competition_type": "outfit",
+            "overall_score": 7.5,
+            "strengths": ["配色大胆"] * 3,
+            "one_liner": "还行",
+            "raw_output": "<inner_monologue>" + "想" * 800 + "</inner_monologue>",
+            "system_message": "人设" * 500,
+        }
+        for i in range(5)
+    ]
+
+
+def percentile(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] if values else 0.0
+
+
+async def bench(profile: SQLiteProfile, writers: int, requests: int, readers: int) -> dict:
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    install_sqlite_profile(engine, profile)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    latencies: list[float] = []
+    locked = 0
+    reads = 0
+    done = asyncio.Event()
+
+    async def writer(w: int):
+        nonlocal locked
+        for r in range(requests):
+            entry_id = f"e{w}_{r}"
+            start = time.perf_counter()
+            try:
+                # 每个请求各自提交：作品和评委结果各提交一次
+                async with session_factory() as db:
+                    await save_entry(db, entry_id=entry_id, image_url="u", competition_type="outfit")
+                    await db.commit()
+                    await save_judge_results(db, entry_id, make_judge_results(entry_id))
+                    await db.commit()
+            except OperationalError as e:
+                if "locked" not in str(e):
+                    raise
+                locked += 1
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    async def reader(r: int):
+        nonlocal reads
+        while not done.is_set():
+            try:
+                async with session_factory() as db:
+                    await get_entry_by_id(db, f"e{r % writers}_0")
+                reads += 1
+            except OperationalError:
+                pass
+            await asyncio.sleep(0)
+
+    reader_tasks = [asyncio.create_task(reader(r)) for r in range(readers)]
+    start = time.perf_counter()
+    await asyncio.gather(*(writer(w) for w in range(writers)))
+    seconds = time.perf_counter() - start
+    done.set()
+    await asyncio.gather(*reader_tasks)
+
+    await engine.dispose()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+    return {
+        "label": profile.name,
+        "writes_per_s": round(len(latencies) / seconds, 1),
+        "p50_ms": round(percentile(latencies, 0.5), 1),
+        "p99_ms": round(percentile(latencies, 0.99), 1),
+        "locked": locked,
+        "reads_per_s": round(reads / seconds, 1),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--writers", type=int, default=16, help="并发写请求数")
+    parser.add_argument("--requests", type=int, default=20, help="每个写请求保存的作品数")
+    parser.add_argument("--readers", type=int, default=4, help="并发读请求数")
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    profiles = [
+        resolve_sqlite_profile(PROFILE_DEFAULT),
+        # 只开 WAL，其余保持默认，单独看 WAL 的效果
+        SQLiteProfile("wal_only", journal_mode="WAL"),
+        resolve_sqlite_profile(PROFILE_PRODUCTION),
+    ]
+
+    print(f"{'profile':<12} {'writes/s':>9} {'p50_ms':>8} {'p99_ms':>8} {'locked':>7} {'reads/s':>9}")
+    for profile in profiles:
+        r = await bench(profile, args.writers, args.requests, args.readers)
+        print(
+            f"{r['label']:<12} {r['writes_per_s']:>9} {r['p50_ms']:>8} {r['p99_ms']:>8} "
+            f"{r['locked']:>7} {r['reads_per_s']:>9}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,77 @@
+"""阶段一流式解析基准：对比整条输出解析与逐 token 增量解析时，选择到达和多数判定的时间"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from loguru import logger
+
+from benchmarks.fake_clients import install_fake_clients
+from benchmarks.bench_latency_aware import parse_latencies
+from app.config import get_settings
+from app.judges.binary_choice_stage_one import binary_choice_with_all_judges
+from app.timing import PhaseTimer
+
+
+async def bench(streaming: bool, runs: int) -> dict:
+    get_settings().stage_one_streaming = streaming
+
+    first_choice, decision, total = [], [], []
+    for i in range(runs):
+        start = time.perf_counter()
+        events: list[tuple[float, str, dict]] = []
+
+        async def on_progress(event: str, data: dict):
+            events.append(((time.perf_counter() - start) * 1000, event, data))
+
+        timer = PhaseTimer()
+        await binary_choice_with_all_judges(
+            question="哪件更好看？",
+            option_a="红色外套",
+            option_b="蓝色外套",
+            entry_id=f"bench_stream_{i}",
+            text_content="两件外套的文字描述",
+            timer=timer,
+            on_progress=on_progress,
+        )
+        total.append((time.perf_counter() - start) * 1000)
+        first_choice.append(next(t for t, e, d in events if e == "field" and d["field"] == "choice"))
+        decision.append(next((t for t, e, _ in events if e == "decision"), total[-1]))
+
+    return {
+        "label": "streaming" if streaming else "full",
+        "first_choice_ms": round(statistics.mean(first_choice)),
+        "decision_ms": round(statistics.mean(decision)),
+        "total_ms": round(statistics.mean(total)),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=3, help="每种模式运行次数")
+    parser.add_argument("--judge-latency", type=float, default=1.0, help="模拟评委整条输出的耗时（秒）")
+    parser.add_argument(
+        "--slow", nargs="*", default=["Doubao=2.5", "Gemini=1.8"], help="个别评委的模拟延迟，如 Doubao=2.5",
+    )
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    install_fake_clients(args.judge_latency, 0.0, judge_latencies=parse_latencies(args.slow))
+
+    results = [await bench(streaming, args.runs) for streaming in (False, True)]
+
+    print(f"{'mode':<10} {'first_choice_ms':>16} {'decision_ms':>12} {'total_ms':>9}")
+    for r in results:
+        print(f"{r['label']:<10} {r['first_choice_ms']:>16} {r['decision_ms']:>12} {r['total_ms']:>9}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,100 @@
+"""结构化输出基准：对比自由格式（XML + JSON 正则提取）与结构化输出（Schema 校验）的解析耗时和解析失败率"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from loguru import logger
+
+from benchmarks.fake_clients import install_fake_clients
+from app.config import get_settings
+from app.judges.binary_choice_stage_one import binary_choice_with_all_judges
+from app.judges.prompts import parse_judge_response
+from app.judges.structured_output import (
+    SCHEMA_SCORING,
+    parse_structured_output,
+    reset_structured_output_stats,
+    structured_output_stats,
+)
+from tests.judge_output_fuzz import make_fuzz_corpus
+
+
+def bench_parse(size: int, rounds: int) -> list[dict]:
+    """同样的评分内容，分别以自由格式和结构化输出的形式解析"""
+    corpus = make_fuzz_corpus(size)
+    structured = [
+        json.dumps({
+            "inner_monologue": "这套衣服配色有点怪",
+            "overall_score": data["overall_score"],
+            "one_liner": data["one_liner"],
+            "strengths": [d["comment"] for d in data["dimension_scores"]],
+            "weaknesses": [],
+        }, ensure_ascii=False)
+        for _, data in corpus
+    ]
+    cases = [
+        ("freeform", [raw for raw, _ in corpus], parse_judge_response),
+        ("structured", structured, lambda raw: parse_structured_output(SCHEMA_SCORING, raw)),
+    ]
+
+    results = []
+    for label, outputs, parse in cases:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for raw in outputs:
+                parse(raw)
+        seconds = time.perf_counter() - start
+        results.append({"label": label, "us_per_output": round(seconds / (rounds * len(outputs)) * 1e6, 1)})
+    return results
+
+
+async def bench_pipeline(runs: int) -> dict:
+    """用模拟客户端跑二选一阶段一，汇总两种模式的调用统计"""
+    reset_structured_output_stats()
+    for structured in (False, True):
+        get_settings().stage_one_structured_output = structured
+        for i in range(runs):
+            await binary_choice_with_all_judges(
+                question="哪件更好看？",
+                option_a="红色外套",
+                option_b="蓝色外套",
+                entry_id=f"bench_structured_{i}",
+                text_content="两件外套的文字描述",
+            )
+    return structured_output_stats()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=500, help="解析语料条数")
+    parser.add_argument("--rounds", type=int, default=5, help="语料重复轮数")
+    parser.add_argument("--runs", type=int, default=2, help="每种模式运行的阶段一次数")
+    parser.add_argument("--judge-latency", type=float, default=0.2, help="模拟评委模型延迟（秒）")
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="ERROR")  # 自由格式语料中部分输出没有独白标签，会产生大量告警
+
+    print(f"{'mode':<12} {'us/output':>10}")
+    for r in bench_parse(args.size, args.rounds):
+        print(f"{r['label']:<12} {r['us_per_output']:>10}")
+
+    install_fake_clients(args.judge_latency, 0.0)
+    stats = await bench_pipeline(args.runs)
+    print()
+    print(f"{'model':<24} {'mode':<12} {'calls':>6} {'failure_rate':>13} {'avg_ms':>8}")
+    for model, modes in stats.items():
+        for mode in ("freeform", "structured"):
+            if mode in modes:
+                m = modes[mode]
+                print(f"{model:<24} {mode:<12} {m['calls']:>6} {m['parse_failure_rate']:>13} {m['avg_latency_ms']:>8}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,158 @@
+"""基准测试用的模拟模型客户端（不访问网关，用固定延迟模拟模型耗时）"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+from typing import Optional
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from autogen_core.models import CreateResult, RequestUsage
+from autogen_ext.models.replay import ReplayChatCompletionClient
+
+JUDGE_NAMES = ["ChatGPT", "Grok", "Gemini", "Doubao", "Qwen"]
+STREAM_CHUNK_CHARS = 4  # 流式输出每块的字符数
+_STRENGTHS_JSON = json.dumps(["配色大胆，剪裁利落"] * 8, ensure_ascii=False)  # 字段之后较长的尾部
+
+MODEL_INFO = {
+    "vision": True,
+    "function_calling": False,
+    "json_output": True,
+    "family": "unknown",
+    "structured_output": True,
+}
+
+
+class FakeChatClient(ReplayChatCompletionClient):
+    """
+    模拟模型客户端
+
+    kind:
+        - selector: 轮流返回评委名称
+        - judge: 返回阶段一格式的响应（评分和二选一字段都包含，独白较长，字段在输出中途完整）
+        - debate: 返回带 @ 点名的讨论发言
+    """
+
+    def __init__(self, model: str, latency: float = 0.3, kind: str = "debate"):
+        super().__init__(["ok"], model_info=MODEL_INFO)
+        self.model = model
+        self.latency = latency
+        self.kind = kind
+        self.calls = 0
+
+    async def create(self, messages, cancellation_token=None, **kwargs) -> CreateResult:
+        # 与真实客户端一样响应取消（讨论时限到期时取消进行中的调用）
+        delay = asyncio.ensure_future(asyncio.sleep(self.latency))
+        if cancellation_token is not None:
+            cancellation_token.link_future(delay)
+        await delay
+        self.calls += 1
+        text = self._respond(_structured(kwargs))
+        prompt_chars = sum(len(str(m.content)) for m in messages)
+        usage = RequestUsage(prompt_tokens=prompt_chars // 2, completion_tokens=len(text) // 2)
+        self._cur_usage = usage
+        self._update_total_usage()
+        return CreateResult(finish_reason="stop", content=text, usage=usage, cached=False)
+
+    async def create_stream(self, messages, cancellation_token=None, **kwargs):
+        # 把响应切成小块，在 latency 内均匀送出（模拟逐 token 输出）
+        self.calls += 1
+        text = self._respond(_structured(kwargs))
+        chunks = [text[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(text), STREAM_CHUNK_CHARS)]
+        for chunk in chunks:
+            delay = asyncio.ensure_future(asyncio.sleep(self.latency / len(chunks)))
+            if cancellation_token is not None:
+                cancellation_token.link_future(delay)
+            await delay
+            yield chunk
+        prompt_chars = sum(len(str(m.content)) for m in messages)
+        usage = RequestUsage(prompt_tokens=prompt_chars // 2, completion_tokens=len(text) // 2)
+        self._cur_usage = usage
+        self._update_total_usage()
+        yield CreateResult(finish_reason="stop", content=text, usage=usage, cached=False)
+
+    def _respond(self, structured: bool = False) -> str:
+        n = self.calls
+        if self.kind == "selector":
+            return JUDGE_NAMES[n % len(JUDGE_NAMES)]
+        if self.kind == "judge":
+            # 同时包含评分和二选一字段，阶段一的两种解析器都能使用
+            score = 3 + (len(self.model) * 7 + n) % 7
+            choice = "A" if (len(self.model) + n) % 2 else "B"
+            if structured:
+                # 结构化输出：只有一个 JSON 对象，独白是其中的字段
+                return json.dumps({
+                    "inner_monologue": f"第 {n} 次看这张图", "overall_score": score, "one_liner": "还行",
+                    "choice": choice, "reasoning": "直觉", "strengths": json.loads(_STRENGTHS_JSON),
+                }, ensure_ascii=False)
+            return (
+                f"<inner_monologue>第 {n} 次看这张图</inner_monologue>\n"
+                f'```json\n{{"overall_score": {score}, "one_liner": "还行", '
+                f'"choice": "{choice}", "reasoning": "直觉", "strengths": {_STRENGTHS_JSON}}}\n```'
+            )
+        target = JUDGE_NAMES[(n * 3 + len(self.model)) % len(JUDGE_NAMES)]
+        return f"@{target} 你这个观点我不同意，这是我第 {n} 次说了。"
+
+
+def _structured(kwargs: dict) -> bool:
+    """调用是否要求结构化输出（response_format 为 json_schema）"""
+    response_format = (kwargs.get("extra_create_args") or {}).get("response_format")
+    return isinstance(response_format, dict) and response_format.get("type") == "json_schema"
+
+
+def install_fake_clients(
+    judge_latency: float = 0.3,
+    selector_latency: Optional[float] = None,
+    judge_latencies: Optional[dict[str, float]] = None,
+) -> dict:
+    """
+    用模拟客户端替换各阶段使用的 get_model_client
+
+    与真实实现一样，指定阶段时套上输出上限客户端（记录截断和滚动延迟）。
+    judge_latencies 按评委名称覆盖评委模型的延迟（模拟个别模型特别慢）。
+
+    Returns:
+        {(model, vision): FakeChatClient} 已创建的客户端（可用于统计调用次数）
+    """
+    import app.judges.judge_cache as judge_cache
+    import app.judges.stage_one as stage_one
+    import app.judges.stage_two as stage_two
+    import app.judges.binary_choice_stage_one as binary_choice_stage_one
+    import app.judges.binary_choice_stage_two as binary_choice_stage_two
+    from app.config import get_settings
+    from app.judges.output_limits import LimitedChatCompletionClient, resolve_output_limits
+    from app.judges.structured_output import response_format
+    from app.judges.utils import get_model_for_judge
+
+    settings = get_settings()
+    selector_latency = judge_latency if selector_latency is None else selector_latency
+    model_latencies = {get_model_for_judge(name): latency for name, latency in (judge_latencies or {}).items()}
+    clients: dict = {}
+
+    def get_model_client(
+        model: str,
+        vision: bool,
+        stage: Optional[str] = None,
+        judge_id: Optional[str] = None,
+        response_schema: Optional[str] = None,
+    ):
+        key = (model, vision)
+        if key not in clients:
+            if model == settings.model_selector and not vision:
+                clients[key] = FakeChatClient(model, selector_latency, "selector")
+            else:
+                latency = model_latencies.get(model, judge_latency)
+                clients[key] = FakeChatClient(model, latency, "judge" if vision else "debate")
+        if stage is None:
+            return clients[key]
+        create_args = {"response_format": response_format(response_schema)} if response_schema else None
+        return LimitedChatCompletionClient(
+            clients[key], stage, judge_id or model, resolve_output_limits(stage, judge_id), create_args
+        )
+
+    for module in (judge_cache, stage_one, stage_two, binary_choice_stage_one, binary_choice_stage_two):
+        if hasattr(module, "get_model_client"):
+            module.get_model_client = get_model_client
+    return clients
@@ -0,0 +1,65 @@
+"""阶段一评委输出的模糊语料（固定随机种子，测试和基准共用）"""
+
+import json
+import random
+
+_MONOLOGUE_PIECES = [
+    "这套衣服", "配色有点怪", "我给个 {笑}", "他们肯定又要说我毒舌", "“好看”个鬼",
+    '他说"还行"', "反斜杠 \\ 也来凑热闹", "{", "}", "{}", "先想想怎么打分……", "emoji 😅",
+    "```", "说实话 {还不错", "路径 C:\\temp\\", "'单引号'",
+]
+
+_STRING_PIECES = [
+    "还行", "土到掉渣", "有 {花括号} 的点评", '带 "引号" 的点评', "反斜杠 \\ 结尾\\",
+    "换行\n第二行", "制表\t符", "}{", "😅", "```json", "</inner_monologue>",
+]
+
+
+def _random_text(rng: random.Random, pieces: list[str], n: int) -> str:
+    return "".join(rng.choice(pieces) for _ in range(n))
+
+
+def _random_value(rng: random.Random, depth: int):
+    kind = rng.random()
+    if depth > 0 and kind < 0.2:
+        return {f"k{i}": _random_value(rng, depth - 1) for i in range(rng.randint(0, 3))}
+    if depth > 0 and kind < 0.35:
+        return [_random_value(rng, depth - 1) for _ in range(rng.randint(0, 3))]
+    if kind < 0.7:
+        return _random_text(rng, _STRING_PIECES, rng.randint(0, 4))
+    if kind < 0.85:
+        return round(rng.uniform(0, 10), 1)
+    return rng.choice([True, False, None])
+
+
+def make_judge_output(rng: random.Random) -> tuple[str, dict]:
+    """生成一条评委输出：独白（含多余的花括号和引号）+ JSON（代码块或裸 JSON）+ 可能的尾注"""
+    data = {
+        "overall_score": round(rng.uniform(0, 10), 1),
+        "one_liner": _random_text(rng, _STRING_PIECES, rng.randint(1, 3)),
+        "dimension_scores": [
+            {"name": f"维度{i}", "score": rng.randint(0, 10), "comment": _random_text(rng, _STRING_PIECES, 2)}
+            for i in range(rng.randint(0, 4))
+        ],
+        "extra": _random_value(rng, 3),
+    }
+    payload = json.dumps(data, ensure_ascii=rng.random() < 0.3, indent=rng.choice([None, 2]))
+    if rng.random() < 0.6:
+        payload = f"```json\n{payload}\n```"
+
+    monologue = _random_text(rng, _MONOLOGUE_PIECES, rng.randint(0, 12))
+    parts = []
+    if rng.random() < 0.8:
+        parts.append(f"<inner_monologue>{monologue}</inner_monologue>")
+    else:
+        parts.append(monologue)
+    parts.append(payload)
+    if rng.random() < 0.3:
+        parts.append(_random_text(rng, _MONOLOGUE_PIECES, rng.randint(1, 4)))
+    return "\n".join(parts), data
+
+
+def make_fuzz_corpus(size: int = 500, seed: int = 20251117) -> list[tuple[str, dict]]:
+    """[(原始输出, 其中嵌入的 JSON 对象), ...]"""
+    rng = random.Random(seed)
+    return [make_judge_output(rng) for _ in range(size)]
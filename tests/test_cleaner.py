@@ -0,0 +1,38 @@
+"""讨论发言清洗的回归测试（基于记录下来的评委原始输出）"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from app.judges.cleaner import KeywordMatcher, THINKING_KEYWORDS, clean_debate_message
+
+SAMPLES = json.loads(
+    (Path(__file__).parent / "data" / "thinking_chain_samples.json").read_text(encoding="utf-8")
+)
+
+
+@pytest.mark.parametrize("sample", SAMPLES, ids=[s["name"] for s in SAMPLES])
+def test_clean_recorded_samples(sample):
+    """每条记录样本的清洗结果与预期一致"""
+    assert clean_debate_message(sample["raw"]) == sample["expected"]
+
+
+def test_final_marker_wins_over_drafts():
+    """存在"所以最终发言应该是："时取其后的内容，而不是最后一个草稿"""
+    sample = next(s for s in SAMPLES if s["name"] == "doubao_thinking_chain_v2")
+    assert clean_debate_message(sample["raw"]).startswith("@Grok 普信男AI实锤！")
+
+
+def test_short_final_marker_with_spaces():
+    """"最终："后的空白被去除（二选一讨论原先的标记写成了 \\\\s*，从未命中）"""
+    assert clean_debate_message("我先想想怎么说。最终：  @Grok 你冷静点") == "@Grok 你冷静点"
+
+
+@pytest.mark.parametrize("keywords", [THINKING_KEYWORDS, ("ab", "abc", "bcd", "c")])
+def test_keyword_matcher_matches_brute_force(keywords):
+    """单次扫描的结果与逐个 in 检查一致（包括关键词互相重叠的情况）"""
+    matcher = KeywordMatcher(keywords)
+    texts = [s["raw"] for s in SAMPLES] + ["abcd", "xabcx", "bc", ""]
+    for text in texts:
+        assert matcher.find_all(text) == {k for k in keywords if k in text}
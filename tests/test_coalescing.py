@@ -0,0 +1,50 @@
+"""请求合并与幂等：同一 Idempotency-Key 搭配不同请求体时拒绝加入进行中的请求"""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+from app.api import coalescing
+
+
+class Body(BaseModel):
+    value: str
+
+
+def test_idempotency_key_reused_with_different_body_while_inflight():
+    async def scenario():
+        coalescing.idempotency_store._responses.clear()
+        calls = []
+        release = asyncio.Event()
+
+        async def work(value):
+            calls.append(value)
+            await release.wait()
+            return {"value": value}
+
+        leader = asyncio.create_task(coalescing.run_deduplicated(
+            "test", Body(value="a"), None, "k1", lambda: work("a"),
+        ))
+        await asyncio.sleep(0)
+
+        # 进行中时用同一个 key 提交不同请求体：422，不拿领头请求的结果
+        with pytest.raises(HTTPException) as exc:
+            await coalescing.run_deduplicated("test", Body(value="b"), None, "k1", lambda: work("b"))
+        assert exc.value.status_code == 422
+
+        follower = asyncio.create_task(coalescing.run_deduplicated(
+            "test", Body(value="a"), None, "k1", lambda: work("a"),
+        ))
+        await asyncio.sleep(0)
+        release.set()
+        assert await leader == ({"value": "a"}, False)
+        assert await follower == ({"value": "a"}, False)
+        assert calls == ["a"]
+
+        # 保存的是领头请求的响应，原请求体的重试可以回放
+        replay = await coalescing.run_deduplicated("test", Body(value="a"), None, "k1", lambda: work("a"))
+        assert replay == ({"value": "a"}, True)
+
+    asyncio.run(scenario())
@@ -0,0 +1,237 @@
+"""
+CRUD 在各数据库后端上的回归测试
+
+SQLite 始终运行；PostgreSQL 需要设置 TEST_POSTGRES_URL（如 postgresql+asyncpg://postgres@localhost:5432/ai_judge_test），
+测试在该库中建表并在结束时删除全部表，请使用单独的空数据库。
+"""
+
+import asyncio
+import os
+import uuid
+
+import pytest
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.schema import CreateTable
+
+from app.db import binary_choice_crud, crud
+from app.db.database import create_read_engine, create_write_engine, is_sqlite
+from app.db.writer import DatabaseWriter
+from app.models.binary_choice_database import BinaryChoiceMessage
+from app.models.database import Base, DebateSession, JudgeResult
+
+POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+
+
+def database_url(backend: str, tmp_path) -> str:
+    if backend == "sqlite":
+        return f"sqlite+aiosqlite:///{tmp_path / 'backend.db'}"
+    if not POSTGRES_URL:
+        pytest.skip("未设置 TEST_POSTGRES_URL")
+    return POSTGRES_URL
+
+
+async def run_crud_roundtrip(url: str) -> tuple:
+    write_engine = create_write_engine(url)
+    read_engine = create_read_engine(url)
+    async with write_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    writer = DatabaseWriter(
+        async_sessionmaker(write_engine, class_=AsyncSession, expire_on_commit=False), enabled=is_sqlite(url)
+    )
+    entry_id = f"e_{uuid.uuid4().hex[:8]}"
+    debate_id = f"{entry_id}_debate"
+
+    try:
+        await writer.submit(crud.save_entry, entry_id=entry_id, image_url="u", competition_type="outfit")
+        await writer.submit(crud.save_entry_timings, entry_id=entry_id, timings={"phases": {"stage_one": 1.5}})
+        await writer.submit(crud.save_judge_results, entry_id=entry_id, judge_results=[
+            {
+                "judge_id": f"judge_{i}",
+                "judge_display_name": f"评委 {i}",
+                "competition_type": "outfit",
+                "overall_score": 6.0 + i,
+                "dimension_scores": [{"name": "配色", "score": 7}],
+                "strengths": ["配色大胆", "细节"],
+                "one_liner": "还行",
+            }
+            for i in range(3)
+        ])
+        await writer.submit(crud.open_debate_session, entry_id=entry_id, debate_id=debate_id, config={"max_messages": 12})
+        await writer.submit(crud.save_debate_session_info, debate_id=debate_id, participants=["judge_0", "judge_1"])
+        for seq in (1, 2):
+            await writer.submit(crud.append_debate_message, debate_id=debate_id, sequence=seq, msg_data={
+                "speaker": f"judge_{seq}", "content": f"发言 {seq}", "context_start": 0, "context_end": seq - 1,
+                "metrics": {"prompt_tokens": 100 * seq},
+            })
+        await writer.submit(crud.checkpoint_debate_session, debate_id=debate_id, sequence=2, team_state={"turn": 2})
+        await writer.submit(crud.finish_debate_session, debate_id=debate_id, status=crud.SESSION_STATUS_COMPLETED)
+
+        await writer.submit(
+            binary_choice_crud.save_binary_choice_entry,
+            entry_id=entry_id, question="选哪个？", option_a="A", option_b="B",
+        )
+        await writer.submit(binary_choice_crud.save_binary_choice_results, entry_id=entry_id, judge_results=[
+            {"judge_id": "judge_0", "judge_display_name": "评委 0", "choice": "A", "choice_label": "A", "reasoning": "好"},
+        ])
+        await writer.submit(binary_choice_crud.open_binary_choice_debate, entry_id=entry_id, debate_id=debate_id)
+        await writer.submit(binary_choice_crud.append_binary_choice_message, debate_id=debate_id, sequence=1, msg_data={
+            "speaker": "judge_0", "content": "选 A",
+        })
+        await writer.submit(
+            binary_choice_crud.finish_binary_choice_debate, debate_id=debate_id, status=crud.SESSION_STATUS_FAILED,
+        )
+        await writer.stop()
+
+        async with async_sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False)() as db:
+            entry = await crud.get_entry_by_id(db, entry_id)
+            ranked = await crud.get_judge_results_by_entry(db, entry_id)
+            binary_entry = await binary_choice_crud.get_binary_choice_entry_by_id(db, entry_id)
+        return entry, ranked, binary_entry
+    finally:
+        if not is_sqlite(url):
+            async with write_engine.begin() as conn:
+                await conn.run_sync(Base.metadata.drop_all)
+        await read_engine.dispose()
+        await write_engine.dispose()
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "postgresql"])
+def test_crud_roundtrip(backend, tmp_path):
+    entry, ranked, binary_entry = asyncio.run(run_crud_roundtrip(database_url(backend, tmp_path)))
+
+    assert entry.timings == {"phases": {"stage_one": 1.5}}
+    assert [r.overall_score for r in ranked] == [8.0, 7.0, 6.0]
+    assert ranked[0].strengths == ["配色大胆", "细节"]
+    assert ranked[0].dimension_scores == [{"name": "配色", "score": 7}]
+
+    session = entry.debate_sessions[0]
+    assert session.status == crud.SESSION_STATUS_COMPLETED
+    assert session.participants == ["judge_0", "judge_1"]
+    assert session.team_state is None  # 完成后清空断点
+    messages = sorted(session.messages, key=lambda m: m.sequence)
+    assert [m.metrics for m in messages] == [{"prompt_tokens": 100}, {"prompt_tokens": 200}]
+
+    assert binary_entry.judge_results[0].choice == "A"
+    assert binary_entry.debate_sessions[0].status == crud.SESSION_STATUS_FAILED
+    assert binary_entry.debate_sessions[0].messages[0].content == "选 A"
+
+
+def test_queryable_json_columns_use_jsonb_on_postgres():
+    """需要按内容查询的 JSON 列在 PostgreSQL 上建为 JSONB，大块调试数据保持 JSON"""
+    ddl = str(CreateTable(JudgeResult.__table__).compile(dialect=postgresql.dialect()))
+    assert "strengths JSONB" in ddl
+    assert "debug_context JSON," in ddl
+
+    ddl = str(CreateTable(DebateSession.__table__).compile(dialect=postgresql.dialect()))
+    assert "participants JSONB" in ddl and "team_state JSON," in ddl
+
+    ddl = str(CreateTable(BinaryChoiceMessage.__table__).compile(dialect=sqlite.dialect()))
+    assert "JSONB" not in ddl
+
+
+async def run_entry_upserts(url: str) -> tuple:
+    write_engine = create_write_engine(url)
+    async with write_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(write_engine, class_=AsyncSession, expire_on_commit=False)
+    entry_id = f"e_{uuid.uuid4().hex[:8]}"
+
+    async def save(index: int):
+        async with sessions() as db:
+            async with db.begin():
+                await crud.save_entry(db, entry_id=entry_id, image_url=f"u{index}", competition_type="outfit")
+                await binary_choice_crud.save_binary_choice_entry(
+                    db, entry_id=entry_id, question=f"q{index}", option_a="A", option_b="B",
+                )
+
+    try:
+        await save(0)
+        async with sessions() as db:
+            async with db.begin():
+                await crud.save_entry_timings(db, entry_id, {"phases": {"stage_one": 1.0}})
+        # 同一作品的并发保存（不经过写入队列）
+        await asyncio.gather(*(save(i) for i in range(1, 5)))
+        async with sessions() as db:
+            async with db.begin():
+                updated = await crud.save_entry(
+                    db, entry_id=entry_id, image_url="final", competition_type="outfit", extra_text="补充",
+                )
+            entry = await crud.get_entry_by_id(db, entry_id)
+            binary_entry = await binary_choice_crud.get_binary_choice_entry_by_id(db, entry_id)
+        return updated, entry, binary_entry
+    finally:
+        if not is_sqlite(url):
+            async with write_engine.begin() as conn:
+                await conn.run_sync(Base.metadata.drop_all)
+        await write_engine.dispose()
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "postgresql"])
+def test_entry_upsert(backend, tmp_path):
+    updated, entry, binary_entry = asyncio.run(run_entry_upserts(database_url(backend, tmp_path)))
+
+    assert updated.image_url == entry.image_url == "final"
+    assert entry.extra_text == "补充"
+    assert entry.timings == {"phases": {"stage_one": 1.0}}  # 只覆盖保存时给出的列
+    assert entry.updated_at >= entry.created_at
+    assert binary_entry.question in {f"q{i}" for i in range(1, 5)}
+
+
+async def run_bulk_saves(url: str) -> tuple:
+    write_engine = create_write_engine(url)
+    async with write_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(write_engine, class_=AsyncSession, expire_on_commit=False)
+    entry_id = f"e_{uuid.uuid4().hex[:8]}"
+    debate_id = f"{entry_id}_debate"
+
+    def messages(count: int, prefix: str) -> list[dict]:
+        return [{"speaker": f"judge_{i}", "content": f"{prefix}{i}", "metrics": {"i": i}} for i in range(count)]
+
+    try:
+        for count, prefix in ((20, "旧"), (3, "新")):  # 第二次保存替换旧会话和消息
+            async with sessions() as db:
+                async with db.begin():
+                    await crud.save_entry(db, entry_id=entry_id, image_url="u", competition_type="outfit")
+                    await crud.save_debate_session(
+                        db, entry_id=entry_id, debate_id=debate_id, participants=["judge_0"],
+                        messages=messages(count, prefix),
+                    )
+        async with sessions() as db:
+            async with db.begin():
+                await crud.save_judge_results(db, entry_id, [])  # 空列表不插入任何行
+                await binary_choice_crud.save_binary_choice_entry(
+                    db, entry_id=entry_id, question="q", option_a="A", option_b="B",
+                )
+                await binary_choice_crud.save_binary_choice_results(db, entry_id, [
+                    {"judge_id": f"judge_{i}", "judge_display_name": "评委", "choice": "A", "choice_label": "A", "reasoning": "r"}
+                    for i in range(5)
+                ] + [{"judge_id": "judge_x", "error": "timeout"}])
+                await binary_choice_crud.save_binary_choice_debate(
+                    db, entry_id=entry_id, debate_id=debate_id, participants=["judge_0"], messages=messages(20, "二"),
+                )
+        async with sessions() as db:
+            entry = await crud.get_entry_by_id(db, entry_id)
+            binary_entry = await binary_choice_crud.get_binary_choice_entry_by_id(db, entry_id)
+        return entry, binary_entry
+    finally:
+        if not is_sqlite(url):
+            async with write_engine.begin() as conn:
+                await conn.run_sync(Base.metadata.drop_all)
+        await write_engine.dispose()
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "postgresql"])
+def test_bulk_saves(backend, tmp_path):
+    entry, binary_entry = asyncio.run(run_bulk_saves(database_url(backend, tmp_path)))
+
+    assert entry.judge_results == []
+    [session] = entry.debate_sessions
+    assert session.participants == ["judge_0"]
+    assert sorted((m.sequence, m.content) for m in session.messages) == [(1, "新0"), (2, "新1"), (3, "新2")]
+
+    assert len(binary_entry.judge_results) == 5  # 跳过有错误的结果
+    messages = sorted(binary_entry.debate_sessions[0].messages, key=lambda m: m.sequence)
+    assert [m.sequence for m in messages] == list(range(1, 21))
+    assert messages[-1].metrics == {"i": 19} and messages[-1].created_at is not None
@@ -0,0 +1,63 @@
+"""写入队列：并发写操作合并提交，单个写操作失败不影响同批其余写操作"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.db.crud import save_entry
+from app.db.database import create_read_engine, create_write_engine
+from app.db.writer import DatabaseWriter
+from app.models.database import Base, Entry
+
+
+async def run_writes(url: str, entry_ids: list[str], failing: set[str]) -> tuple[dict, list, list]:
+    write_engine = create_write_engine(url)
+    read_engine = create_read_engine(url)
+    async with write_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    writer = DatabaseWriter(async_sessionmaker(write_engine, class_=AsyncSession, expire_on_commit=False), enabled=True)
+
+    async def save(db, entry_id):
+        entry = await save_entry(db, entry_id=entry_id, image_url="u", competition_type="outfit")
+        if entry_id in failing:
+            raise ValueError(entry_id)
+        return entry
+
+    try:
+        results = await asyncio.gather(*(writer.submit(save, entry_id) for entry_id in entry_ids), return_exceptions=True)
+        stats = writer.stats()
+        await writer.stop()
+        async with async_sessionmaker(read_engine, class_=AsyncSession)() as db:
+            saved = sorted((await db.execute(select(Entry.entry_id))).scalars())
+            # 读连接池只读
+            with pytest.raises(Exception, match="readonly"):
+                await save_entry(db, entry_id="x", image_url="u", competition_type="outfit")
+                await db.commit()
+        return stats, results, saved
+    finally:
+        await read_engine.dispose()
+        await write_engine.dispose()
+
+
+def test_concurrent_writes_are_group_committed(tmp_path):
+    entry_ids = [f"e{i}" for i in range(20)]
+    stats, results, saved = asyncio.run(run_writes(f"sqlite+aiosqlite:///{tmp_path / 'w.db'}", entry_ids, set()))
+
+    assert saved == sorted(entry_ids)
+    assert [r.entry_id for r in results] == entry_ids
+    assert stats["jobs"] == 20
+    assert stats["batches"] < 20  # 排队中的写操作合并提交
+    assert stats["failed_jobs"] == 0
+
+
+def test_failed_write_is_isolated(tmp_path):
+    entry_ids = [f"e{i}" for i in range(10)]
+    stats, results, saved = asyncio.run(run_writes(f"sqlite+aiosqlite:///{tmp_path / 'f.db'}", entry_ids, {"e3"}))
+
+    assert isinstance(results[3], ValueError)
+    assert all(r.entry_id == entry_id for r, entry_id in zip(results, entry_ids) if entry_id != "e3")
+    assert saved == sorted(set(entry_ids) - {"e3"})
+    assert stats["failed_jobs"] == 1
+    assert stats["failed_batches"] >= 1
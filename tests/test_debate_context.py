@@ -0,0 +1,45 @@
+"""讨论消息的上下文范围：压缩后的窗口起点与按序号还原上下文"""
+
+import asyncio
+from types import SimpleNamespace
+
+from autogen_core.models import AssistantMessage, UserMessage
+
+from app.db.transcript import build_transcript, message_context
+from app.judges.context_window import DebateChatCompletionContext, turn_context_start
+
+
+def test_turn_context_start_follows_recent_window():
+    context = DebateChatCompletionContext(recent_turns=3, summary_token_budget=1000, summary_line_chars=20)
+    agent = SimpleNamespace(model_context=context)
+
+    async def scenario():
+        await context.add_message(UserMessage(content="评分摘要", source="user"))
+        for i in range(1, 4):
+            await context.add_message(UserMessage(content=f"发言{i}", source=f"judge_{i}"))
+        await context.get_messages()
+        assert turn_context_start(agent, context_end=3) == 0  # 未压缩：看到全部原文
+
+        await context.add_message(AssistantMessage(content="发言4", source="judge_0"))
+        await context.add_message(UserMessage(content="发言5", source="judge_2"))
+        await context.get_messages()
+        assert context.last_stats["context_recent"] == 3
+        assert context.last_stats["context_summarized"] == 2
+        assert turn_context_start(agent, context_end=5) == 3
+
+    asyncio.run(scenario())
+    assert turn_context_start(SimpleNamespace(), context_end=5) == 0
+
+
+def test_message_context_restores_compressed_window():
+    messages = [SimpleNamespace(sequence=i, speaker=f"judge_{i}", content=f"发言{i}") for i in range(1, 6)]
+    transcript = build_transcript("评分摘要", messages)
+
+    full = SimpleNamespace(context_start=0, context_end=2, context_history=None)
+    assert [m["content"] for m in message_context(transcript, full)] == ["评分摘要", "发言1", "发言2"]
+
+    compressed = SimpleNamespace(context_start=3, context_end=5, context_history=None)
+    restored = message_context(transcript, compressed)
+    assert restored[0]["content"] == "评分摘要"
+    assert restored[1]["source"] == "summary" and "第 1-2 条" in restored[1]["content"]
+    assert [m["content"] for m in restored[2:]] == ["发言3", "发言4", "发言5"]
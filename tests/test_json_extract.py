@@ -0,0 +1,87 @@
+"""模型输出 JSON 提取的回归测试（固定种子的模糊语料 + 原正则提取出错的输入）"""
+
+import pytest
+
+from app.judges.binary_choice_prompts import parse_binary_choice_response
+from app.judges.json_extract import extract_json_object, extract_tag, find_json_spans
+from app.judges.prompts import parse_judge_response
+from tests.judge_output_fuzz import make_fuzz_corpus
+
+CORPUS = make_fuzz_corpus(500)
+
+
+def test_fuzz_corpus_extracts_embedded_object():
+    """模糊语料中每条输出都能取回嵌入的 JSON 对象"""
+    for raw, data in CORPUS:
+        assert extract_json_object(raw, required_keys=("overall_score",)) == data
+
+
+def test_fuzz_corpus_parse_judge_response():
+    """parse_judge_response 取到正确的分数（不会落入兜底）"""
+    for raw, data in CORPUS:
+        assert parse_judge_response(raw)["overall_score"] == data["overall_score"]
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        # 原先的贪婪匹配 (\{[\s\S]*\}) 会从独白里的 { 一直吞到 JSON 结尾
+        '<inner_monologue>给个 {笑} 吧</inner_monologue>\n{"overall_score": 7.5, "one_liner": "还行"}',
+        # 未闭合的 {
+        '说实话 {还不错\n{"overall_score": 7.5, "one_liner": "还行"}',
+        # 多余的 { 和 } 恰好把 JSON 包在中间
+        '{ 先想想\n{"overall_score": 7.5, "one_liner": "还行"}\n想好了 }',
+        # 代码块后面还有花括号
+        '```json\n{"overall_score": 7.5, "one_liner": "还行"}\n```\n补充 {}',
+    ],
+)
+def test_stray_braces_around_json(raw):
+    """正文中多余的花括号不影响提取"""
+    assert parse_judge_response(raw)["overall_score"] == 7.5
+
+
+def test_strings_with_braces_quotes_and_escapes():
+    """字符串中的花括号、转义引号和反斜杠不计入配平"""
+    raw = '{"overall_score": 5, "one_liner": "有 {花括号} 和 \\"引号\\" 还有 \\\\"}'
+    assert extract_json_object(raw) == {"overall_score": 5, "one_liner": '有 {花括号} 和 "引号" 还有 \\'}
+
+
+def test_nested_objects_are_not_yielded_separately():
+    """外层对象解析成功后不再单独返回内层对象"""
+    raw = '{"choice": "A", "detail": {"reasoning": "x"}}'
+    assert find_json_spans(raw) == [(0, len(raw)), (raw.index("{", 1), len(raw) - 1)]
+    assert extract_json_object(raw, required_keys=("reasoning",)) == {"choice": "A", "detail": {"reasoning": "x"}}
+
+
+def test_truncated_output_falls_back():
+    """输出被截断（JSON 不完整）时返回兜底结果"""
+    result = parse_judge_response('<inner_monologue>好</inner_monologue>\n```json\n{"overall_score": 8, "one_')
+    assert result["overall_score"] == 0
+    assert result["one_liner"] == "评分系统解析失败"
+    assert result["inner_monologue"] == "好"
+
+
+def test_unparsable_balanced_span_falls_back():
+    """有配平片段但都不是合法 JSON 时返回格式错误的兜底结果"""
+    result = parse_judge_response("我觉得 {挺好} 的")
+    assert result["one_liner"] == "JSON 格式错误"
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        '<inner_monologue>想想</inner_monologue>\n```json\n{"choice": "b", "reasoning": "更好看"}\n```',
+        '选 {B} 吧\n{"choice": "B", "reasoning": "更好看"}',
+        '{"result": {"choice": "B"}, "reasoning": "更好看"}',
+    ],
+)
+def test_parse_binary_choice_response(raw):
+    """二选一响应：代码块、裸 JSON 和嵌套对象都能取到选择"""
+    result = parse_binary_choice_response(raw)
+    assert result["choice"] == "B"
+    assert result["reasoning"] == "更好看"
+
+
+def test_extract_tag_is_case_insensitive():
+    assert extract_tag("<Inner_Monologue> 嗯 </INNER_MONOLOGUE>", "inner_monologue") == "嗯"
+    assert extract_tag("<inner_monologue>没有闭合", "inner_monologue") is None
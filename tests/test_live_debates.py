@@ -0,0 +1,191 @@
+"""进行中讨论的登记：同步 / 后台讨论运行期间不报告中断，恢复接口返回 409"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.api import binary_choice_routes, routes
+from app.api.admission import AdmissionController
+from app.api.debate_tasks import (
+    DEBATE_STATUS_INTERRUPTED,
+    DEBATE_STATUS_RUNNING,
+    DebateTaskRegistry,
+    LiveDebates,
+    live_debates,
+)
+from app.db.crud import SESSION_STATUS_RUNNING
+
+
+def test_claim_rejects_second_owner_and_release_is_idempotent():
+    live = LiveDebates()
+    release = live.claim("scoring", "e1")
+    with pytest.raises(HTTPException) as exc:
+        live.claim("scoring", "e1")
+    assert exc.value.status_code == 409
+    live.claim("binary_choice", "e1")  # 两种模式的讨论互不影响
+
+    release()
+    again = live.claim("scoring", "e1")
+    release()  # 重复归还不会释放新的登记
+    assert live.is_live("scoring", "e1")
+    again()
+    assert not live.is_live("scoring", "e1")
+
+
+def test_running_session_is_interrupted_only_without_live_owner():
+    assert routes._session_debate_status(SESSION_STATUS_RUNNING, live=True) == DEBATE_STATUS_RUNNING
+    assert routes._session_debate_status(SESSION_STATUS_RUNNING, live=False) == DEBATE_STATUS_INTERRUPTED
+
+
+def test_resume_rejected_while_debate_is_live():
+    async def scenario():
+        for scope, resume in (
+            ("scoring", lambda: routes.resume_debate("live_e1", db=None)),
+            ("binary_choice", lambda: binary_choice_routes._resume_binary_choice("live_e1")),
+        ):
+            # 同步讨论运行中（例如 background_debate=False 的评分请求）
+            with live_debates.hold(scope, "live_e1"):
+                with pytest.raises(HTTPException) as exc:
+                    await resume()
+                assert exc.value.status_code == 409
+
+    asyncio.run(scenario())
+
+
+def test_registry_calls_on_finish_after_task_ends():
+    async def scenario():
+        registry = DebateTaskRegistry()
+        finished = []
+        release = asyncio.Event()
+
+        async def runner(task):
+            await release.wait()
+            raise RuntimeError("boom")
+
+        task = registry.start("e1", runner, on_finish=lambda: finished.append("first"))
+        await asyncio.sleep(0)
+        assert finished == []
+
+        release.set()
+        while not task.finished:
+            await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert finished == ["first"]
+
+    asyncio.run(scenario())
+
+
+def test_detached_claim_outlives_hold():
+    live = LiveDebates()
+    with live.hold("scoring", "e1") as claim:
+        release = claim.detach()
+    assert live.is_live("scoring", "e1")  # 后台讨论持有登记
+    release()
+    assert not live.is_live("scoring", "e1")
+
+    with pytest.raises(RuntimeError):
+        with live.hold("scoring", "e1"):
+            raise RuntimeError("阶段一失败")
+    assert not live.is_live("scoring", "e1")  # 出错时归还
+
+
+def test_pipeline_rejects_live_entry_before_stage_one(monkeypatch):
+    """已有讨论在运行时，在保存作品、调用阶段一模型之前返回 409"""
+    calls = []
+
+    async def fail_if_called(*args, **kwargs):
+        calls.append(kwargs)
+        raise AssertionError("不应执行阶段一")
+
+    monkeypatch.setattr(routes, "_score_and_debate", fail_if_called)
+    monkeypatch.setattr(binary_choice_routes, "_choose_and_debate", fail_if_called)
+
+    async def scenario():
+        for scope, run, request in (
+            ("scoring", routes._run_judge_entry, routes.JudgeEntryRequest(
+                entry_id="live_e2", image_url="http://x/a.png", competition_type="outfit",
+            )),
+            ("binary_choice", binary_choice_routes._run_binary_choice, binary_choice_routes.BinaryChoiceRequest(
+                entry_id="live_e2", question="选哪个？", option_a="A", option_b="B",
+            )),
+        ):
+            with live_debates.hold(scope, "live_e2"):
+                with pytest.raises(HTTPException) as exc:
+                    await run(request)
+                assert exc.value.status_code == 409
+
+    asyncio.run(scenario())
+    assert calls == []
+
+
+def test_background_debate_keeps_admission_slot_until_finished():
+    async def scenario():
+        admission = AdmissionController("test", max_in_flight=1, max_queue=0, queue_timeout=0.1)
+        registry = DebateTaskRegistry()
+        release = asyncio.Event()
+
+        async def runner(task):
+            await release.wait()
+
+        async with admission.slot() as held:
+            task = registry.start("e1", runner, on_finish=held.detach())
+        # 请求已返回，后台讨论仍占着名额
+        assert admission.in_flight == 1
+        with pytest.raises(HTTPException) as exc:
+            await admission.hold()
+        assert exc.value.status_code == 429
+
+        release.set()
+        while not task.finished:
+            await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert admission.in_flight == 0
+
+        release_slot = await admission.hold()
+        release_slot()
+        release_slot()  # 重复归还不会多释放名额
+        assert admission.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_binary_resume_passes_only_valid_judge_results(monkeypatch):
+    """恢复二选一讨论时与首次评判一致，解析失败（没有 choice）的评委不参与讨论"""
+    judge = lambda judge_id, choice: SimpleNamespace(
+        judge_id=judge_id, judge_display_name=judge_id, choice=choice, choice_label=choice,
+        reasoning="r", inner_monologue=None,
+    )
+    entry = SimpleNamespace(
+        question="选哪个？", option_a="A", option_b="B",
+        judge_results=[judge("j1", "A"), judge("j2", None), judge("j3", "B")],
+        debate_sessions=[SimpleNamespace(status=SESSION_STATUS_RUNNING, messages=[], initial_message=None)],
+    )
+    seen = {}
+
+    class FakeSession:
+        async def __aenter__(self):
+            return None
+
+        async def __aexit__(self, *exc):
+            return False
+
+    async def fake_get_entry(db, entry_id):
+        return entry
+
+    async def fake_debate(**kwargs):
+        seen.update(kwargs)
+        return None
+
+    async def skip_write(fn, **kwargs):
+        return None
+
+    monkeypatch.setattr(binary_choice_routes, "AsyncSessionLocal", FakeSession)
+    monkeypatch.setattr(binary_choice_routes, "get_binary_choice_entry_by_id", fake_get_entry)
+    monkeypatch.setattr(binary_choice_routes, "_run_and_save_binary_choice_debate", fake_debate)
+    monkeypatch.setattr(binary_choice_routes.db_writer, "submit", skip_write)
+
+    with pytest.raises(HTTPException):  # 假讨论返回 None，按讨论失败处理
+        asyncio.run(binary_choice_routes._resume_binary_choice("live_e3"))
+    assert [r["judge_id"] for r in seen["judge_results"]] == ["j1", "j3"]
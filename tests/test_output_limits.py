@@ -0,0 +1,113 @@
+"""模型输出上限：max_tokens / stop 传入 extra_create_args，评委级配置优先于阶段默认值"""
+
+import asyncio
+
+import pytest
+from autogen_core.models import CreateResult, RequestUsage, UserMessage
+from autogen_ext.models.replay import ReplayChatCompletionClient
+
+from app.judges import output_limits
+from app.judges.output_limits import (
+    STAGE_DEBATE,
+    STAGE_SCORING,
+    LimitedChatCompletionClient,
+    output_limit_stats,
+    reset_output_limit_stats,
+    resolve_output_limits,
+)
+
+MESSAGES = [UserMessage(content="评一下", source="user")]
+
+
+class RecordingClient(ReplayChatCompletionClient):
+    """记录每次调用收到的 extra_create_args"""
+
+    def __init__(self, finish_reason: str = "stop"):
+        super().__init__(["ok"])
+        self.finish_reason = finish_reason
+        self.calls: list[dict] = []
+
+    def _result(self) -> CreateResult:
+        usage = RequestUsage(prompt_tokens=10, completion_tokens=5)
+        return CreateResult(finish_reason=self.finish_reason, content="好看", usage=usage, cached=False)
+
+    async def create(self, messages, *, extra_create_args={}, **kwargs) -> CreateResult:
+        self.calls.append(dict(extra_create_args))
+        return self._result()
+
+    async def create_stream(self, messages, *, extra_create_args={}, **kwargs):
+        self.calls.append(dict(extra_create_args))
+        yield "好"
+        yield self._result()
+
+
+@pytest.fixture
+def limits_config(monkeypatch):
+    monkeypatch.setattr(output_limits.settings, "scoring_max_tokens", 1200)
+    monkeypatch.setattr(output_limits.settings, "debate_max_tokens", 600)
+    monkeypatch.setattr(output_limits.settings, "scoring_stop_sequences", [])
+    monkeypatch.setattr(output_limits.settings, "debate_stop_sequences", ["</speech>"])
+    monkeypatch.setattr(output_limits.settings, "judge_max_tokens", {"Doubao": {STAGE_DEBATE: 1000}})
+    monkeypatch.setattr(output_limits.settings, "judge_stop_sequences", {"Grok": {STAGE_DEBATE: ["\n\n"]}})
+    reset_output_limit_stats()
+    yield
+    reset_output_limit_stats()
+
+
+def limited(client, stage: str, judge_id: str, create_args=None) -> LimitedChatCompletionClient:
+    return LimitedChatCompletionClient(client, stage, judge_id, resolve_output_limits(stage, judge_id), create_args)
+
+
+def test_stage_limits_reach_extra_create_args(limits_config):
+    client = RecordingClient()
+    asyncio.run(limited(client, STAGE_DEBATE, "Qwen").create(MESSAGES))
+    asyncio.run(limited(client, STAGE_SCORING, "Qwen").create(MESSAGES))
+    assert client.calls == [
+        {"max_tokens": 600, "stop": ["</speech>"]},
+        {"max_tokens": 1200},  # 没有 stop 时不传
+    ]
+
+
+def test_judge_override_wins_over_stage_default(limits_config):
+    client = RecordingClient()
+    asyncio.run(limited(client, STAGE_DEBATE, "Doubao").create(MESSAGES))
+    asyncio.run(limited(client, STAGE_DEBATE, "Grok").create(MESSAGES))
+    assert client.calls == [
+        {"max_tokens": 1000, "stop": ["</speech>"]},
+        {"max_tokens": 600, "stop": ["\n\n"]},
+    ]
+    # 覆盖只作用于配置的阶段
+    assert resolve_output_limits(STAGE_SCORING, "Doubao").max_tokens == 1200
+
+
+def test_unlimited_and_explicit_args(limits_config, monkeypatch):
+    monkeypatch.setattr(output_limits.settings, "scoring_max_tokens", 0)
+    client = RecordingClient()
+    response_format = {"type": "json_schema"}
+
+    async def scenario():
+        wrapped = limited(client, STAGE_SCORING, "Qwen", create_args={"response_format": response_format})
+        await wrapped.create(MESSAGES)
+        # 调用方显式传入的参数优先
+        await limited(client, STAGE_DEBATE, "Qwen").create(MESSAGES, extra_create_args={"max_tokens": 50})
+
+    asyncio.run(scenario())
+    assert client.calls == [
+        {"response_format": response_format},  # max_tokens <= 0 表示不限制
+        {"max_tokens": 50, "stop": ["</speech>"]},
+    ]
+
+
+def test_stream_passes_limits_and_counts_truncation(limits_config):
+    client = RecordingClient(finish_reason="length")
+
+    async def scenario():
+        return [chunk async for chunk in limited(client, STAGE_DEBATE, "Doubao").create_stream(MESSAGES)]
+
+    chunks = asyncio.run(scenario())
+    assert chunks[0] == "好" and isinstance(chunks[-1], CreateResult)
+    assert client.calls == [{"max_tokens": 1000, "stop": ["</speech>"]}]
+
+    stats = output_limit_stats()[STAGE_DEBATE]["Doubao"]
+    assert stats["max_tokens"] == 1000
+    assert stats["calls"] == 1 and stats["truncated"] == 1 and stats["truncated_rate"] == 1.0
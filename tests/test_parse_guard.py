@@ -0,0 +1,75 @@
+"""解析保护：超长输出截断、解析时间预算和统计"""
+
+import json
+import time
+
+import pytest
+
+from app.judges import parse_guard
+from app.judges.binary_choice_prompts import parse_binary_choice_response
+from app.judges.cleaner import clean_debate_message
+from app.judges.json_extract import extract_json_object
+from app.judges.parse_guard import (
+    CLIP_MARKER,
+    clip_output,
+    parse_guard_stats,
+    preview,
+    reset_parse_guard_stats,
+)
+from app.judges.prompts import parse_judge_response
+
+SCORE_JSON = json.dumps({"overall_score": 7.5, "one_liner": "还行"}, ensure_ascii=False)
+
+
+@pytest.fixture(autouse=True)
+def fresh_stats():
+    reset_parse_guard_stats()
+    yield
+    reset_parse_guard_stats()
+
+
+def test_clip_output_keeps_head_and_tail():
+    text = "头" * 100 + "中" * 1000 + "尾" * 100
+    clipped = clip_output(text, max_chars=200)
+    assert clipped == "头" * 100 + CLIP_MARKER + "尾" * 100
+    assert clip_output(text, max_chars=0) is text
+
+
+def test_runaway_monologue_still_parses(monkeypatch):
+    """几百 KB 的独白被截断后，结尾的 JSON 仍能取到，截断计入统计"""
+    monkeypatch.setattr(parse_guard.settings, "parse_max_chars", 4000)
+    raw = "<inner_monologue>" + "这套衣服{很怪" * 50_000 + "</inner_monologue>\n" + SCORE_JSON
+
+    assert parse_judge_response(raw)["overall_score"] == 7.5
+    stats = parse_guard_stats()["parse_judge_response"]
+    assert stats["clipped"] == 1
+    assert stats["max_input_chars"] == len(raw)
+
+
+def test_expired_deadline_stops_extraction():
+    """截止时间已过时不再尝试解析片段"""
+    assert extract_json_object(SCORE_JSON, deadline=time.perf_counter() - 1) is None
+
+
+def test_over_budget_falls_back(monkeypatch):
+    """超出时间预算按解析失败兜底，并计入超时次数"""
+    monkeypatch.setattr(parse_guard.settings, "parse_time_budget_ms", 1e-6)
+    data = parse_judge_response("{" * 2000 + SCORE_JSON)
+
+    assert data["parse_failed"] is True
+    assert parse_binary_choice_response('{"choice": "A", "reasoning": "好看"}')["choice"] is None
+    stats = parse_guard_stats()
+    assert stats["parse_judge_response"]["over_budget"] == 1
+    assert stats["parse_binary_choice_response"]["over_budget"] == 1
+
+
+def test_clean_debate_message_keeps_final_response(monkeypatch):
+    monkeypatch.setattr(parse_guard.settings, "parse_max_chars", 1000)
+    content = "<thinking>" * 20_000 + "\n最终发言：这套配色我给满分。"
+    assert clean_debate_message(content).endswith("这套配色我给满分。")
+    assert parse_guard_stats()["clean_debate_message"]["clipped"] == 1
+
+
+def test_preview():
+    assert preview("短输出", max_chars=10) == "短输出"
+    assert preview("长" * 20, max_chars=5) == "长" * 5 + "…（共 20 字符）"
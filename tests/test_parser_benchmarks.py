@@ -0,0 +1,110 @@
+"""
+解析器 / 清洗基准（pytest-benchmark）
+
+语料优先使用 python -m app.db.export_corpus 从数据库导出的模型原始输出
+（tests/data/model_output_corpus.json，或环境变量 MODEL_OUTPUT_CORPUS 指定的文件），
+没有导出语料时使用仓库内的模糊语料和思维链样本。
+
+    # 保存基线
+    python -m pytest tests/test_parser_benchmarks.py --benchmark-autosave
+    # 与最近的基线对比，平均耗时变慢超过 20% 即失败
+    python -m pytest tests/test_parser_benchmarks.py --benchmark-compare --benchmark-compare-fail=mean:20%
+
+单条输出的最坏耗时超过 PARSER_BENCH_MAX_CALL_MS 时同样失败。默认 1000ms 只拦截灾难性回退（如正则回溯），
+不受 CI 机器负载影响；需要更严格的门槛时在本地设置该环境变量。
+--benchmark-disable / --benchmark-skip 时仍统计吞吐和最坏耗时。
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from loguru import logger
+
+from app.judges.binary_choice_prompts import parse_binary_choice_response
+from app.judges.cleaner import clean_debate_message
+from app.judges.prompts import parse_judge_response
+from app.judges.utils import parse_json_from_response
+from tests.judge_output_fuzz import make_fuzz_corpus
+
+DATA_DIR = Path(__file__).parent / "data"
+CORPUS_PATH = Path(os.environ.get("MODEL_OUTPUT_CORPUS", DATA_DIR / "model_output_corpus.json"))
+MAX_CALL_MS = float(os.environ.get("PARSER_BENCH_MAX_CALL_MS", "1000"))
+
+
+def load_corpus() -> dict[str, list[str]]:
+    """{语料类型: [原始输出, ...]}"""
+    if CORPUS_PATH.exists():
+        exported = json.loads(CORPUS_PATH.read_text(encoding="utf-8"))
+        return {kind: [r["raw"] for r in exported.get(kind, [])] for kind in ("scoring", "binary_choice", "debate")}
+
+    fuzz = [raw for raw, _ in make_fuzz_corpus(500)]
+    samples = json.loads((DATA_DIR / "thinking_chain_samples.json").read_text(encoding="utf-8"))
+    return {
+        "scoring": fuzz,
+        "binary_choice": [raw.replace('"overall_score"', '"choice": "A", "reasoning": "还行", "score"') for raw in fuzz],
+        "debate": [s["raw"] for s in samples],
+    }
+
+
+CORPUS = load_corpus()
+
+CASES = [
+    ("parse_judge_response", "scoring", parse_judge_response),
+    ("parse_binary_choice_response", "binary_choice", parse_binary_choice_response),
+    ("parse_json_from_response", "scoring", parse_json_from_response),
+    ("clean_debate_message", "debate", clean_debate_message),
+]
+
+
+@pytest.fixture(autouse=True)
+def quiet_logs():
+    # 解析器会逐条记录日志，计时时关闭
+    logger.disable("app")
+    yield
+    logger.enable("app")
+
+
+def parse_all(parse, outputs: list[str]) -> None:
+    for raw in outputs:
+        parse(raw)
+
+
+def worst_call(parse, outputs: list[str]) -> tuple[float, int, float]:
+    """单条输出的最坏耗时（毫秒）、对应下标，以及整份语料的总耗时（秒）"""
+    worst = (0.0, -1)
+    total = 0.0
+    for i, raw in enumerate(outputs):
+        t0 = time.perf_counter()
+        parse(raw)
+        elapsed = time.perf_counter() - t0
+        total += elapsed
+        worst = max(worst, (elapsed * 1000, i))
+    return worst[0], worst[1], total
+
+
+@pytest.mark.parametrize("name, kind, parse", CASES, ids=[c[0] for c in CASES])
+def test_parser_throughput(benchmark, name, kind, parse):
+    """吞吐（条/秒）和最坏单条耗时"""
+    outputs = CORPUS[kind]
+    if not outputs:
+        pytest.skip(f"语料中没有 {kind} 类型的输出")
+
+    worst_ms, worst_index, total_seconds = worst_call(parse, outputs)
+    benchmark.group = kind
+    benchmark(parse_all, parse, outputs)
+
+    # 关闭基准（--benchmark-disable / --benchmark-skip）时 benchmark.stats 为 None，退而用逐条计时的总耗时
+    mean_seconds = benchmark.stats.stats.mean if benchmark.stats is not None else total_seconds
+    benchmark.extra_info.update({
+        "outputs": len(outputs),
+        "outputs_per_second": round(len(outputs) / max(mean_seconds, 1e-9)),
+        "worst_call_ms": round(worst_ms, 3),
+        "worst_output_chars": len(outputs[worst_index]),
+    })
+    assert worst_ms < MAX_CALL_MS, f"{name} 单条最坏耗时 {worst_ms:.1f}ms（第 {worst_index} 条，{len(outputs[worst_index])} 字符）"
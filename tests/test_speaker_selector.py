@@ -0,0 +1,119 @@
+"""本地发言人选择器：规则顺序、不连续发言、延迟感知"""
+
+import pytest
+
+from app.judges import latency as latency_module
+from app.judges.latency import LatencyTracker, latency_weights
+from app.judges.speaker_selector import LocalSpeakerSelector, build_speaker_selector
+
+JUDGES = ["ChatGPT", "Grok", "Gemini", "Doubao", "Qwen"]
+
+
+def make_selector(**kwargs) -> LocalSpeakerSelector:
+    options = dict(closing_judge="Qwen", closing_turn=100, pingpong_window=4, conflict_score_gap=2.0)
+    options.update(kwargs)
+    return LocalSpeakerSelector(JUDGES, **options)
+
+
+def run_turns(selector: LocalSpeakerSelector, count: int, content=lambda speaker: "同意") -> list[str]:
+    turns = []
+    for _ in range(count):
+        speaker, _ = selector.select(turns)
+        turns.append((speaker, content(speaker)))
+    return [speaker for speaker, _ in turns]
+
+
+def test_fairness_rotates_in_participant_order():
+    selector = make_selector()
+    assert selector.select([]) == ("ChatGPT", "opening")
+    # 没有立场、没有点名：发言最少 → 最久没说话 → 参与者顺序
+    assert run_turns(selector, 7) == JUDGES + ["ChatGPT", "Grok"]
+
+
+def test_rule_priority():
+    selector = make_selector(stances={"ChatGPT": 9, "Grok": 8, "Gemini": 3, "Doubao": 5, "Qwen": 8.5})
+
+    # 点名回应（别名不区分大小写）
+    assert selector.select([("ChatGPT", "@gemini 你怎么看")]) == ("Gemini", "mention")
+    # 冲突优先：与上一位（9 分）差距最大的是 Gemini（3 分）
+    assert selector.select([("ChatGPT", "很好")]) == ("Gemini", "conflict")
+    # 两人霸屏时选第三人，优先于点名
+    pingpong = [("ChatGPT", "a"), ("Gemini", "b"), ("ChatGPT", "c"), ("Gemini", "@ChatGPT 不对")]
+    speaker, rule = selector.select(pingpong)
+    assert rule == "break_pingpong" and speaker not in ("ChatGPT", "Gemini")
+
+    # 收束控场：达到 closing_turn 且收尾评委之后没发过言
+    closing = make_selector(closing_turn=3)
+    assert closing.select([("ChatGPT", "a"), ("Grok", "b"), ("Gemini", "@Doubao 呢")]) == ("Qwen", "closing")
+    assert closing.select([("Qwen", "a"), ("Grok", "b"), ("Qwen", "c"), ("Grok", "d")])[1] != "closing"
+
+
+def test_never_picks_same_speaker_twice_in_a_row():
+    selector = make_selector(stances={"ChatGPT": 9, "Grok": 2, "Gemini": 9, "Doubao": 2, "Qwen": 5})
+    # 每条发言都 @ 自己，点名规则也不能让同一人连续发言
+    speakers = run_turns(selector, 40, content=lambda speaker: f"@{speaker} 我再说一遍")
+    assert all(a != b for a, b in zip(speakers, speakers[1:]))
+
+    lone = LocalSpeakerSelector(["ChatGPT", "Grok"], closing_turn=100, pingpong_window=10)
+    assert lone.select([("ChatGPT", "@ChatGPT")])[0] == "Grok"
+
+
+def test_hybrid_leaves_open_cases_to_llm():
+    selector = make_selector(strict=False)
+    assert selector.select([("ChatGPT", "@Grok 你说")]) == ("Grok", "mention")
+    assert selector.select([("ChatGPT", "很好")]) == (None, "llm_fallback")
+    assert build_speaker_selector(JUDGES, mode="llm") is None
+    assert build_speaker_selector(JUDGES, mode="unknown") is None  # 未知模式退回 LLM 选择器
+
+
+def test_select_round_has_no_duplicates():
+    selector = make_selector()
+    first = selector.select_round([], size=3)
+    assert first == ["ChatGPT", "Grok", "Gemini"]
+    second = selector.select_round([(s, "") for s in first], size=3)
+    assert len(set(second)) == 3 and second[:2] == ["Doubao", "Qwen"]
+
+
+@pytest.fixture
+def latency_settings(monkeypatch):
+    monkeypatch.setattr(latency_module.settings, "debate_latency_exponent", 1.0)
+    monkeypatch.setattr(latency_module.settings, "debate_latency_min_share", 0.5)
+
+
+LATENCIES = {"ChatGPT": 800.0, "Grok": 200.0, "Gemini": 400.0, "Doubao": 400.0, "Qwen": 400.0}
+
+
+def test_latency_weights_are_relative_to_median_and_clamped():
+    weights = latency_weights(JUDGES, LATENCIES, exponent=1.0, min_share=0.5)
+    assert weights["Gemini"] == 1.0  # 中位数
+    assert weights["ChatGPT"] == 0.5 and weights["Grok"] == 2.0
+    clamped = latency_weights(JUDGES, {**LATENCIES, "ChatGPT": 4000.0}, exponent=1.0, min_share=0.5)
+    assert clamped["ChatGPT"] == 0.5  # 慢评委至少保留 min_share
+    assert latency_weights(JUDGES, {}, exponent=1.0) == {p: 1.0 for p in JUDGES}
+
+
+def test_latency_breaks_ties_and_shifts_turns_to_fast_judges(latency_settings):
+    selector = make_selector(latency_source=lambda: LATENCIES)
+    # 发言数和最近发言都相同：延迟更低的先说
+    assert selector.select([]) == ("Grok", "opening")
+    assert selector.select([("Grok", "同意")], exclude=()) == ("Gemini", "fairness")
+
+    speakers = run_turns(selector, 30)
+    assert speakers.count("Grok") > speakers.count("Gemini") > speakers.count("ChatGPT") > 0
+    assert all(a != b for a, b in zip(speakers, speakers[1:]))
+
+
+def test_parallel_round_keeps_slow_judge_out_of_fast_round(latency_settings):
+    selector = make_selector(latency_source=lambda: LATENCIES)
+    turns = [(s, "") for s in ["ChatGPT", "Grok", "Gemini", "Doubao", "Qwen", "Grok"]]
+    # ChatGPT 比本轮已选评委慢得多，且不是发言最少的，不排进这一轮
+    assert "ChatGPT" not in selector.select_round(turns, size=3)
+
+
+def test_latency_tracker_ewma():
+    tracker = LatencyTracker(alpha=0.5)
+    tracker.observe("debate", "Grok", 100)
+    tracker.observe("debate", "Grok", 300)
+    assert tracker.get("debate", "Grok") == 200
+    assert tracker.snapshot("debate") == {"Grok": 200}
+    assert tracker.stats()["debate"]["Grok"]["calls"] == 2
@@ -0,0 +1,52 @@
+"""SQLite 连接配置：PRAGMA 在新连接上生效，WAL 检查点"""
+
+import asyncio
+
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.sqlite_profile import (
+    PROFILE_DEFAULT,
+    SQLiteProfile,
+    install_sqlite_profile,
+    resolve_sqlite_profile,
+    wal_checkpoint,
+)
+
+
+async def read_pragmas(url: str, profile: SQLiteProfile) -> dict:
+    engine = create_async_engine(url)
+    install_sqlite_profile(engine, profile)
+    try:
+        async with engine.begin() as conn:
+            await conn.exec_driver_sql("CREATE TABLE t (x INTEGER)")
+            await conn.exec_driver_sql("INSERT INTO t VALUES (1)")
+        async with engine.connect() as conn:
+            pragmas = {
+                name: (await conn.exec_driver_sql(f"PRAGMA {name}")).scalar()
+                for name in ("journal_mode", "synchronous", "busy_timeout", "cache_size")
+            }
+        pragmas["checkpoint"] = await wal_checkpoint(engine, "TRUNCATE")
+        return pragmas
+    finally:
+        await engine.dispose()
+
+
+def test_production_profile_applied_on_connect(tmp_path):
+    profile = SQLiteProfile(
+        "production", journal_mode="WAL", synchronous="NORMAL", busy_timeout_ms=1234, cache_size_kb=2048
+    )
+    pragmas = asyncio.run(read_pragmas(f"sqlite+aiosqlite:///{tmp_path / 'wal.db'}", profile))
+
+    assert pragmas["journal_mode"] == "wal"
+    assert pragmas["synchronous"] == 1  # NORMAL
+    assert pragmas["busy_timeout"] == 1234
+    assert pragmas["cache_size"] == -2048
+    busy, log_pages, checkpointed = pragmas["checkpoint"]
+    assert busy == 0 and log_pages == checkpointed == 0  # TRUNCATE 后 WAL 为空
+
+
+def test_default_profile_sets_nothing(tmp_path):
+    profile = resolve_sqlite_profile(PROFILE_DEFAULT)
+    assert profile.pragmas() == []
+    pragmas = asyncio.run(read_pragmas(f"sqlite+aiosqlite:///{tmp_path / 'default.db'}", profile))
+    assert pragmas["journal_mode"] == "delete"
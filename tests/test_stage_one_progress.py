@@ -0,0 +1,72 @@
+"""阶段一进度：按 (流程, entry_id) 登记，查询不建立条目，未开始时订阅接口返回 404"""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.api import binary_choice_routes, routes
+from app.api.stage_one_progress import (
+    FLOW_BINARY_CHOICE,
+    FLOW_SCORING,
+    StageOneProgressRegistry,
+    progress_event_stream,
+    stage_one_progress,
+)
+
+
+def test_flows_do_not_collide_and_get_does_not_create():
+    async def scenario():
+        registry = StageOneProgressRegistry()
+        assert registry.get(FLOW_SCORING, "e1") is None
+        assert registry.get(FLOW_SCORING, "e1") is None  # 查询没有副作用
+
+        scoring = registry.start(FLOW_SCORING, "e1")
+        binary = registry.start(FLOW_BINARY_CHOICE, "e1")
+        await registry.publish(scoring, "field", {"field": "overall_score"})
+        await registry.finish(binary, "result", {"choice_a_count": 3})
+
+        assert registry.get(FLOW_SCORING, "e1") is scoring
+        assert registry.get(FLOW_BINARY_CHOICE, "e1") is binary
+        assert scoring.events == [("field", {"field": "overall_score"})] and not scoring.finished
+
+        # 同一作品重新评判时替换上一次的进度
+        again = registry.start(FLOW_BINARY_CHOICE, "e1")
+        assert again is not binary and registry.get(FLOW_BINARY_CHOICE, "e1") is again
+
+    asyncio.run(scenario())
+
+
+def test_finished_progress_expires_and_late_subscriber_gets_replay():
+    async def scenario():
+        registry = StageOneProgressRegistry(retention_seconds=0)
+        progress = registry.start(FLOW_SCORING, "e1")
+        await registry.publish(progress, "judge", {"judge_id": "Grok"})
+        await registry.finish(progress, "result", {"error": None})
+
+        stream = [chunk async for chunk in progress_event_stream(progress)]
+        assert [chunk.split("\n")[0] for chunk in stream] == ["event: judge", "event: result"]
+
+        await asyncio.sleep(0.01)
+        assert registry.get(FLOW_SCORING, "e1") is None
+
+    asyncio.run(scenario())
+
+
+def test_stream_endpoints_return_404_before_flow_starts():
+    async def scenario():
+        for stream in (routes.stream_scoring, binary_choice_routes.stream_binary_choice):
+            with pytest.raises(HTTPException) as exc:
+                await stream("progress_missing")
+            assert exc.value.status_code == 404
+        assert stage_one_progress.get(FLOW_SCORING, "progress_missing") is None
+
+        # 二选一的进度不会出现在评分的订阅接口
+        progress = stage_one_progress.start(FLOW_BINARY_CHOICE, "progress_e2")
+        await stage_one_progress.finish(progress, "result", {})
+        with pytest.raises(HTTPException):
+            await routes.stream_scoring("progress_e2")
+        response = await binary_choice_routes.stream_binary_choice("progress_e2")
+        assert response.media_type == "text/event-stream"
+
+    asyncio.run(scenario())
@@ -0,0 +1,74 @@
+"""评委输出增量解析的回归测试（随机切块喂入，结果与整条解析一致）"""
+
+import random
+
+import pytest
+
+from app.judges.stream_parser import (
+    FIELD_CHOICE,
+    FIELD_INNER_MONOLOGUE,
+    FIELD_OVERALL_SCORE,
+    ChoiceQuorum,
+    IncrementalJudgeParser,
+)
+from tests.judge_output_fuzz import make_fuzz_corpus
+
+
+def feed_in_chunks(parser: IncrementalJudgeParser, text: str, rng: random.Random) -> list:
+    found = []
+    i = 0
+    while i < len(text):
+        size = rng.randint(1, 8)
+        found += parser.feed(text[i:i + size])
+        i += size
+    return found + parser.feed("\n")
+
+
+def test_fuzz_corpus_score_matches_full_parse():
+    """模糊语料随机切块喂入，得到的总分与嵌入的 JSON 一致"""
+    rng = random.Random(42)
+    for raw, data in make_fuzz_corpus(500):
+        parser = IncrementalJudgeParser((FIELD_OVERALL_SCORE,))
+        feed_in_chunks(parser, raw, rng)
+        assert parser.fields[FIELD_OVERALL_SCORE] == data["overall_score"]
+
+
+def test_fields_complete_before_output_ends():
+    """字段在后面的内容到达之前就已产出，每个字段只产出一次"""
+    parser = IncrementalJudgeParser((FIELD_OVERALL_SCORE, FIELD_CHOICE))
+    assert parser.feed("<inner_monologue>嗯") == []
+    found = parser.feed("……</inner_monologue>\n{\"overall_score\": 7")
+    assert [(f.field, f.value) for f in found] == [(FIELD_INNER_MONOLOGUE, "嗯……")]
+    # 7 之后可能还有 .5，要等到分隔符
+    found = parser.feed(".5, \"choice\": \"b\", \"reasoning\": \"还没写完")
+    assert [(f.field, f.value) for f in found] == [(FIELD_OVERALL_SCORE, 7.5), (FIELD_CHOICE, "B")]
+    assert parser.feed("\"}") == []
+
+
+def test_fields_inside_monologue_are_ignored():
+    """独白里出现的同名文本不算"""
+    parser = IncrementalJudgeParser((FIELD_CHOICE,))
+    rng = random.Random(0)
+    raw = '<inner_monologue>要不要写 "choice": "A" 呢</inner_monologue>\n{"choice": "B"}'
+    feed_in_chunks(parser, raw, rng)
+    assert parser.fields[FIELD_CHOICE] == "B"
+
+
+def test_fields_before_monologue_are_found():
+    parser = IncrementalJudgeParser((FIELD_CHOICE,))
+    parser.feed('{"choice": "A"}\n<inner_monologue>后写的独白')
+    assert parser.fields == {FIELD_CHOICE: "A"}
+
+
+@pytest.mark.parametrize(
+    "events, expected",
+    [
+        (["A", "B", "A", "A"], "A"),  # 5 位评委，第 3 票 A 时过半
+        (["A", "B", None, None], None),  # 两位评委失败后 1:1，剩下一位评委仍可决定结果
+        (["A", None, None, "A"], "A"),  # 两位失败后总数为 3，第 2 票 A 过半
+    ],
+)
+def test_choice_quorum(events, expected):
+    quorum = ChoiceQuorum(5)
+    decisions = [quorum.add(e) if e else quorum.drop() for e in events]
+    assert [d for d in decisions if d] == ([expected] if expected else [])
@@ -0,0 +1,51 @@
+"""结构化输出模式的校验测试"""
+
+import json
+
+import pytest
+
+from app.judges.structured_output import (
+    SCHEMA_BINARY_CHOICE,
+    SCHEMA_SCORING,
+    parse_structured_output,
+    response_format,
+)
+
+
+def test_response_format_uses_model_schema():
+    """response_format 的 Schema 由响应模型生成，独白字段排在最前（先写独白再打分）"""
+    schema = response_format(SCHEMA_SCORING)["json_schema"]["schema"]
+    assert list(schema["properties"])[0] == "inner_monologue"
+    assert {"overall_score", "one_liner"} <= set(schema["required"])
+    choice = response_format(SCHEMA_BINARY_CHOICE)["json_schema"]["schema"]["properties"]["choice"]
+    assert choice["enum"] == ["A", "B"]
+
+
+def test_parse_valid_scoring_output():
+    raw = json.dumps({"inner_monologue": "嗯", "overall_score": 7.5, "one_liner": "还行"}, ensure_ascii=False)
+    assert parse_structured_output(SCHEMA_SCORING, raw) == {
+        "inner_monologue": "嗯",
+        "overall_score": 7.5,
+        "one_liner": "还行",
+        "strengths": [],
+        "weaknesses": [],
+    }
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        '{"inner_monologue": "嗯", "overall_score": 11, "one_liner": "还行"}',  # 超出范围
+        '{"inner_monologue": "嗯", "one_liner": "还行"}',  # 缺少总分
+        '<inner_monologue>嗯</inner_monologue>\n{"overall_score": 7, "one_liner": "还行"}',  # 不做正则提取
+        '{"inner_monologue": "嗯", "overall_score": 7, "one_liner": "还',  # 截断
+    ],
+)
+def test_invalid_scoring_output_is_a_parse_failure(raw):
+    assert parse_structured_output(SCHEMA_SCORING, raw) is None
+
+
+def test_parse_binary_choice_output():
+    raw = '{"inner_monologue": "嗯", "choice": "B", "reasoning": "更好看"}'
+    assert parse_structured_output(SCHEMA_BINARY_CHOICE, raw)["choice"] == "B"
+    assert parse_structured_output(SCHEMA_BINARY_CHOICE, raw.replace('"B"', '"C"')) is None
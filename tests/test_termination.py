@@ -0,0 +1,199 @@
+"""讨论终止条件：收敛检测、时限和 token 预算"""
+
+import asyncio
+import time
+
+import pytest
+from autogen_agentchat.base import TaskResult
+from autogen_agentchat.messages import StopMessage, TextMessage
+
+from app.judges import binary_choice_stage_two, judge_cache, stage_one, stage_two, binary_choice_stage_one
+from app.judges import termination as termination_module
+from app.judges.termination import (
+    ConvergenceTermination,
+    build_debate_termination,
+    remaining_token_budget,
+    shingles,
+    stream_with_deadline,
+)
+from benchmarks.fake_clients import JUDGE_NAMES, install_fake_clients
+
+REPEATED = "这套配色太大胆了"
+
+
+def say(source: str, text: str) -> TextMessage:
+    return TextMessage(source=source, content=text)
+
+
+def test_shingles_split_by_segment_and_ignore_mentions():
+    assert shingles("@Grok 配色大胆", 3) == {"配色大", "色大胆"}
+    # 不跨越标点拼接 n-gram，短于 n 的片段整体保留，不区分大小写
+    assert shingles("好看，OK", 3) == {"好看", "ok"}
+    assert shingles("", 3) == set()
+
+
+def test_convergence_waits_for_min_turns_and_patience():
+    async def scenario():
+        condition = ConvergenceTermination(min_turns=4, patience=2, novelty_threshold=0.3, shingle_size=2)
+        assert await condition([say("user", REPEATED)]) is None  # 初始消息只计入已出现内容
+        assert condition.novelty_history == []
+
+        # 连续复述，但评委发言数未达到 min_turns
+        for _ in range(3):
+            assert await condition([say("Grok", REPEATED)]) is None
+        assert condition.novelty_history[-1] == ("Grok", 0.0)
+
+        stop = await condition([say("Qwen", REPEATED)])
+        assert isinstance(stop, StopMessage)
+        assert condition.terminated
+        assert condition.stop_reason == stop.content
+        assert "讨论已收敛" in stop.content and "连续 4 轮" in stop.content
+
+    asyncio.run(scenario())
+
+
+def test_fresh_turn_resets_streak():
+    async def scenario():
+        condition = ConvergenceTermination(min_turns=1, patience=2, novelty_threshold=0.3, shingle_size=2)
+        await condition([say("user", REPEATED)])
+        assert await condition([say("Grok", REPEATED)]) is None  # 第 1 轮低新意
+        assert await condition([say("Qwen", "剪裁利落，鞋子选得也很妙")]) is None  # 新内容，清零
+        assert await condition([say("Grok", REPEATED)]) is None  # 重新计数
+        assert await condition([say("Qwen", REPEATED)]) is not None
+
+    asyncio.run(scenario())
+
+
+def test_only_participants_count_as_turns():
+    async def scenario():
+        condition = ConvergenceTermination(
+            min_turns=1, patience=1, novelty_threshold=0.3, shingle_size=2, sources=["Grok"],
+        )
+        await condition([say("Grok", REPEATED)])
+        assert await condition([say("selector", REPEATED)]) is None
+        assert await condition([say("Grok", REPEATED)]) is not None
+
+    asyncio.run(scenario())
+
+
+def test_reset_clears_state():
+    async def scenario():
+        condition = ConvergenceTermination(min_turns=1, patience=1, novelty_threshold=0.3, shingle_size=2)
+        await condition([say("Grok", REPEATED)])
+        assert await condition([say("Grok", REPEATED)]) is not None
+
+        await condition.reset()
+        assert not condition.terminated
+        assert condition.stop_reason is None and condition.novelty_history == []
+        # 已出现内容也清空：同样的发言重新算作新内容
+        assert await condition([say("Grok", REPEATED)]) is None
+        assert condition.novelty_history == [("Grok", 1.0)]
+
+    asyncio.run(scenario())
+
+
+def test_build_debate_termination_seeds_convergence_from_history(monkeypatch):
+    monkeypatch.setattr(termination_module.settings, "debate_convergence_enabled", True)
+    monkeypatch.setattr(termination_module.settings, "debate_convergence_min_turns", 2)
+    monkeypatch.setattr(termination_module.settings, "debate_convergence_patience", 1)
+    monkeypatch.setattr(termination_module.settings, "debate_convergence_novelty", 0.3)
+    monkeypatch.setattr(termination_module.settings, "debate_convergence_shingle_size", 2)
+
+    async def first_turn_stops(history) -> bool:
+        condition = build_debate_termination(max_messages=20, participants=["Grok", "Qwen"], history=history)
+        return await condition([say("Qwen", REPEATED)]) is not None
+
+    # 恢复时已有发言计入收敛检测：复述已有内容的第一条新发言即可达到 min_turns 并终止
+    assert asyncio.run(first_turn_stops([say("user", "评分摘要"), say("Grok", REPEATED)]))
+    assert not asyncio.run(first_turn_stops([say("user", "评分摘要")]))
+
+    monkeypatch.setattr(termination_module.settings, "debate_convergence_enabled", False)
+    assert not asyncio.run(first_turn_stops([say("user", "评分摘要"), say("Grok", REPEATED)]))
+
+
+def test_remaining_token_budget_subtracts_persisted_usage():
+    messages = [
+        {"metrics": {"prompt_tokens": 300, "completion_tokens": 50}},
+        {"metrics": {"prompt_tokens": 400}},
+        {"metrics": None},
+        {},
+    ]
+    assert remaining_token_budget(1000, messages) == 250
+    assert remaining_token_budget(500, messages) == 1  # 已用完：至少保留 1，下一条发言后结束
+    assert remaining_token_budget(None, messages) is None
+    assert remaining_token_budget(0, messages) is None
+
+
+def test_stream_with_deadline_cancels_pending_event():
+    cancelled = []
+
+    async def slow_stream():
+        try:
+            for i in range(10):
+                await asyncio.sleep(0.05 if i < 2 else 5)
+                yield i
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def scenario():
+        start = time.monotonic()
+        events = [event async for event in stream_with_deadline(slow_stream(), 0.3)]
+        return events, time.monotonic() - start
+
+    events, elapsed = asyncio.run(scenario())
+    assert events[:2] == [0, 1]
+    assert isinstance(events[-1], TaskResult) and "时限" in events[-1].stop_reason
+    assert elapsed < 2 and cancelled == [True]
+
+
+@pytest.fixture
+def fake_debate(monkeypatch):
+    """模拟模型客户端（测试结束后还原 get_model_client），关闭收敛检测，本地选择发言人"""
+    for module in (judge_cache, stage_one, stage_two, binary_choice_stage_one, binary_choice_stage_two):
+        if hasattr(module, "get_model_client"):
+            monkeypatch.setattr(module, "get_model_client", module.get_model_client)
+    install_fake_clients(judge_latency=0.1, selector_latency=0.0)
+    monkeypatch.setattr(termination_module.settings, "debate_convergence_enabled", False)
+    monkeypatch.setattr(stage_two.settings, "debate_selector_mode", "local")
+
+
+SCORES = [
+    {"judge_id": name, "judge_display_name": name, "overall_score": score, "one_liner": "还行"}
+    for name, score in zip(JUDGE_NAMES, [8, 3, 6, 7, 5])
+]
+CHOICES = [
+    {"judge_id": name, "judge_display_name": name, "choice": choice, "reasoning": "直觉"}
+    for name, choice in zip(JUDGE_NAMES, "ABABA")
+]
+
+
+@pytest.mark.parametrize("mode", ["sequential", "parallel"])
+def test_deadline_returns_partial_transcript(fake_debate, mode):
+    start = time.monotonic()
+    result = asyncio.run(stage_two.run_debate_for_entry(
+        "deadline_e1", "outfit", SCORES, max_messages=30, debate_mode=mode, deadline_seconds=0.5,
+    ))
+    assert time.monotonic() - start < 5
+    assert result.get("error") is None
+    assert 0 < len(result["messages"]) < 29
+    assert "时限" in result["stop_reason"]
+
+
+def test_binary_choice_deadline_returns_partial_transcript(fake_debate):
+    result = asyncio.run(binary_choice_stage_two.run_binary_choice_debate(
+        "deadline_b1", "选哪个？", "A", "B", CHOICES, max_messages=30, deadline_seconds=0.5,
+    ))
+    assert result.get("error") is None
+    assert 0 < len(result["messages"]) < 29
+    assert "时限" in result["stop_reason"]
+
+
+def test_token_budget_stops_debate(fake_debate):
+    result = asyncio.run(stage_two.run_debate_for_entry(
+        "budget_e1", "outfit", SCORES, max_messages=30, token_budget=1500,
+    ))
+    used = sum(m["metrics"]["prompt_tokens"] + m["metrics"]["completion_tokens"] for m in result["messages"])
+    assert 0 < len(result["messages"]) < 29
+    assert used >= 1500
+    assert "token" in result["stop_reason"].lower()